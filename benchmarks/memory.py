@@ -0,0 +1,47 @@
+"""A small script to measure the memory used per Quantity object.
+
+Quantity, Unit and BaseUnit use __slots__.  For comparison, this also measures an equivalent
+class holding the same attributes in a per-instance __dict__, as Quantity did previously.
+"""
+
+import random
+import tracemalloc
+from typing import Any, Callable
+
+from pintless import Registry
+
+COUNT = 1_000_000
+
+
+class DictQuantity:
+    """A Quantity-alike that stores its attributes in a __dict__"""
+
+    def __init__(self, magnitude: Any, unit: Any) -> None:
+        self.magnitude = magnitude
+        self.unit = unit
+
+
+def bytes_per_object(make_object: Callable[[float], Any]) -> float:
+    """Return the mean number of bytes allocated per object created, excluding the magnitude itself."""
+    magnitudes = [random.random() for _ in range(COUNT)]
+
+    tracemalloc.start()
+    objects = [make_object(x) for x in magnitudes]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Discount the list holding the objects
+    allocated -= objects.__sizeof__()
+    return allocated / COUNT
+
+
+reg = Registry()
+unit = reg.kWh
+
+slotted = bytes_per_object(lambda x: x * unit)
+unslotted = bytes_per_object(lambda x: DictQuantity(x, unit))
+
+print(f"     Quantity (__slots__): {slotted:0.1f} bytes/object")
+print(f"Quantity-alike (__dict__): {unslotted:0.1f} bytes/object")
+print("")
+print(f"Slotted quantities are {unslotted / slotted:0.2f} times smaller")
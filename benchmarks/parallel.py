@@ -0,0 +1,51 @@
+"""A small script to measure how bulk conversion and parsing scale with the number of worker processes.
+
+Each pool is started (and its registry sent to the workers) before timing, as it would be when
+reused across many calls.  Scaling is limited by the number of CPUs, and by the cost of sending
+values to and from the workers.
+"""
+
+import os
+import time
+from array import array
+from typing import Any, Callable
+
+from pintless import QuantityArray, Registry
+
+CONVERT_COUNT = 20_000_000
+PARSE_COUNT = 1_000_000
+UNITS = ("kWh", "Wh", "MWh", "joule")
+
+
+def best_time(operation: Callable[[], Any], repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+reg = Registry()
+quantity = QuantityArray(array("d", range(CONVERT_COUNT)), reg.kWh)
+strings = [f"{i * 0.5} {UNITS[i % len(UNITS)]}" for i in range(PARSE_COUNT)]
+
+cpus = os.cpu_count() or 1
+worker_counts = sorted({1, 2, 4, cpus} | set(range(8, cpus + 1, 8)))
+
+serial_convert = best_time(lambda: quantity.to(reg.joule))
+serial_parse = best_time(lambda: reg.parse_many_into(strings, reg.joule))
+print(f"{cpus} CPUs")
+print(f"{'serial':>10}: convert {CONVERT_COUNT / serial_convert / 1e6:7.2f}M values/s, "
+      f"parse {PARSE_COUNT / serial_parse / 1e6:7.2f}M strings/s")
+
+for workers in worker_counts:
+    with reg.process_pool(workers) as pool:
+        # Start the workers
+        reg.parallel_to(quantity[:workers], reg.joule, chunk_size=1, executor=pool)
+
+        convert = best_time(lambda: reg.parallel_to(quantity, reg.joule, executor=pool))
+        parse = best_time(lambda: reg.parallel_parse(strings, reg.joule, executor=pool))
+
+    print(f"{workers:>3} worker{'s' if workers > 1 else ' '}: convert {CONVERT_COUNT / convert / 1e6:7.2f}M values/s "
+          f"({serial_convert / convert:4.2f}x), parse {PARSE_COUNT / parse / 1e6:7.2f}M strings/s ({serial_parse / parse:4.2f}x)")
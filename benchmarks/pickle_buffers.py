@@ -0,0 +1,62 @@
+"""A small script to time pickling a 10M-element quantity in and out of band.
+
+List magnitudes are pickled element by element.  QuantityArray magnitudes are pickled as one
+buffer, which with protocol 5 can be passed out-of-band (as multiprocessing, dask, etc. can do)
+so that it is never copied into the pickle at all.
+"""
+
+import pickle
+import time
+from array import array
+from typing import Any, Callable, List, Tuple
+
+from pintless import QuantityArray, get_registry
+
+COUNT = 10_000_000
+REPEATS = 3
+
+
+def time_round_trip(dump: Callable[[], Tuple[bytes, List[Any]]], load: Callable[[bytes, List[Any]], Any]) -> Tuple[float, float, int]:
+    """Return the best time to pickle and to unpickle, in seconds, and the size of the in-band pickle."""
+    dump_times, load_times = [], []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        data, buffers = dump()
+        dump_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        load(data, buffers)
+        load_times.append(time.perf_counter() - start)
+
+    return min(dump_times), min(load_times), len(data)
+
+
+def out_of_band_dump(quantity: Any) -> Tuple[bytes, List[Any]]:
+    buffers: List[Any] = []
+    data = pickle.dumps(quantity, protocol=5, buffer_callback=buffers.append)
+    return data, buffers
+
+
+reg = get_registry()
+magnitudes = array("d", range(COUNT))
+list_quantity = magnitudes.tolist() * reg.kWh
+array_quantity = QuantityArray(magnitudes, reg.kWh)
+
+results = {
+    "list (protocol 4)": time_round_trip(
+        lambda: (pickle.dumps(list_quantity, protocol=4), []), lambda data, _: pickle.loads(data)
+    ),
+    "array (protocol 4)": time_round_trip(
+        lambda: (pickle.dumps(array_quantity, protocol=4), []), lambda data, _: pickle.loads(data)
+    ),
+    "array (protocol 5, in-band)": time_round_trip(
+        lambda: (pickle.dumps(array_quantity, protocol=5), []), lambda data, _: pickle.loads(data)
+    ),
+    "array (protocol 5, out-of-band)": time_round_trip(
+        lambda: out_of_band_dump(array_quantity), lambda data, buffers: pickle.loads(data, buffers=buffers)
+    ),
+}
+
+print(f"Pickling a quantity of {COUNT:,} values:")
+for name, (dump_time, load_time, size) in results.items():
+    print(f"{name:>32}: dump {dump_time * 1000:9.3f}ms, load {load_time * 1000:9.3f}ms, {size:>11,} bytes in-band")
@@ -0,0 +1,38 @@
+"""A small script to compare Registry start-up time when reading JSON definitions and snapshots.
+
+Lazy registries ignore snapshots, so only eager registries are timed with one.
+"""
+
+import os
+import tempfile
+import time
+from typing import Callable
+
+from pintless import Registry, compile_snapshot
+
+REPEATS = 50
+
+
+def time_construction(make_registry: Callable[[], Registry]) -> float:
+    """Return the mean time taken to construct a registry, in seconds."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        make_registry()
+    end = time.perf_counter()
+
+    return (end - start) / REPEATS
+
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    snapshot_filename = os.path.join(tmpdir, "default_units.snapshot")
+    compile_snapshot(snapshot_filename)
+
+    results = {
+        "JSON (eager)": time_construction(lambda: Registry()),
+        "JSON (lazy)": time_construction(lambda: Registry(lazy=True)),
+        "Snapshot (eager)": time_construction(lambda: Registry(snapshot_filename=snapshot_filename)),
+    }
+
+baseline = results["JSON (eager)"]
+for name, duration in results.items():
+    print(f"{name:>17}: {duration * 1000:0.3f}ms ({baseline / duration:0.2f}x)")
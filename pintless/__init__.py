@@ -2,7 +2,23 @@
 to construct values with units, and to load unit definitions from disk
 """
 
-from pintless.registry import Registry  # noqa: F401
+from pintless.registry import Registry, compile_snapshot, get_registry  # noqa: F401
 from pintless.quantity import Quantity  # noqa: F401
+from pintless.quantity_array import QuantityArray  # noqa: F401
 from pintless.unit import Unit  # noqa: F401
+from pintless.converter import Converter  # noqa: F401
 from pintless.errors import UndefinedUnitError  # noqa: F401
+from pintless.aggregate import sum, mean, min, max  # noqa: F401
+
+# The aggregates are left out, so that "from pintless import *" doesn't shadow the builtins
+# sum, min and max.  Use them as pintless.sum() etc.
+__all__ = [
+    "Registry",
+    "compile_snapshot",
+    "get_registry",
+    "Quantity",
+    "QuantityArray",
+    "Unit",
+    "Converter",
+    "UndefinedUnitError",
+]
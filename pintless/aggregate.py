@@ -0,0 +1,135 @@
+"""
+Aggregation of many Quantity objects at once.
+
+The builtin sum() adds quantities one at a time, checking units, computing a conversion factor
+and creating a new Quantity for every element.  These functions instead group their inputs by
+unit, reduce the raw magnitudes of each group, and then convert each group's result once.  A
+reduction over many quantities in a few units therefore costs one conversion per unit.
+
+Results are in the unit of the first quantity, unless a unit is given.  Fraction and Decimal
+magnitudes are converted exactly, as by Quantity.to().
+
+These shadow the builtins of the same name when imported directly, so are best used as e.g.
+pintless.sum(quantities).
+"""
+from __future__ import annotations
+import builtins
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pintless.quantity as plq
+import pintless.unit as plu
+
+
+def _group(
+    quantities: Iterable[plq.Quantity],
+) -> Tuple[Optional[plq.Quantity], List[Tuple[plu.Unit, List[Any]]]]:
+    """Group the magnitudes of quantities by unit.
+
+    Returns the first quantity, and a list of (unit, magnitudes) in the order each unit was first
+    seen.  Units are grouped by identity, which is cheap and (as units are interned by the
+    registry) almost always the same as grouping by equality.
+    """
+    first = None
+    groups: Dict[int, Tuple[plu.Unit, List[Any]]] = {}
+    for quantity in quantities:
+        if not isinstance(quantity, plq.Quantity):
+            raise TypeError(f"Cannot aggregate non-Quantity value {quantity!r}")
+        if first is None:
+            first = quantity
+
+        unit = quantity.unit
+        group = groups.get(id(unit))
+        if group is None:
+            group = groups[id(unit)] = (unit, [])
+        group[1].append(quantity.magnitude)
+
+    return first, list(groups.values())
+
+
+def _target_unit(first: plq.Quantity, unit: Optional[Union[str, plu.Unit]]) -> plu.Unit:
+    if unit is None:
+        return first.unit
+    return first._resolve_unit(unit)
+
+
+def _sum_groups(
+    groups: List[Tuple[plu.Unit, List[Any]]], target_unit: plu.Unit, compensated: bool
+) -> Any:
+    """Return the total of all groups' magnitudes, in target_unit."""
+    add = math.fsum if compensated else builtins.sum
+    totals = []
+    for group_unit, magnitudes in groups:
+        total = add(magnitudes)
+        conversion_factor = plq._conversion_factor(total, group_unit, target_unit)
+        totals.append(total if conversion_factor == 1 else total * conversion_factor)
+
+    return totals[0] if len(totals) == 1 else add(totals)
+
+
+def sum(
+    quantities: Iterable[plq.Quantity],
+    unit: Optional[Union[str, plu.Unit]] = None,
+    compensated: bool = False,
+) -> Union[plq.Quantity, int]:
+    """Return the sum of many quantities.
+
+    If compensated is True, magnitudes are added using math.fsum, which avoids the loss of
+    precision that comes from adding many floats one by one.
+
+    As with the builtin, the sum of no quantities is 0, unless a unit is given, in which case it
+    is a Quantity of 0 in that unit.
+    """
+    first, groups = _group(quantities)
+    if first is None:
+        if unit is None:
+            return 0
+        if not isinstance(unit, plu.Unit):
+            raise ValueError("Cannot resolve a unit string without any quantities: pass a Unit instead")
+        return plq.Quantity(0, unit)
+
+    target_unit = _target_unit(first, unit)
+    return plq.Quantity(_sum_groups(groups, target_unit, compensated), target_unit)
+
+
+def mean(
+    quantities: Iterable[plq.Quantity],
+    unit: Optional[Union[str, plu.Unit]] = None,
+    compensated: bool = False,
+) -> plq.Quantity:
+    """Return the arithmetic mean of one or more quantities.  compensated is as for sum()."""
+    first, groups = _group(quantities)
+    if first is None:
+        raise ValueError("mean() of no quantities")
+
+    target_unit = _target_unit(first, unit)
+    count = builtins.sum(len(magnitudes) for _, magnitudes in groups)
+    return plq.Quantity(_sum_groups(groups, target_unit, compensated) / count, target_unit)
+
+
+def _extreme(
+    select: Callable, quantities: Iterable[plq.Quantity], unit: Optional[Union[str, plu.Unit]]
+) -> plq.Quantity:
+    first, groups = _group(quantities)
+    if first is None:
+        raise ValueError(f"{select.__name__}() of no quantities")
+
+    # Conversion factors are positive, so the extreme of each group is still its extreme once converted
+    target_unit = _target_unit(first, unit)
+    candidates = []
+    for group_unit, magnitudes in groups:
+        extreme = select(magnitudes)
+        conversion_factor = plq._conversion_factor(extreme, group_unit, target_unit)
+        candidates.append(extreme if conversion_factor == 1 else extreme * conversion_factor)
+
+    return plq.Quantity(select(candidates), target_unit)
+
+
+def min(quantities: Iterable[plq.Quantity], unit: Optional[Union[str, plu.Unit]] = None) -> plq.Quantity:
+    """Return the smallest of one or more quantities."""
+    return _extreme(builtins.min, quantities, unit)
+
+
+def max(quantities: Iterable[plq.Quantity], unit: Optional[Union[str, plu.Unit]] = None) -> plq.Quantity:
+    """Return the largest of one or more quantities."""
+    return _extreme(builtins.max, quantities, unit)
@@ -0,0 +1,523 @@
+"""
+Micro-benchmarks for pintless.
+
+Each benchmark times one operation in isolation, so that a regression in e.g. parsing isn't
+hidden by the cost of everything else.  Run them with:
+
+    python -m pintless.bench [--filter NAME] [--output results.json] [--baseline baseline.json]
+
+Operations are timed with time.perf_counter (via timeit, with the garbage collector disabled)
+after some warmup calls, and repeated several times; the fastest repeat is used for comparisons.
+Memory used per object is measured with tracemalloc.
+
+Results can be written to a JSON file, and compared with a JSON file saved by an earlier run:
+the process exits with status 1 if anything has become slower (or larger) than the baseline by
+more than --tolerance.  If pint is installed, the benchmarks that apply to both libraries are
+also run against pint for comparison.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from array import array
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pintless
+
+# Bump this whenever the layout of the JSON output changes
+RESULTS_VERSION = 1
+
+MEMORY_COUNT = 100_000
+
+
+class Benchmark:
+    """A named operation to time.
+
+    setup is called with a registry (pintless.Registry, or pint.UnitRegistry if pint is True)
+    and returns a function of no arguments that performs the operation once.
+    """
+
+    __slots__ = ("name", "setup", "pint")
+
+    def __init__(self, name: str, setup: Callable[[Any], Callable[[], Any]], pint: bool) -> None:
+        self.name = name
+        self.setup = setup
+        self.pint = pint
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, pint: bool = False) -> Callable:
+    """Register a benchmark.  Set pint=True if the operation uses an API shared with pint."""
+    def decorator(setup: Callable[[Any], Callable[[], Any]]) -> Callable[[Any], Callable[[], Any]]:
+        BENCHMARKS[name] = Benchmark(name, setup, pint)
+        return setup
+    return decorator
+
+
+# Registry construction
+
+@benchmark("registry.construct", pint=True)
+def _registry_construct(r):
+    return type(r)
+
+
+@benchmark("registry.construct_lazy")
+def _registry_construct_lazy(r):
+    return lambda: pintless.Registry(lazy=True)
+
+
+@benchmark("registry.update_multipliers")
+def _registry_update_multipliers(r):
+    # Updates invalidate the registry's caches, so use a registry of its own
+    registry = pintless.Registry()
+    rates = {"EUR": 1.08, "GBP": 1.27, "JPY": 0.0067}
+    return lambda: registry.update_multipliers("currency", rates)
+
+
+# Looking up and parsing units
+
+@benchmark("get_unit.hit", pint=True)
+def _get_unit_hit(r):
+    return lambda: r("kWh")
+
+
+@benchmark("get_unit.miss")
+def _get_unit_miss(r):
+    # Forgetting units would change the shared registry for later benchmarks, so use one of its own
+    registry = pintless.Registry()
+
+    def get_unit_miss():
+        registry._named_units.pop("kWh", None)
+        return registry.get_unit("kWh")
+    return get_unit_miss
+
+
+@benchmark("parse.expression")
+def _parse_expression(r):
+    # As above, clearing the parse cache would affect later benchmarks
+    registry = pintless.Registry()
+
+    def parse_expression():
+        registry.parse_cache.clear()
+        return registry("kelvin / (watt * hour)")
+    return parse_expression
+
+
+@benchmark("parse.expression_cached", pint=True)
+def _parse_expression_cached(r):
+    return lambda: r("kelvin / (watt * hour)")
+
+
+@benchmark("parse.quantity", pint=True)
+def _parse_quantity(r):
+    return lambda: r("4.2 kWh")
+
+
+# Unit algebra
+
+@benchmark("unit.simplify")
+def _unit_simplify(r):
+    unit = r.kWh
+    numerator = [r._get_base_unit(name) for name in ("kW", "hour", "m", "dimensionless")]
+    denominator = [r._get_base_unit(name) for name in ("m", "second")]
+    return lambda: unit.simplify(numerator, denominator)
+
+
+@benchmark("unit.multiply", pint=True)
+def _unit_multiply(r):
+    kWh, second = r.kWh, r.second
+    return lambda: kWh * second
+
+
+@benchmark("unit.divide", pint=True)
+def _unit_divide(r):
+    kWh, second = r.kWh, r.second
+    return lambda: kWh / second
+
+
+# Conversion
+
+@benchmark("quantity.to", pint=True)
+def _quantity_to(r):
+    quantity, target = 10 * r.inch, r.cm
+    return lambda: quantity.to(target)
+
+
+@benchmark("quantity.to_string", pint=True)
+def _quantity_to_string(r):
+    quantity = 10 * r.inch
+    return lambda: quantity.to("cm")
+
+
+@benchmark("quantity.to_decimal")
+def _quantity_to_decimal(r):
+    quantity, target = Decimal("10.5") * r.inch, r.cm
+    return lambda: quantity.to(target)
+
+
+@benchmark("quantity.m_as", pint=True)
+def _quantity_m_as(r):
+    quantity, target = 10 * r.inch, r.cm
+    return lambda: quantity.m_as(target)
+
+
+@benchmark("converter.call")
+def _converter_call(r):
+    converter = r.converter("inch", "cm")
+    return lambda: converter(10)
+
+
+@benchmark("formula.quantities", pint=True)
+def _formula_quantities(r):
+    a, b, c, target = 2 * r.kW, 3 * r.hour, 4 * (r.m * r.m * r.m), r.joule / (r.m * r.m * r.m)
+    return lambda: (a * b / c).m_as(target)
+
+
+@benchmark("formula.compiled")
+def _formula_compiled(r):
+    formula = r.compile("a * b / c", to="joule / m**3", a="kW", b="hour", c="m**3")
+    return lambda: formula(2, 3, 4)
+
+
+@benchmark("wraps.canonical")
+def _wraps_canonical(r):
+    power = r.wraps(ret="watt", args=("joule", "second"))(lambda energy, duration: energy / duration)
+    energy, duration = 10 * r.joule, 2 * r.second
+    return lambda: power(energy, duration)
+
+
+@benchmark("wraps.convert")
+def _wraps_convert(r):
+    power = r.wraps(ret="watt", args=("joule", "second"))(lambda energy, duration: energy / duration)
+    energy, duration = 10 * r.kWh, 2 * r.hour
+    return lambda: power(energy, duration)
+
+
+# Scalar arithmetic
+
+@benchmark("quantity.create", pint=True)
+def _quantity_create(r):
+    unit = r.meter
+    return lambda: 10 * unit
+
+
+@benchmark("quantity.add", pint=True)
+def _quantity_add(r):
+    a, b = 10 * r.meter, 10 * r.inch
+    return lambda: a + b
+
+
+@benchmark("quantity.multiply", pint=True)
+def _quantity_multiply(r):
+    a, b = 10 * r.meter, 10 * r.inch
+    return lambda: a * b
+
+
+@benchmark("quantity.multiply_scalar", pint=True)
+def _quantity_multiply_scalar(r):
+    a = 10 * r.meter
+    return lambda: a * 3
+
+
+@benchmark("quantity.divide", pint=True)
+def _quantity_divide(r):
+    a, b = 10 * r.meter, 10 * r.second
+    return lambda: a / b
+
+
+# List and array arithmetic, over 1000 values
+
+@benchmark("list.to")
+def _list_to(r):
+    quantity, target = [float(x) for x in range(1000)] * r.cm, r.inch
+    return lambda: quantity.to(target)
+
+
+@benchmark("list.multiply_scalar")
+def _list_multiply_scalar(r):
+    quantity = [float(x) for x in range(1000)] * r.cm
+    return lambda: quantity * 3
+
+
+@benchmark("array.to")
+def _array_to(r):
+    quantity, target = array("d", range(1000)) * r.cm, r.inch
+    return lambda: quantity.to(target)
+
+
+@benchmark("array.add")
+def _array_add(r):
+    a, b = array("d", range(1000)) * r.cm, array("d", range(1000)) * r.inch
+    return lambda: a + b
+
+
+@benchmark("aggregate.sum")
+def _aggregate_sum(r):
+    quantities = [x * (r.cm if x % 2 else r.inch) for x in range(1000)]
+    return lambda: pintless.sum(quantities)
+
+
+# Comparisons
+
+@benchmark("quantity.eq", pint=True)
+def _quantity_eq(r):
+    a, b = 10 * r.meter, 10 * r.inch
+    return lambda: a == b
+
+
+@benchmark("quantity.lt", pint=True)
+def _quantity_lt(r):
+    a, b = 10 * r.meter, 10 * r.inch
+    return lambda: a < b
+
+
+# A mix of the above, as in the original benchmark loop
+
+@benchmark("mixed", pint=True)
+def _mixed(r):
+    def mixed():
+        length_a = 10 * r.meter
+        length_b = 10 * r.inch
+        length_a + length_b * 10
+        length_a * r.kWh
+        r.kWh / r.second
+        r.Hz * r.hour
+        length_a.to("inch")
+        length_b.to("mile")
+        0.001 * r.m * r.m * r.m
+        r("4 kWh") == (r.kWh * 4)
+        r("kelvin / (watt * hour)") == r.kelvin / (r.watt * r.hour)
+        r("(4) * (7 kWh)") == 4 * 7 * r.kWh
+    return mixed
+
+
+def _memory_benchmarks(r: Any) -> Dict[str, Callable[[float], Any]]:
+    """Return functions creating one object from a float, whose memory use is to be measured."""
+    unit = r.kWh
+    return {"quantity": lambda x: x * unit}
+
+
+def bytes_per_object(make_object: Callable[[float], Any], count: int = MEMORY_COUNT) -> float:
+    """Return the mean number of bytes allocated per object created, excluding the float itself."""
+    magnitudes = [float(x) for x in range(count)]
+
+    tracemalloc.start()
+    objects = [make_object(x) for x in magnitudes]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Discount the list holding the objects
+    allocated -= objects.__sizeof__()
+    return allocated / count
+
+
+def time_operation(operation: Callable[[], Any], repeat: int, warmup: int, min_time: float) -> Dict[str, Any]:
+    """Time an operation, returning statistics in seconds per call.
+
+    The operation is first called warmup times, to fill any caches.  The number of calls per repeat
+    is then chosen so that each repeat takes at least min_time seconds.
+    """
+    timer = timeit.Timer(operation, timer=time.perf_counter)
+    timer.timeit(warmup)
+
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        # Aim a little over min_time, but grow by at most 100x per step in case of noise
+        number = min(number * 100, max(number + 1, int(number * min_time * 1.2 / max(elapsed, 1e-9))))
+
+    timings = [t / number for t in timer.repeat(repeat, number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+    }
+
+
+def _pint_registry() -> Optional[Any]:
+    """Return a pint UnitRegistry, or None if pint isn't installed."""
+    try:
+        import pint
+    except ImportError:
+        return None
+    return pint.UnitRegistry()
+
+
+def run(
+    names: Optional[Iterable[str]] = None,
+    repeat: int = 5,
+    warmup: int = 10,
+    min_time: float = 0.05,
+    pint: bool = True,
+    memory: bool = True,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, Any]:
+    """Run benchmarks, returning the results as a JSON-serialisable dict.
+
+    names restricts the benchmarks run, and defaults to all of them.  If pint is True and pint is
+    installed, the benchmarks that apply to it are also run against pint.  progress, if given, is
+    called with the library and benchmark name before each benchmark runs.
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {unknown}")
+
+    registries: List[Tuple[str, Any]] = [("pintless", pintless.Registry())]
+    if pint:
+        pint_registry = _pint_registry()
+        if pint_registry is not None:
+            registries.append(("pint", pint_registry))
+
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timings": {},
+        "memory": {},
+    }
+    for library, registry in registries:
+        is_pint = library == "pint"
+        timings = results["timings"][library] = {}
+        for name in names:
+            bench = BENCHMARKS[name]
+            if is_pint and not bench.pint:
+                continue
+            if progress is not None:
+                progress(library, name)
+            timings[name] = time_operation(bench.setup(registry), repeat, warmup, min_time)
+
+        if memory:
+            results["memory"][library] = {
+                name: bytes_per_object(make_object) for name, make_object in _memory_benchmarks(registry).items()
+            }
+
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[Tuple[str, float, bool]]:
+    """Compare the pintless results of a run with a baseline saved by an earlier run.
+
+    Returns (name, ratio, regressed) for everything measured in both, where ratio is the current
+    value divided by the baseline (so > 1 is slower or larger) and regressed is True if the ratio
+    is greater than 1 + tolerance.
+    """
+    if baseline.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Baseline has version {baseline.get('version')}, expected {RESULTS_VERSION}")
+
+    comparisons = []
+    current_timings = results["timings"].get("pintless", {})
+    baseline_timings = baseline["timings"].get("pintless", {})
+    for name, timing in current_timings.items():
+        if name in baseline_timings:
+            ratio = timing["min"] / baseline_timings[name]["min"]
+            comparisons.append((name, ratio, ratio > 1 + tolerance))
+
+    current_memory = results["memory"].get("pintless", {})
+    baseline_memory = baseline["memory"].get("pintless", {})
+    for name, size in current_memory.items():
+        if name in baseline_memory and baseline_memory[name] > 0:
+            ratio = size / baseline_memory[name]
+            comparisons.append((f"memory.{name}", ratio, ratio > 1 + tolerance))
+
+    return comparisons
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:0.3f}{unit}"
+    return f"{seconds / 1e-9:0.1f}ns"
+
+
+def report(results: Dict[str, Any], comparisons: Optional[List[Tuple[str, float, bool]]] = None) -> str:
+    """Return a human-readable table of results, and of their comparison with a baseline if given."""
+    pintless_timings = results["timings"].get("pintless", {})
+    pint_timings = results["timings"].get("pint", {})
+    baseline_ratios = {name: (ratio, regressed) for name, ratio, regressed in comparisons or []}
+
+    lines = [f"{'benchmark':<26} {'pintless':>11} {'pint':>11} {'speedup':>8} {'vs. baseline':>13}"]
+    for name, timing in pintless_timings.items():
+        line = f"{name:<26} {_format_time(timing['min']):>11}"
+        if name in pint_timings:
+            pint_time = pint_timings[name]["min"]
+            line += f" {_format_time(pint_time):>11} {pint_time / timing['min']:>7.1f}x"
+        else:
+            line += f" {'':>11} {'':>8}"
+        if name in baseline_ratios:
+            ratio, regressed = baseline_ratios[name]
+            line += f" {ratio:>12.2f}x{' !' if regressed else ''}"
+        lines.append(line.rstrip())
+
+    for library, sizes in results["memory"].items():
+        for name, size in sizes.items():
+            line = f"{'memory.' + name + ' (' + library + ')':<38} {size:>8.1f} bytes/object"
+            key = f"memory.{name}"
+            if library == "pintless" and key in baseline_ratios:
+                ratio, regressed = baseline_ratios[key]
+                line += f" {ratio:>12.2f}x{' !' if regressed else ''}"
+            lines.append(line)
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pintless.bench", description="Run pintless micro-benchmarks.")
+    parser.add_argument("--filter", "-k", action="append", default=[], help="Only run benchmarks whose name contains this")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed repeats per benchmark")
+    parser.add_argument("--warmup", type=int, default=10, help="Number of untimed calls before timing")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum duration of each repeat, in seconds")
+    parser.add_argument("--no-pint", action="store_true", help="Don't compare with pint, even if it is installed")
+    parser.add_argument("--no-memory", action="store_true", help="Don't measure memory per object")
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    parser.add_argument("--baseline", "-b", help="Compare with results saved in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Fractional slowdown vs. the baseline allowed")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or any(f in name for f in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(
+        names,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        min_time=args.min_time,
+        pint=not args.no_pint,
+        memory=not args.no_memory,
+        progress=lambda library, name: print(f"Running {name} ({library})...", file=sys.stderr),
+    )
+
+    if args.output:
+        with open(args.output, "w") as fout:
+            json.dump(results, fout, indent=2)
+
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline) as fin:
+            comparisons = compare(results, json.load(fin), args.tolerance)
+
+    print(report(results, comparisons))
+
+    if comparisons and any(regressed for _, _, regressed in comparisons):
+        print(f"\nRegressions of more than {args.tolerance:0.0%} vs. the baseline are marked with !", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
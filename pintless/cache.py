@@ -0,0 +1,64 @@
+"""Small caches used by the registry to avoid repeating work on hot paths."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A bounded mapping that discards the least recently used entry once it holds
+    more than maxsize entries.  If maxsize is None the cache is unbounded.
+
+    Hits and misses are counted so that cache sizes can be tuned.
+
+    Caches are shared by every thread using a registry, so get() and put() may race with
+    each other and with clear().  Rather than locking, they treat an entry that disappears
+    part-way through as a miss or an eviction that has already happened.  The counts are
+    not locked either, so may be slightly low under contention.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for key, or default if it is not in the cache."""
+        try:
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:  # not cached, or evicted/cleared by another thread since the lookup
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full."""
+        self._data[key] = value
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            try:
+                self._data.popitem(last=False)
+            except KeyError:  # emptied by another thread
+                pass
+
+    def clear(self) -> None:
+        """Remove all entries.  Hit and miss counts are kept."""
+        self._data.clear()
+
+    def info(self) -> Dict[str, Optional[int]]:
+        """Return hit/miss counts and the current and maximum size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
@@ -0,0 +1,82 @@
+from __future__ import annotations
+from array import array
+from itertools import chain, repeat
+from typing import Any, Iterable, List
+import operator
+
+import pintless.exact as plex
+import pintless.unit as plu
+
+EXACT_TYPES = plex.EXACT_TYPES
+# Buffer formats that convert_into() can write converted values into
+FLOAT_FORMATS = frozenset({"f", "d"})
+
+
+class Converter:
+    """
+    Converts raw magnitudes from one unit to another.
+
+    The conversion factor is computed once, when the converter is created (see Registry.converter),
+    so converting a value is a single multiplication.  This is useful in hot loops where values
+    are known to be in a given unit, and creating a Quantity for each would be wasteful.
+
+    Fraction and Decimal magnitudes are converted exactly, using factors from exact_factor().
+    These are also computed when the converter is created, so like factor they are unaffected by
+    later calls to Registry.update_multipliers.
+    """
+
+    __slots__ = ("source_unit", "target_unit", "factor", "_exact_factors")
+
+    def __init__(self, source_unit: plu.Unit, target_unit: plu.Unit) -> None:
+        self.source_unit = source_unit
+        self.target_unit = target_unit
+        self.factor = source_unit.conversion_factor(target_unit)
+        self._exact_factors = {
+            magnitude_type: source_unit.exact_conversion_factor(target_unit, magnitude_type)
+            for magnitude_type in EXACT_TYPES
+        }
+
+    def __call__(self, value: Any) -> Any:
+        """Convert a single magnitude."""
+        if value.__class__ in EXACT_TYPES:
+            return value * self._exact_factors[value.__class__]
+        return value * self.factor
+
+    def exact_factor(self, magnitude_type: type) -> Any:
+        """Return the factor converting magnitudes of magnitude_type (Fraction or Decimal) exactly."""
+        if magnitude_type not in self._exact_factors:
+            raise TypeError(f"No exact conversion factor for {magnitude_type.__name__} magnitudes")
+        return self._exact_factors[magnitude_type]
+
+    def convert_many(self, values: Iterable) -> List[Any]:
+        """Convert many magnitudes, returning a list.  The factor used depends on the type of the first."""
+        values = iter(values)
+        for first in values:
+            break
+        else:
+            return []
+
+        factor = self.factor
+        if first.__class__ in EXACT_TYPES:
+            factor = self._exact_factors[first.__class__]
+        return [x * factor for x in chain((first,), values)]
+
+    def convert_into(self, buffer: Any) -> Any:
+        """
+        Convert the magnitudes in a writeable buffer (e.g. an array.array of doubles) in place,
+        returning the buffer.
+
+        Only buffers of floats or doubles are supported, since converted values would not fit in
+        an integer buffer.  Use convert_many() for those.
+        """
+        view = memoryview(buffer)
+        if view.format not in FLOAT_FORMATS:
+            raise TypeError(f"Cannot convert in place: buffer format '{view.format}' is not float or double")
+        if view.ndim != 1:
+            view = view.cast("B").cast(view.format)
+        if self.factor != 1:
+            view[:] = array(view.format, map(operator.mul, view, repeat(self.factor)))
+        return buffer
+
+    def __repr__(self) -> str:
+        return f"<Converter({self.source_unit.name} -> {self.target_unit.name}, factor={self.factor})>"
@@ -0,0 +1,181 @@
+"""
+Streaming, unit-aware CSV reading and writing.
+
+Columns carry their unit in the header, in square brackets or parentheses, e.g. `power [kW]`
+or `distance (mile)`.  Square brackets must hold a unit, but text in parentheses that isn't a
+unit is taken to be part of the column's name, so e.g. `temperature (avg)` is a plain column.
+Each column's unit is resolved once, when the header is read, so reading
+a cell costs one float() and (when converting) one multiply --- no Quantity is created per cell.
+Rows are streamed through the csv module, so memory use doesn't grow with the size of the file.
+
+    with open("in.csv", newline="") as fin, open("out.csv", "w", newline="") as fout:
+        reader = QuantityReader(reg, fin, target_units={"power": "W"})
+        writer = QuantityWriter(fout, reader.fieldnames, reader.units)
+        writer.writerows(reader)
+"""
+from __future__ import annotations
+import csv
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pintless.errors as errors
+import pintless.quantity as plq
+import pintless.registry as plr
+import pintless.unit as plu
+
+# "name [unit]" or "name (unit)", with the unit at the end of the header
+_HEADER_UNIT_RE = re.compile(r"^(.*?)\s*(?:\[([^\[\]]*)\]|\(([^()]*)\))\s*$")
+
+
+def parse_header(header: str) -> Tuple[str, Optional[str]]:
+    """Split a column header into its name and unit string, e.g. "power [kW]" -> ("power", "kW").
+
+    The unit string is None if the header isn't annotated with a unit.
+    """
+    match = _HEADER_UNIT_RE.match(header)
+    if match is None:
+        return header.strip(), None
+
+    name, square_unit, round_unit = match.groups()
+    unit = square_unit if square_unit is not None else round_unit
+    return name.strip(), unit.strip()
+
+
+def _header_unit(registry: plr.Registry, header: str, unit_string: str) -> Optional[plu.Unit]:
+    """Resolve the unit annotating a header.
+
+    Returns None if the unit is in parentheses and doesn't resolve to a unit, in which case the
+    parentheses are part of the column name.  Units in square brackets must resolve.
+    """
+    strict = not header.rstrip().endswith(")")
+    try:
+        unit = registry.get_unit(unit_string)
+    except (errors.UndefinedUnitError, ValueError):
+        if strict:
+            raise
+        return None
+
+    if not isinstance(unit, plu.Unit):
+        if strict:
+            raise ValueError(f"Header '{header}' does not contain a unit")
+        return None
+    return unit
+
+
+def format_header(name: str, unit: Optional[plu.Unit]) -> str:
+    """Return the header for a column, annotated with its unit (if any) in square brackets."""
+    if unit is None:
+        return name
+    return f"{name} [{unit.name}]"
+
+
+class QuantityReader:
+    """
+    Reads rows from a CSV file whose headers are annotated with units.
+
+    Iterating yields one list per row.  Cells in columns with a unit are floats, converted into
+    the target unit for that column if one is given in target_units (keyed by column name, without
+    the unit).  Empty cells in those columns are None.  Cells in other columns are left as strings.
+
+    The header row is read when the reader is created.  Its column names and units (after
+    conversion) are available as fieldnames and units, and the factor used to convert each column
+    as factors.  Any extra keyword arguments are passed to csv.reader.
+    """
+
+    def __init__(
+        self,
+        registry: plr.Registry,
+        csvfile: Iterable[str],
+        target_units: Optional[Dict[str, Union[str, plu.Unit]]] = None,
+        **fmtparams: Any,
+    ) -> None:
+        self._reader = csv.reader(csvfile, **fmtparams)
+        target_units = dict(target_units or {})
+
+        try:
+            headers = next(self._reader)
+        except StopIteration:
+            headers = []
+
+        self.fieldnames: List[str] = []
+        self.units: List[Optional[plu.Unit]] = []
+        self.factors: List[Optional[float]] = []
+        for header in headers:
+            name, unit_string = parse_header(header)
+            unit, factor = None, None
+
+            if unit_string is not None:
+                unit = _header_unit(registry, header, unit_string)
+                if unit is None:
+                    name = header.strip()
+            if unit is not None:
+                factor = 1
+                if name in target_units:
+                    target_unit = target_units.pop(name)
+                    target_unit = registry.get_unit(target_unit) if isinstance(target_unit, str) else target_unit
+                    factor = unit.conversion_factor(target_unit)
+                    unit = target_unit
+            self.fieldnames.append(name)
+            self.units.append(unit)
+            self.factors.append(factor)
+
+        if target_units:
+            raise ValueError(f"Target units given for unknown or unitless columns: {sorted(target_units)}")
+
+    @property
+    def line_num(self) -> int:
+        """The number of lines read from the source so far, as csv.reader.line_num."""
+        return self._reader.line_num
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return self
+
+    def __next__(self) -> List[Any]:
+        row = next(self._reader)
+        return [
+            cell if factor is None else (float(cell) * factor if cell else None)
+            for cell, factor in zip(row, self.factors)
+        ]
+
+    def columns(self) -> Dict[str, Optional[plu.Unit]]:
+        """Return a dict of column name to unit, in column order."""
+        return dict(zip(self.fieldnames, self.units))
+
+
+class QuantityWriter:
+    """
+    Writes rows to a CSV file, annotating the header of each column with its unit.
+
+    Each row is a sequence of values, one per column.  Values in columns with a unit are
+    magnitudes in that unit, or Quantity objects, which are converted into it.  The header row is
+    written when the writer is created.  Any extra keyword arguments are passed to csv.writer.
+    """
+
+    def __init__(
+        self,
+        csvfile: Any,
+        fieldnames: Sequence[str],
+        units: Sequence[Optional[plu.Unit]],
+        **fmtparams: Any,
+    ) -> None:
+        if len(fieldnames) != len(units):
+            raise ValueError(f"Got {len(units)} units for {len(fieldnames)} columns")
+
+        self._writer = csv.writer(csvfile, **fmtparams)
+        self.fieldnames = list(fieldnames)
+        self.units = list(units)
+        self._writer.writerow([format_header(name, unit) for name, unit in zip(self.fieldnames, self.units)])
+
+    def _cell(self, value: Any, unit: Optional[plu.Unit]) -> Any:
+        if isinstance(value, plq.Quantity):
+            if unit is None:
+                raise TypeError(f"Cannot write quantity {value} to a column without a unit")
+            return value.m_as(unit)
+        return value
+
+    def writerow(self, row: Sequence[Any]) -> Any:
+        return self._writer.writerow([self._cell(value, unit) for value, unit in zip(row, self.units)])
+
+    def writerows(self, rows: Iterable[Sequence[Any]]) -> None:
+        for row in rows:
+            self.writerow(row)
@@ -0,0 +1,83 @@
+"""
+Exact conversion factors for Fraction and Decimal magnitudes.
+
+Conversion factors are usually floats, so converting a Fraction magnitude would quietly return a
+float, and converting a Decimal one would raise TypeError.  Quantities with these magnitudes are
+instead converted using exact factors, built from the registry's definitions and cached per pair
+of units and magnitude type (see Unit.exact_conversion_factor):
+
+ - Fraction magnitudes are multiplied by a Fraction.
+ - Decimal magnitudes are multiplied by a Decimal, if the factor has a finite decimal expansion
+   (e.g. 1000, or 0.0254 for inches to metres).  Otherwise they are multiplied by the factor's
+   numerator and divided by its denominator, so that the result is rounded as any other
+   Decimal arithmetic would be, in the current decimal context.
+
+The exact value of each number in the definitions is the shortest decimal that rounds to the
+same float, i.e. the number as written in the definition file, for numbers of up to 15
+significant digits.
+"""
+from __future__ import annotations
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Union
+
+# Types of magnitude that are converted using exact factors
+EXACT_TYPES = frozenset({Fraction, Decimal})
+
+
+def exact(value: Union[int, float, Decimal, Fraction]) -> Fraction:
+    """Return a number as a Fraction, taking floats to be the shortest decimal that rounds to them."""
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def exact_multiplier(base_unit: Any) -> Fraction:
+    """Return the multiplier of a BaseUnit that isn't linked to a registry, as a Fraction."""
+    return exact(base_unit.multiplier)
+
+
+class DecimalRatio:
+    """A factor that scales Decimal magnitudes by multiplying by its numerator, then dividing by its denominator."""
+
+    __slots__ = ("numerator", "denominator")
+
+    def __init__(self, numerator: Decimal, denominator: Decimal) -> None:
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def __rmul__(self, magnitude: Decimal) -> Decimal:
+        return magnitude * self.numerator / self.denominator
+
+    def __repr__(self) -> str:
+        return f"<DecimalRatio({self.numerator} / {self.denominator})>"
+
+
+def _terminating_decimal(fraction: Fraction) -> Union[Decimal, None]:
+    """Return fraction as an exact Decimal, or None if its decimal expansion doesn't terminate."""
+    denominator, twos, fives = fraction.denominator, 0, 0
+    while denominator % 2 == 0:
+        denominator //= 2
+        twos += 1
+    while denominator % 5 == 0:
+        denominator //= 5
+        fives += 1
+    if denominator != 1:
+        return None
+
+    # Scale to a power of ten, which the string constructor represents exactly
+    digits = max(twos, fives)
+    numerator = fraction.numerator * 10**digits // fraction.denominator
+    return Decimal(f"{numerator}E-{digits}")
+
+
+def factor_for(fraction: Fraction, magnitude_type: type) -> Any:
+    """Return an exact factor in the form used to scale magnitudes of magnitude_type."""
+    if magnitude_type is Fraction:
+        return fraction
+    if magnitude_type is Decimal:
+        factor = _terminating_decimal(fraction)
+        if factor is None:
+            factor = DecimalRatio(Decimal(fraction.numerator), Decimal(fraction.denominator))
+        return factor
+    raise TypeError(f"Exact factors are only available for {sorted(t.__name__ for t in EXACT_TYPES)} magnitudes, not {magnitude_type.__name__}")
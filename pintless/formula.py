@@ -0,0 +1,180 @@
+"""
+Formulae over raw magnitudes, with units checked and conversions folded in when compiled.
+
+Evaluating a formula with Quantity objects repeats the same unit algebra for every value, even
+though the units never change.  Registry.compile() instead does that work once:
+
+    energy_density = reg.compile("a * b / c", to="joule / m**3", a="kW", b="hour", c="m**3")
+    energy_density(2, 3, 4)                      # 5400000.0, in joule / m**3
+    energy_density.many(powers, hours, volumes)  # array('d', ...) of the same
+    energy_density.unit                          # the output unit
+
+The formula is parsed as a unit expression would be (see Registry.get_unit), with each variable
+standing for a magnitude in its given unit.  It is evaluated once over symbolic magnitudes, which
+tracks the product of every conversion factor met along the way, and the result is a generated
+function that multiplies the variables by that single constant.
+
+Only the operators of unit expressions are supported: `*`, `/`, `**` and parentheses.  A formula
+is always a single product of powers of its variables, so sums and differences such as `a + b`
+cannot be compiled, and raise ValueError.
+"""
+from __future__ import annotations
+import keyword
+import math
+from array import array
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+import pintless.errors as errors
+import pintless.quantity as plq
+import pintless.registry as plr
+import pintless.unit as plu
+
+# Operators that aren't part of unit expressions, so are reported as such rather than as unknown units
+UNSUPPORTED_OPERATORS = ("+", "-")
+
+
+class _Product:
+    """A constant multiplied by powers of named variables, standing in for a magnitude while compiling."""
+
+    __slots__ = ("constant", "powers")
+
+    def __init__(self, constant: Any, powers: Dict[str, Union[int, float]]) -> None:
+        self.constant = constant
+        self.powers = powers
+
+    def _combine(self, other: Any, sign: int) -> _Product:
+        if not isinstance(other, _Product):
+            return _Product(self.constant * other if sign > 0 else self.constant / other, self.powers)
+
+        powers = self.powers.copy()
+        for name, exponent in other.powers.items():
+            powers[name] = powers.get(name, 0) + sign * exponent
+        constant = self.constant * other.constant if sign > 0 else self.constant / other.constant
+        return _Product(constant, powers)
+
+    def __mul__(self, other: Any) -> _Product:
+        return self._combine(other, 1)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> _Product:
+        return self._combine(other, -1)
+
+    def __rtruediv__(self, other: Any) -> _Product:
+        return _Product(other / self.constant, {name: -exponent for name, exponent in self.powers.items()})
+
+    def __pow__(self, exponent: Union[int, float]) -> _Product:
+        return _Product(self.constant**exponent, {name: e * exponent for name, e in self.powers.items()})
+
+
+def _free_name(name: str, taken: Iterable[str]) -> str:
+    """Return name, prefixed with underscores until it isn't one of taken."""
+    taken = set(taken)
+    while name in taken:
+        name = "_" + name
+    return name
+
+
+def _body_source(product: _Product, factor_name: str, namespace: Dict[str, Any], taken: Iterable[str]) -> str:
+    """Return the source of an expression computing product, whose constant is called factor_name.
+
+    Exponents other than 1 are added to namespace under names that aren't taken, rather than
+    written into the source, as not every number (e.g. nan) has a repr that evaluates to it.
+    """
+    taken = set(taken)
+
+    def power_source(name: str, exponent: Union[int, float]) -> str:
+        if exponent == 1:
+            return name
+        exponent_name = _free_name(f"{name}_exponent", taken)
+        taken.add(exponent_name)
+        namespace[exponent_name] = exponent
+        return f"{name} ** {exponent_name}"
+
+    # Negative powers are written as division, except non-finite ones (e.g. x**-inf isn't 1 / x**inf)
+    numerator = [power_source(name, e) for name, e in product.powers.items() if e > 0 or not math.isfinite(e)]
+    denominator = [power_source(name, -e) for name, e in product.powers.items() if e < 0 and math.isfinite(e)]
+
+    if product.constant != 1 or not numerator:
+        numerator.insert(0, factor_name)
+    source = " * ".join(numerator)
+    if len(denominator) == 1:
+        source += f" / {denominator[0]}"
+    elif denominator:
+        source += f" / ({' * '.join(denominator)})"
+    return source
+
+
+def compile_formula(
+    registry: plr.Registry,
+    expression: str,
+    target_unit: Optional[Union[str, plu.Unit]],
+    variable_units: Dict[str, Union[str, plu.Unit]],
+) -> Callable[..., Any]:
+    """Compile a formula over magnitudes in the given units.  See Registry.compile."""
+    if not variable_units:
+        raise ValueError("A formula needs at least one variable")
+    for name in variable_units:
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"Variable name '{name}' is not a valid identifier")
+    variable_units = {name: registry._unit_for(unit) for name, unit in variable_units.items()}
+
+    used = set()
+
+    def type_for_token(token: str) -> plq.Quantity:
+        # Variables take precedence over units of the same name
+        if token in variable_units:
+            used.add(token)
+            return plq.Quantity(_Product(1, {token: 1}), variable_units[token])
+        if registry._resolve_unit_name(token):
+            return plq.Quantity(1, registry.get_unit(token, support_expressions=False))
+
+        try:
+            return plq.Quantity(plr._parse_number(token), registry.dimensionless_unit)
+        except ValueError:
+            pass
+        if any(operator in token for operator in UNSUPPORTED_OPERATORS):
+            raise ValueError(
+                f"Unsupported operator in '{token}': formulae may only use *, /, ** and parentheses"
+            )
+        raise errors.UndefinedUnitError(f"'{token}' is neither a variable nor a unit in the registry")
+
+    result = registry._parse_expression(expression, type_for_token)
+    if not isinstance(result, plq.Quantity):  # just units
+        result = plq.Quantity(1, result)
+    unused = [name for name in variable_units if name not in used]
+    if unused:
+        raise ValueError(f"Variables not used in formula '{expression}': {unused}")
+
+    # Fold the conversion to the output unit into the constant
+    unit = result.unit
+    product = result.magnitude
+    if target_unit is not None:
+        unit = registry._unit_for(target_unit)
+        product = product * result.unit.conversion_factor(unit)
+
+    names = list(variable_units)
+    factor_name = _free_name("factor", names)
+    array_name = _free_name("array", names)
+    zip_name = _free_name("zip", names)
+    namespace = {factor_name: product.constant, array_name: array, zip_name: zip}
+    parameters = ", ".join(names)
+    body = _body_source(product, factor_name, namespace, names + list(namespace))
+    loop = f"{names[0]} in {names[0]}" if len(names) == 1 else f"{parameters} in {zip_name}({parameters})"
+    source = (
+        f"def formula({parameters}):\n"
+        f"    return {body}\n"
+        f"def many({parameters}):\n"
+        f"    return {array_name}('d', [{body} for {loop}])\n"
+    )
+    exec(source, namespace)
+
+    formula = namespace["formula"]
+    formula.many = namespace["many"]
+    formula.expression = expression
+    formula.unit = unit
+    formula.factor = product.constant
+    formula.variables = variable_units
+    inputs = ", ".join(f"{name} in {variable_unit.name}" for name, variable_unit in variable_units.items())
+    formula.__doc__ = f"Return {expression} in {unit.name}, given magnitudes {inputs}"
+    return formula
@@ -0,0 +1,141 @@
+"""
+Opt-in counters and timing hooks for the hot paths of a registry.
+
+Instrumentation is enabled per registry with reg.enable_stats(), and read with reg.stats().
+While no registry has it enabled, the classes involved are left untouched, so it costs nothing.
+Enabling it swaps in wrapped versions of the methods below, which count calls for (and, if a
+callback is given, time them for) the registry that each unit belongs to:
+
+ - unit_allocations: Unit objects created (counted, but not timed)
+ - simplify: calls to Unit.simplify, i.e. unit algebra that missed the algebra cache
+ - parse_unit_expression: unit expressions parsed, i.e. that missed the parse cache
+ - conversion_factor: calls to Unit.conversion_factor, including those answered by the cache
+
+Units created with link_to_registry=False belong to no registry, so are not counted.
+"""
+from __future__ import annotations
+import functools
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+import pintless.registry as plr
+import pintless.unit as plu
+
+COUNTERS = ("unit_allocations", "simplify", "parse_unit_expression", "conversion_factor")
+
+# (class, method name, counter name, function returning the registry for the instance)
+_INSTRUMENTED_METHODS = (
+    (plu.Unit, "__init__", "unit_allocations", lambda unit: unit.registry),
+    (plu.Unit, "simplify", "simplify", lambda unit: unit.registry),
+    (plr.Registry, "_parse_unit_expression", "parse_unit_expression", lambda registry: registry),
+    (plu.Unit, "conversion_factor", "conversion_factor", lambda unit: unit.registry),
+)
+
+# Finalizers for registries with instrumentation enabled, by id.  Methods stay wrapped while this
+# is non-empty.  A registry that is garbage collected without disabling stats is released by its
+# finalizer, so it doesn't keep the methods wrapped
+_enabled_registries: Dict[int, weakref.finalize] = {}
+_original_methods: Dict[tuple, Callable] = {}
+
+
+class Stats:
+    """Counters for a single registry, and the callback to pass timings to (if any)."""
+
+    __slots__ = ("counts", "callback")
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None) -> None:
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.callback = callback
+
+
+def _instrument(method: Callable, counter: str, registry_for: Callable[[Any], Any]) -> Callable:
+    """Wrap a method so that calls are counted and timed for the registry of the instance."""
+
+    @functools.wraps(method)
+    def instrumented(self, *args, **kwargs):
+        stats = getattr(registry_for(self), "_stats", None)
+        if stats is None:
+            return method(self, *args, **kwargs)
+
+        stats.counts[counter] += 1
+        if stats.callback is None:
+            return method(self, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            stats.callback(counter, time.perf_counter() - start)
+
+    return instrumented
+
+
+def _instrument_init(method: Callable, counter: str, registry_for: Callable[[Any], Any]) -> Callable:
+    """Wrap __init__ so that objects are counted once they are created (and know their registry)."""
+
+    @functools.wraps(method)
+    def instrumented(self, *args, **kwargs):
+        method(self, *args, **kwargs)
+        stats = getattr(registry_for(self), "_stats", None)
+        if stats is not None:
+            stats.counts[counter] += 1
+
+    return instrumented
+
+
+def _install() -> None:
+    for cls, name, counter, registry_for in _INSTRUMENTED_METHODS:
+        original = cls.__dict__[name]
+        _original_methods[(cls, name)] = original
+        wrap = _instrument_init if name == "__init__" else _instrument
+        setattr(cls, name, wrap(original, counter, registry_for))
+
+
+def _uninstall() -> None:
+    for (cls, name), original in _original_methods.items():
+        setattr(cls, name, original)
+    _original_methods.clear()
+
+
+def is_installed() -> bool:
+    """Return True if the instrumented methods are currently in place."""
+    return bool(_original_methods)
+
+
+def enable(registry: plr.Registry, callback: Optional[Callable[[str, float], None]] = None) -> None:
+    """Start counting (and timing, if callback is given) calls for a registry.  Counts start at 0."""
+    registry._stats = Stats(callback)
+    if id(registry) not in _enabled_registries:
+        _enabled_registries[id(registry)] = weakref.finalize(registry, _release, id(registry))
+    if not is_installed():
+        _install()
+
+
+def disable(registry: plr.Registry) -> None:
+    """Stop instrumenting a registry, restoring the original methods if no other registry uses them."""
+    registry._stats = None
+    finalizer = _enabled_registries.get(id(registry))
+    if finalizer is not None:
+        finalizer.detach()
+    _release(id(registry))
+
+
+def _release(registry_id: int) -> None:
+    """Forget an instrumented registry, restoring the original methods if it was the last."""
+    _enabled_registries.pop(registry_id, None)
+    if not _enabled_registries and is_installed():
+        _uninstall()
+
+
+def stats(registry: plr.Registry) -> Dict[str, Any]:
+    """Return the counters (if enabled) and cache statistics for a registry."""
+    caches = {}
+    for name in ("algebra", "conversion", "parse"):
+        info = getattr(registry, f"{name}_cache").info()
+        lookups = info["hits"] + info["misses"]
+        info["hit_rate"] = info["hits"] / lookups if lookups else None
+        caches[name] = info
+
+    counts = registry._stats.counts.copy() if registry._stats is not None else None
+    return {"enabled": counts is not None, "counts": counts, "caches": caches}
@@ -0,0 +1,114 @@
+"""
+Optional NumPy integration.
+
+NumPy is not a dependency of pintless, and is only imported when enable() is called.  Once
+enabled, Quantity objects with numpy.ndarray magnitudes:
+
+ - convert with one vectorised multiply in to(), m_as() and ito(), and m_as() can write into a
+   preallocated array using out=
+ - compare elementwise, returning arrays of booleans
+ - take part in NumPy's dimension-preserving ufuncs (add, subtract, multiply, divide, absolute,
+   negative, positive and comparisons), so that e.g. `array * quantity` is a Quantity with
+   the correct unit.  Other ufuncs raise TypeError.
+ - multiply and divide with units, so that `array * unit` and `array / unit` are Quantity objects
+"""
+from typing import Any
+import operator
+
+import pintless.quantity as plq
+import pintless.unit as plu
+
+# The numpy module, once enabled
+numpy = None
+
+_ARITHMETIC = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "true_divide": operator.truediv,
+}
+_UNARY = {
+    "absolute": operator.abs,
+    "negative": operator.neg,
+    "positive": operator.pos,
+}
+_COMPARISONS = {"equal", "not_equal", "less", "less_equal", "greater", "greater_equal"}
+
+
+def enable() -> None:
+    """Import numpy and enable support for numpy.ndarray magnitudes in Quantity objects."""
+    global numpy
+    if numpy is not None:
+        return
+
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("NumPy support requires numpy to be installed") from e
+
+    numpy = np
+    plq.ARRAY_TYPES = (np.ndarray,)
+    plq.Quantity.__array_ufunc__ = _array_ufunc
+    # Opt units out of ufuncs, so numpy defers to Unit.__rmul__ and Unit.__rtruediv__ rather than
+    # broadcasting over the array to build an object array of single quantities
+    plu.Unit.__array_ufunc__ = None
+
+
+def disable() -> None:
+    """Undo enable(), restoring the default handling of magnitudes."""
+    global numpy
+    if numpy is None:
+        return
+
+    numpy = None
+    plq.ARRAY_TYPES = ()
+    del plq.Quantity.__array_ufunc__
+    del plu.Unit.__array_ufunc__
+
+
+def is_enabled() -> bool:
+    return numpy is not None
+
+
+def scale_in_place(magnitude: Any, conversion_factor: float) -> Any:
+    """
+    Multiply an array by a conversion factor, writing into the array itself where its dtype can hold
+    the result.  Returns the array holding the result, which is a new array for e.g. integer input.
+    """
+    if numpy.can_cast(numpy.result_type(magnitude, conversion_factor), magnitude.dtype, casting="same_kind"):
+        return numpy.multiply(magnitude, conversion_factor, out=magnitude)
+    return magnitude * conversion_factor
+
+
+def _array_ufunc(self: plq.Quantity, ufunc: Any, method: str, *inputs: Any, **kwargs: Any) -> Any:
+    """Implementation of Quantity.__array_ufunc__, installed by enable()."""
+    # Only plain calls are supported: out=, where= and reductions would need a unit for every operand
+    if method != "__call__" or kwargs:
+        return NotImplemented
+
+    name = ufunc.__name__
+    if name in _UNARY:
+        return _UNARY[name](inputs[0])
+    if name not in _ARITHMETIC and name not in _COMPARISONS:
+        return NotImplemented
+
+    # Plain values and arrays are dimensionless, as elsewhere in pintless
+    a, b = (
+        x if isinstance(x, plq.Quantity) else plq.Quantity(x, self.unit.dimensionless_unit)
+        for x in inputs
+    )
+    if type(a) is not plq.Quantity or type(b) is not plq.Quantity:
+        # Subclasses such as QuantityArray have their own elementwise semantics
+        return NotImplemented
+
+    if name in _ARITHMETIC:
+        return _ARITHMETIC[name](a, b)
+
+    # Comparisons
+    if not a.unit.compatible_with(b.unit):
+        if name in ("equal", "not_equal"):
+            shape = numpy.broadcast(a.magnitude, b.magnitude).shape
+            return numpy.full(shape, name == "not_equal")
+        raise TypeError(f"Cannot compare quantities of different dimensionalities: {a.unit.unit_type} != {b.unit.unit_type}")
+    return ufunc(a.magnitude, b.magnitude * b.unit.conversion_factor(a.unit))
@@ -0,0 +1,216 @@
+"""
+Bulk conversion and parsing spread over a pool of processes.
+
+Large inputs are split into chunks, which are processed by a concurrent.futures.ProcessPoolExecutor
+and reassembled in order.  Each worker process holds its own copy of the registry, sent once when
+the worker starts, so chunks only carry raw values and small unit descriptors.
+
+These are used through Registry.parallel_to(), Registry.parallel_parse() and Registry.process_pool().
+Creating a pool of processes is expensive, so to process many inputs, create one pool with
+process_pool() and pass it to each call as executor.
+"""
+from __future__ import annotations
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pintless.quantity as plq
+import pintless.quantity_array as plqa
+import pintless.registry as plr
+import pintless.unit as plu
+
+# The registry used by chunks run in this process, if it is a worker
+_worker_registry: Optional[plr.Registry] = None
+
+
+def _init_worker(registry: plr.Registry) -> None:
+    """Set the registry for a worker process.  Named registries are also made available by name."""
+    global _worker_registry
+    _worker_registry = registry
+    if registry.name is not None:
+        plr._named_registries[registry.name] = registry
+
+
+def _registry() -> plr.Registry:
+    """Return the registry of this worker process."""
+    if _worker_registry is None:
+        raise RuntimeError("Parallel conversion and parsing must run on an executor from Registry.process_pool()")
+    return _worker_registry
+
+
+def process_pool(
+    registry: plr.Registry, max_workers: Optional[int] = None, mp_context: Optional[Any] = None
+) -> ProcessPoolExecutor:
+    """Return a pool of processes, each holding a copy of registry, for use with parallel_to/parallel_parse."""
+    return ProcessPoolExecutor(max_workers, mp_context=mp_context, initializer=_init_worker, initargs=(registry,))
+
+
+def _chunks(values: Iterable, chunk_size: int) -> Iterator:
+    """Split values into chunks of chunk_size, slicing lists and arrays and batching other iterables."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, not {chunk_size}")
+
+    if isinstance(values, (list, array)):
+        for start in range(0, len(values), chunk_size):
+            yield values[start:start + chunk_size]
+        return
+
+    iterator = iter(values)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_chunks(
+    registry: plr.Registry,
+    function: Callable,
+    chunks: Iterable,
+    args: Tuple,
+    max_workers: Optional[int],
+    executor: Optional[Executor],
+) -> List[Any]:
+    """Return [function(chunk, *args) for chunk in chunks], run on executor or a new pool of processes."""
+    if executor is None:
+        with process_pool(registry, max_workers) as pool:
+            return _map_chunks(registry, function, chunks, args, max_workers, pool)
+
+    futures = [executor.submit(function, chunk, *args) for chunk in chunks]
+    return [future.result() for future in futures]
+
+
+def _convert_chunk(chunk: Union[list, array], conversion_factor: float) -> Union[list, array]:
+    if isinstance(chunk, list):
+        return [x * conversion_factor for x in chunk]
+    return plqa._scaled(chunk, conversion_factor)
+
+
+def parallel_to(
+    registry: plr.Registry,
+    quantity: plq.Quantity,
+    target_unit: Union[str, plu.Unit],
+    chunk_size: int = plr.PARALLEL_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> plq.Quantity:
+    """Convert a Quantity with list magnitudes, or a QuantityArray, to target_unit.  See Registry.parallel_to."""
+    target_unit = quantity._resolve_unit(target_unit)
+    conversion_factor = plq._conversion_factor(quantity.magnitude, quantity.unit, target_unit)
+
+    magnitude = quantity.magnitude
+    if isinstance(quantity, plqa.QuantityArray):
+        # Convert to doubles (as QuantityArray.to does), so that other buffers can be sliced and pickled
+        if not (isinstance(magnitude, array) and magnitude.typecode == plqa.DEFAULT_TYPECODE):
+            magnitude = array(plqa.DEFAULT_TYPECODE, magnitude)
+    elif not isinstance(magnitude, list):
+        raise TypeError("Only quantities with list magnitudes, and QuantityArrays, can be converted in parallel")
+
+    results = _map_chunks(
+        registry, _convert_chunk, _chunks(magnitude, chunk_size), (conversion_factor,), max_workers, executor
+    )
+
+    if isinstance(magnitude, list):
+        converted = []
+        for result in results:
+            converted.extend(result)
+        return plq.Quantity(converted, target_unit)
+
+    converted = array(plqa.DEFAULT_TYPECODE)
+    for result in results:
+        converted += result
+    return plqa.QuantityArray(converted, target_unit)
+
+
+def _parse_chunk_into(
+    strings: List[str], target_descriptor: Any, raise_errors: bool
+) -> Tuple[array, List[Tuple[int, str, Exception]]]:
+    """Parse strings into magnitudes in a target unit, returning them and any (index, string, error)."""
+    registry = _registry()
+    errors: List[Tuple[int, str, Exception]] = []
+    on_error = None if raise_errors else lambda i, string, e: errors.append((i, string, e))
+    target_unit = registry.unit_from_descriptor(target_descriptor)
+    return registry.parse_many_into(strings, target_unit, on_error=on_error), errors
+
+
+def _parse_chunk(
+    strings: List[str], raise_errors: bool
+) -> Tuple[List[Any], List[Any], List[Optional[int]], List[Tuple[int, str, Exception]]]:
+    """Parse strings into magnitudes and units, returning them and any (index, string, error).
+
+    Units are returned as a list of descriptors, and the index into it of each string's unit
+    (None for bad strings).
+    """
+    errors: List[Tuple[int, str, Exception]] = []
+    on_error = None if raise_errors else lambda i, string, e: errors.append((i, string, e))
+
+    magnitudes, descriptors, unit_indices = [], [], []
+    index_for_unit = {}
+    for _, magnitude, unit in _registry()._parse_rows(strings, None, on_error):
+        magnitudes.append(magnitude)
+        if unit is None:
+            unit_indices.append(None)
+            continue
+
+        unit_index = index_for_unit.get(id(unit))
+        if unit_index is None:
+            unit_index = index_for_unit[id(unit)] = len(descriptors)
+            descriptors.append(unit.descriptor())
+        unit_indices.append(unit_index)
+
+    return magnitudes, descriptors, unit_indices, errors
+
+
+def parallel_parse(
+    registry: plr.Registry,
+    strings: Iterable[str],
+    target_unit: Optional[Union[str, plu.Unit]] = None,
+    on_error: Optional[Callable[[int, str, Exception], None]] = None,
+    chunk_size: int = plr.PARALLEL_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Union[List[plq.Quantity], array]:
+    """Parse many quantity strings in parallel.  See Registry.parallel_parse."""
+    chunks = list(_chunks(strings, chunk_size))
+    raise_errors = on_error is None
+
+    if target_unit is not None:
+        target_unit = registry._unit_for(target_unit)
+        results = _map_chunks(
+            registry, _parse_chunk_into, chunks, (target_unit.descriptor(), raise_errors), max_workers, executor
+        )
+        values = array("d")
+        for chunk_start, (chunk_values, errors) in zip(_chunk_starts(chunks), results):
+            for i, string, e in errors:
+                on_error(chunk_start + i, string, e)
+            values += chunk_values
+        return values
+
+    results = _map_chunks(registry, _parse_chunk, chunks, (raise_errors,), max_workers, executor)
+    quantities = []
+    units = {}
+    for chunk_start, (magnitudes, descriptors, unit_indices, errors) in zip(_chunk_starts(chunks), results):
+        for i, string, e in errors:
+            on_error(chunk_start + i, string, e)
+
+        chunk_units = []
+        for descriptor in descriptors:
+            key = descriptor if isinstance(descriptor, str) else tuple(map(tuple, descriptor))
+            if key not in units:
+                units[key] = registry.unit_from_descriptor(descriptor)
+            chunk_units.append(units[key])
+
+        quantities.extend(
+            plq.Quantity(magnitude, chunk_units[unit_index])
+            for magnitude, unit_index in zip(magnitudes, unit_indices)
+            if unit_index is not None
+        )
+    return quantities
+
+
+def _chunk_starts(chunks: List[list]) -> Iterator[int]:
+    start = 0
+    for chunk in chunks:
+        yield start
+        start += len(chunk)
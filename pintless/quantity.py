@@ -1,9 +1,29 @@
 from __future__ import annotations
-from typing import Union, Any
+from typing import Union, Any, Optional, Tuple
 import math
 
+import pintless.exact as plex
 import pintless.unit as plu
 
+# Types of magnitude that are arrays with elementwise semantics, e.g. numpy.ndarray.  This is
+# empty unless enabled by pintless.numpy_support.enable(), so checking it costs almost nothing.
+ARRAY_TYPES: Tuple[type, ...] = ()
+
+EXACT_TYPES = plex.EXACT_TYPES
+
+
+def _conversion_factor(magnitude: Any, unit: plu.Unit, target_unit: plu.Unit) -> Any:
+    """Return the factor converting magnitude from unit to target_unit.
+
+    This is exact for Fraction and Decimal magnitudes, and lists of them (see pintless.exact).
+    """
+    magnitude_type = magnitude.__class__
+    if magnitude_type is list and magnitude:
+        magnitude_type = magnitude[0].__class__
+    if magnitude_type in EXACT_TYPES:
+        return unit.exact_conversion_factor(target_unit, magnitude_type)
+    return unit.conversion_factor(target_unit)
+
 
 class Quantity:
     """
@@ -17,6 +37,8 @@ class Quantity:
     to new units using .to() or .ito().  This follows the API established by the pint library.
     """
 
+    __slots__ = ("magnitude", "unit")
+
     def __init__(self, magnitude: Any, unit: plu.Unit) -> None:
 
         if isinstance(unit, str):
@@ -27,6 +49,15 @@ class Quantity:
         self.magnitude = magnitude
         self.unit: plu.Unit = unit
 
+    def __reduce__(self) -> tuple:
+        # Rebuilding from the constructor keeps pickles small: units of named registries are
+        # themselves pickled by reference (see Unit.__reduce_ex__)
+        return self.__class__, (self.magnitude, self.unit)
+
+    def __setstate__(self, state: tuple) -> None:
+        # Pickles written by earlier versions store the magnitude and unit as state
+        self.magnitude, self.unit = state
+
     @property
     def units(self) -> plu.Unit:
         """Pint compatibliity property, simply returns self.unit"""
@@ -36,18 +67,8 @@ class Quantity:
     def dimensionality(self) -> str:
         return self.unit.unit_type
 
-    def m_as(self, target_unit: Union[str, plu.Unit]) -> Any:
-        """
-        Return the magnitude of this Quantity as if it is the unit given.
-        Marginally faster than .to('x').magnitude as no new Quantity object is created.
-
-        The unit may be provided as a string ("m/s") or as a Unit type.
-
-        If it is provided as a string, it cannot contain any numbers, e.g. "400 miles".
-        This prevents subtle conversion issues, but is also simpler, thus faster.
-
-        To perform these conversions you must convert the unit then multiply by the constant (i.e. 400).
-        """
+    def _resolve_unit(self, target_unit: Union[str, plu.Unit]) -> plu.Unit:
+        """Return target_unit as a Unit, parsing strings using the registry linked to this Quantity's unit."""
         if isinstance(target_unit, str):
             if self.unit.registry is None:
                 raise ValueError(
@@ -59,25 +80,38 @@ class Quantity:
         if not isinstance(target_unit, plu.Unit):
             raise ValueError("Cannot convert to a non-unit type (this may happen if converting to a string expression with numbers in it)")
 
-        conversion_factor = self.unit.conversion_factor(target_unit)
+        return target_unit
+
+    def m_as(self, target_unit: Union[str, plu.Unit], out: Optional[Any] = None) -> Any:
+        """
+        Return the magnitude of this Quantity as if it is the unit given.
+        Marginally faster than .to('x').magnitude as no new Quantity object is created.
+
+        The unit may be provided as a string ("m/s") or as a Unit type.
+
+        If it is provided as a string, it cannot contain any numbers, e.g. "400 miles".
+        This prevents subtle conversion issues, but is also simpler, thus faster.
+
+        To perform these conversions you must convert the unit then multiply by the constant (i.e. 400).
+
+        For array magnitudes (see pintless.numpy_support), out may be given to write the converted
+        values into an existing array, which is then returned.
+        """
+        target_unit = self._resolve_unit(target_unit)
+        conversion_factor = _conversion_factor(self.magnitude, self.unit, target_unit)
+        if out is not None:
+            if not isinstance(self.magnitude, ARRAY_TYPES):
+                raise TypeError("out= is only supported for array magnitudes (see pintless.numpy_support)")
+            import pintless.numpy_support as plnp
+            return plnp.numpy.multiply(self.magnitude, conversion_factor, out=out)
         if isinstance(self.magnitude, list):
             return [x * conversion_factor for x in self.magnitude]
         return self.magnitude * conversion_factor
 
     def to(self, target_unit: Union[str, plu.Unit]) -> Quantity:
         """Convert this Quantity to another unit"""
-        if isinstance(target_unit, str):
-            if self.unit.registry is None:
-                raise ValueError(
-                    "Cannot process string input for conversion if a registry is not linked to the units.  Set link_to_registry=True when creating units."
-                )
-            target_unit = self.unit.registry.get_unit(target_unit)
-
-        # This might happen if someone passes in a string containing numbers
-        if not isinstance(target_unit, plu.Unit):
-            raise ValueError("Cannot convert to a non-unit type (this may happen if converting to a string expression with numbers in it)")
-
-        conversion_factor = self.unit.conversion_factor(target_unit)
+        target_unit = self._resolve_unit(target_unit)
+        conversion_factor = _conversion_factor(self.magnitude, self.unit, target_unit)
         if isinstance(self.magnitude, list):
             new_magnitude = [x * conversion_factor for x in self.magnitude]
         else:
@@ -87,23 +121,26 @@ class Quantity:
 
     def ito(self, target_unit: Union[str, plu.Unit]) -> None:
         """In-place version of to"""
-        if isinstance(target_unit, str):
-            if self.unit.registry is None:
-                raise ValueError(
-                    "Cannot process string input for conversion if a registry is not linked to the units.  Set link_to_registry=True when creating units."
-                )
-            target_unit = self.unit.registry.get_unit(target_unit)
-
-        self.magnitude *= self.unit.conversion_factor(target_unit)
+        target_unit = self._resolve_unit(target_unit)
+        if isinstance(self.magnitude, ARRAY_TYPES):
+            import pintless.numpy_support as plnp
+            self.magnitude = plnp.scale_in_place(self.magnitude, self.unit.conversion_factor(target_unit))
+        else:
+            self.magnitude *= _conversion_factor(self.magnitude, self.unit, target_unit)
         self.unit = target_unit
 
     # https://docs.python.org/3/reference/datamodel.html#emulating-numeric-types
 
     def __bool__(self) -> bool:
         # This is valid because this lib doesn't support non-0-centred values (e.g. Celsius, Farenheit)
-        return self.magnitude.__bool__()
+        return bool(self.magnitude)
 
     def __eq__(self, __o: object) -> bool:
+        if isinstance(self.magnitude, ARRAY_TYPES) or isinstance(getattr(__o, "magnitude", __o), ARRAY_TYPES):
+            # Elementwise comparison, see pintless.numpy_support
+            import pintless.numpy_support as plnp
+            return plnp.numpy.equal(self, __o)
+
         if isinstance(__o, Quantity):
             try:
                 return (
@@ -127,24 +164,24 @@ class Quantity:
     def __lt__(self, __o: object) -> bool:
         return isinstance(
             __o, Quantity
-        ) and self.magnitude < __o.magnitude * self.unit.conversion_factor(__o.unit)
+        ) and self.magnitude < __o.magnitude * _conversion_factor(__o.magnitude, __o.unit, self.unit)
 
     def __add__(self, __o: object) -> Quantity:
         if not isinstance(__o, Quantity):
 
-            if __o == 0:
+            if not isinstance(__o, ARRAY_TYPES) and __o == 0:
                 return self
 
             return self + Quantity(__o, self.unit.dimensionless_unit)
 
-        if self.unit.unit_type != __o.unit.unit_type:
+        if self.unit.dimensions != __o.unit.dimensions:
             raise TypeError(
                 f"Cannot sum quantities of different dimensionalities: {self.unit.unit_type} != {__o.unit.unit_type}"
             )
 
         # Convert other unit to this unit, then create new Quantity
         return Quantity(
-            self.magnitude + (__o.magnitude * __o.unit.conversion_factor(self.unit)),
+            self.magnitude + (__o.magnitude * _conversion_factor(__o.magnitude, __o.unit, self.unit)),
             self.unit,
         )
 
@@ -153,19 +190,19 @@ class Quantity:
     def __sub__(self, __o: object) -> Quantity:
         if not isinstance(__o, Quantity):
 
-            if __o == 0:
+            if not isinstance(__o, ARRAY_TYPES) and __o == 0:
                 return self
 
             return self - Quantity(__o, self.unit.dimensionless_unit)
 
-        if self.unit.unit_type != __o.unit.unit_type:
+        if self.unit.dimensions != __o.unit.dimensions:
             raise TypeError(
                 f"Cannot subtract quantities of different dimensionalities: {self.unit.unit_type} != {__o.unit.unit_type}"
             )
 
         # Convert other unit to this unit, then create new Quantity
         return Quantity(
-            self.magnitude - (__o.magnitude * __o.unit.conversion_factor(self.unit)),
+            self.magnitude - (__o.magnitude * _conversion_factor(__o.magnitude, __o.unit, self.unit)),
             self.unit,
         )
 
@@ -194,17 +231,7 @@ class Quantity:
             __o = Quantity(__o, self.unit.dimensionless_unit)
 
         # Multiply a/b by b/c to get ab * bc.
-        # This is a copy of the logic in Unit, in an effort to increase performance.
-        new_numerators, new_denominators, conversion_factor = self.unit.simplify(
-            self.unit.numerator_units + __o.unit.numerator_units,
-            self.unit.denominator_units + __o.unit.denominator_units,
-        )
-        new_unit = plu.Unit(
-            new_numerators,
-            new_denominators,
-            self.unit.dimensionless_base_unit,
-            self.unit.registry,
-        )
+        new_unit, conversion_factor = self.unit._combine(__o.unit)
 
         if isinstance(self.magnitude, list):
             if isinstance(__o.magnitude, list):
@@ -213,7 +240,10 @@ class Quantity:
                 x * __o.magnitude * conversion_factor for x in self.magnitude
             ]
         else:
-            new_magnitude = self.magnitude * __o.magnitude * conversion_factor
+            new_magnitude = self.magnitude * __o.magnitude
+            if new_magnitude.__class__ in EXACT_TYPES:
+                conversion_factor = self.unit._exact_algebra_factor(__o.unit, False, new_unit, new_magnitude.__class__)
+            new_magnitude = new_magnitude * conversion_factor
 
         return Quantity(new_magnitude, new_unit)
 
@@ -228,25 +258,40 @@ class Quantity:
                 # Assume it's a magnitude.  Maybe warn on this condition?
                 __o = Quantity(__o, self.unit.dimensionless_unit)
 
-        # If this has a denominator, flip it and then multiply it using the other mult rules.
         # (a / b) / (c / d) == ad / bc
-        new_numerators, new_denominators, conversion_factor = self.unit.simplify(
-            self.unit.numerator_units + __o.unit.denominator_units,
-            self.unit.denominator_units + __o.unit.numerator_units,
-        )
-        new_unit = plu.Unit(
-            new_numerators,
-            new_denominators,
-            self.unit.dimensionless_base_unit,
-            self.unit.registry,
-        )
+        new_unit, conversion_factor = self.unit._combine(__o.unit, divide=True)
 
         if isinstance(self.magnitude, list):
             new_magnitude = [
                 (x / __o.magnitude) * conversion_factor for x in self.magnitude
             ]
         else:
-            new_magnitude = (self.magnitude / __o.magnitude) * conversion_factor
+            new_magnitude = self.magnitude / __o.magnitude
+            if new_magnitude.__class__ in EXACT_TYPES:
+                conversion_factor = self.unit._exact_algebra_factor(__o.unit, True, new_unit, new_magnitude.__class__)
+            new_magnitude = new_magnitude * conversion_factor
+
+        return Quantity(new_magnitude, new_unit)
+
+    def __pow__(self, __o: Union[int, float]) -> Quantity:
+        """
+        Raise the Quantity to a power.  Quantities with units support integer powers only,
+        e.g. (2 * m)**3 or (4 * s)**-2.  Dimensionless quantities support any power.
+        """
+        if not isinstance(__o, int):
+            if any(self.unit.dimensions):
+                raise TypeError(f"Quantities with units can only be raised to integer powers, not {__o!r}")
+            # Fold any scale (e.g. kilodimensionless) into the magnitude first
+            return Quantity(self.m_as(self.unit.dimensionless_unit) ** __o, self.unit.dimensionless_unit)
+
+        new_unit, conversion_factor = self.unit._power(__o)
+        if isinstance(self.magnitude, list):
+            new_magnitude = [x**__o * conversion_factor for x in self.magnitude]
+        else:
+            new_magnitude = self.magnitude**__o
+            if new_magnitude.__class__ in EXACT_TYPES:
+                conversion_factor = self.unit._exact_algebra_factor(None, __o, new_unit, new_magnitude.__class__)
+            new_magnitude = new_magnitude * conversion_factor
 
         return Quantity(new_magnitude, new_unit)
 
@@ -1,11 +1,20 @@
 import os
 import json
-from functools import lru_cache
+import math
+from array import array
+import pickle
+import hashlib
 from .unit import BaseUnit, Unit
+from .cache import LRUCache
 import logging
-from typing import Optional, Any, Union
+from decimal import Decimal
+from fractions import Fraction
+from typing import Optional, Any, Dict, Union, List, Iterable, Iterator, Callable, Tuple
 import pintless.quantity
+import pintless.quantity_array
+from .converter import Converter
 import pintless.errors as errors
+import pintless.exact as plex
 
 DEFAULT_DEFINITION_FILE = "default_units.json"
 PREFIX_KEY = "__prefixes__"
@@ -14,22 +23,165 @@ MULTIPLY_TOKEN = "__multiply__"
 DIVIDE_TOKEN = "__divide__"
 OPEN_EXPR_TOKEN = "__start_expr__"
 CLOSE_EXPR_TOKEN = "__end_expr__"
+POWER_TOKEN = "__power__"
+OPERATOR_TOKENS = {
+    "*": MULTIPLY_TOKEN,
+    "/": DIVIDE_TOKEN,
+    "**": POWER_TOKEN,
+    "(": OPEN_EXPR_TOKEN,
+    ")": CLOSE_EXPR_TOKEN,
+}
+
+# Bulk parsing remembers the unit for this many distinct unit strings per call
+MAX_PARSED_UNIT_STRINGS = 4096
+
+# Number of values sent to each worker at a time by parallel_to/parallel_parse
+PARALLEL_CHUNK_SIZE = 65536
+
+# Bump this whenever the set or layout of tables stored in a snapshot changes
+SNAPSHOT_VERSION = 1
+SNAPSHOT_TABLES = (
+    "units",
+    "base_type_for_utype",
+    "units_for_utype",
+    "utype_for_unit",
+    "derived_types",
+    "_prefixes",
+    "_definitions",
+)
+
+# Registries whose units are pickled by reference, by name.  See Registry and get_registry()
+DEFAULT_REGISTRY_NAME = "default"
+_named_registries = {}
 
 logging.basicConfig()
 log = logging.getLogger()
 
 
+def _hash_file(filename: str) -> str:
+    """Return a hash of a file's contents, used to spot stale snapshots."""
+    with open(filename, "rb") as fin:
+        return hashlib.sha256(fin.read()).hexdigest()
+
+
+def _parse_number(token: str) -> Union[int, float]:
+    """Parse a number in a unit expression.  Numbers are floats, unless they are all digits."""
+    if token.isdigit() or (len(token) > 1 and token[0] == "-" and token[1:].isdigit()):
+        return int(token)
+    return float(token)
+
+
+def _valid_multiplier(multiplier: Any) -> bool:
+    """Return True if multiplier is a number that is positive and finite, including as a float."""
+    if isinstance(multiplier, bool) or not isinstance(multiplier, (int, float, Decimal, Fraction)):
+        return False
+    # Comparing Decimal NaNs raises InvalidOperation, rather than returning False
+    if isinstance(multiplier, Decimal) and not multiplier.is_finite():
+        return False
+    try:
+        return 0 < float(multiplier) < math.inf
+    except OverflowError:
+        return False
+
+
+def _tokenize_expression(expression: str) -> List[str]:
+    """Split an expression into operators, brackets, and the names and numbers between them."""
+    # Replace operators with whitespace separated versions, then split on whitespace.
+    # Saves use of regex libs
+    expression = (
+        expression.replace("**", "^")
+        .replace("*", " * ")
+        .replace("/", " / ")
+        .replace("^", " ** ")
+        .replace("(", " ( ")
+        .replace(")", " ) ")
+    )
+    return expression.split()
+
+
+def compile_snapshot(snapshot_filename: str, definition_filename: Optional[str] = None) -> None:
+    """Compile a definition file into a snapshot that Registry can load quickly.
+
+    This is only needed to build snapshots ahead of time (e.g. when packaging): creating a
+    Registry with snapshot_filename set will compile a missing or stale snapshot itself.
+    """
+    Registry(definition_filename, snapshot_filename=snapshot_filename)
+
+
+def get_registry(name: str = DEFAULT_REGISTRY_NAME) -> "Registry":
+    """Return the registry created with the name given.
+
+    If no registry has been given the default name, one is created (lazily, with the default
+    definitions) on first use.  Units and quantities from named registries are pickled by
+    reference to the registry's name, and are unpickled against the registry returned by this.
+    """
+    registry = _named_registries.get(name)
+    if registry is None:
+        if name != DEFAULT_REGISTRY_NAME:
+            raise ValueError(f"No registry named '{name}' has been created in this process")
+        registry = Registry(lazy=True, name=DEFAULT_REGISTRY_NAME)
+    return registry
+
+
 class Registry:
     """A factory class for units and quantities.  Broadly speaking, units and quantities created from
     the same Registry object are compatible and can be converted if the dimensionality is the same."""
 
     Quantity = pintless.quantity.Quantity
+    QuantityArray = pintless.quantity_array.QuantityArray
 
     def __init__(
-        self, definition_filename: Optional[str] = None, link_to_registry: bool = True
+        self,
+        definition_filename: Optional[str] = None,
+        link_to_registry: bool = True,
+        lazy: bool = False,
+        snapshot_filename: Optional[str] = None,
+        algebra_cache_size: Optional[int] = 1024,
+        conversion_cache_size: Optional[int] = 1024,
+        parse_cache_size: Optional[int] = 1024,
+        name: Optional[str] = None,
     ):
+        """Create a new registry from a unit definition file.
+
+        If lazy is True, prefixed units (e.g. kWh, mW) are not expanded up-front.  Instead,
+        the prefix is split off and the unit defined the first time its name is used,
+        either as an attribute (reg.kWh), or through reg("mW") or get_unit().  This makes
+        construction cost scale with the units actually used, rather than the number of
+        units * prefixes.
+
+        If snapshot_filename is given, the expanded unit tables of an eager registry are loaded
+        from that file rather than parsed from the definition file and expanded.  The snapshot is
+        (re)written whenever it is missing, unreadable, was written by another version of pintless,
+        or was compiled from a definition file with different contents.  Snapshots are pickles:
+        only load ones you trust.  Most of the start-up time of an eager registry goes on creating
+        a unit for every name, which a snapshot doesn't avoid, so the saving is small.  Lazy
+        registries read the (much smaller) un-prefixed definitions faster than any snapshot, so
+        ignore snapshot_filename.
+
+        algebra_cache_size bounds the number of unit multiplications/divisions remembered
+        by the registry (None for no limit).  Hit and miss counts for this are in
+        reg.algebra_cache.info().  Similarly, conversion_cache_size bounds the number of
+        conversion factors between pairs of units that are remembered, reported in
+        reg.conversion_cache.info().  parse_cache_size bounds the number of unit expressions
+        (e.g. "kWh / mile") whose parsed result is remembered, reported in reg.parse_cache.info().
+
+        If name is given, the registry can be retrieved with get_registry(name), replacing any
+        earlier registry with that name.  Units and quantities from named registries pickle as just
+        their magnitude, the registry name and a unit expression, and are unpickled against the
+        registry of that name in the receiving process (which must have been created first, unless
+        the name is "default").  Units of unnamed registries pickle along with the whole registry.
+        """
 
         self.link_to_registry = link_to_registry
+        self.lazy = lazy
+        self.name = name
+
+        # Counters, if enabled with enable_stats()
+        self._stats = None
+
+        # Incremented whenever multipliers are updated, invalidating any cached scales and
+        # conversion factors.  See update_multipliers()
+        self.version = 0
 
         if definition_filename is None:
             definition_filename = (
@@ -38,6 +190,81 @@ class Registry:
                 + DEFAULT_DEFINITION_FILE
             )
 
+        if snapshot_filename is None or self.lazy:
+            self._read_definitions(definition_filename, expand=not self.lazy)
+        else:
+            source_hash = _hash_file(definition_filename)
+            if not self._read_snapshot(snapshot_filename, source_hash):
+                self._read_definitions(definition_filename, expand=True)
+                self._write_snapshot(snapshot_filename, source_hash)
+
+        # Each dimension (unit type) has a position in the vectors of exponents held by units.
+        # Dimensionless units have no position, so are all zeros
+        self.dimension_names = tuple(
+            utype for utype in self.base_type_for_utype if utype != f"[{DIMENSIONLESS_UNIT_NAME}]"
+        )
+        self._dimension_vectors = {
+            utype: tuple(int(utype == other) for other in self.dimension_names)
+            for utype in self.base_type_for_utype
+        }
+
+        # Units for each defined unit name, and for each base unit, built on first use
+        self._named_units = {}
+        self._base_units = {}
+
+        # The (prefix, definition name) of defined unit names, as found by _split_prefix
+        self._prefix_splits = {}
+
+        # Exact multipliers of definitions changed by update_multipliers().  Others are derived
+        # from the definitions as needed, see _exact_multiplier
+        self._exact_definitions = {}
+
+        # Results of parsing unit expressions, keyed by the expression string
+        self.parse_cache = LRUCache(parse_cache_size)
+
+        if not self._resolve_unit_name(DIMENSIONLESS_UNIT_NAME):
+            raise AssertionError(f"A unit with name '{DIMENSIONLESS_UNIT_NAME}' must be defined")
+
+        self._init_units()
+
+        # Results of multiplying/dividing units, as (operand, operand, result unit, conversion factor),
+        # keyed by the identity of the operands.  See Unit._combine.
+        self.algebra_cache = LRUCache(algebra_cache_size)
+
+        # Conversion factors between units, as (unit, target unit, factor), keyed by the identity
+        # of the units.  See Unit.conversion_factor.
+        self.conversion_cache = LRUCache(conversion_cache_size)
+
+        # Define the "multiply method" on this registry.  Lazy registries do this
+        # on first access in __getattr__
+        if not self.lazy:
+            for unit_name in self.units:
+                setattr(self, unit_name, self.get_unit(unit_name))
+
+        if name is not None:
+            _named_registries[name] = self
+
+    def _init_units(self) -> None:
+        """Create the dimensionless unit, and the table of interned units that starts with it."""
+        self.dimensionless_unit = Unit(
+            [],
+            [],
+            self._get_base_unit(DIMENSIONLESS_UNIT_NAME),
+            self if self.link_to_registry else None,
+            None,
+        )
+
+        # Units resulting from arithmetic, keyed by their (numerator, denominator) base units.
+        # Sharing these means equal units are usually the same object, which is both smaller
+        # and keeps the lazily-computed names and types of each unit warm.
+        self._interned_units = {((), ()): self.dimensionless_unit}
+
+    def _read_definitions(self, definition_filename: str, expand: bool) -> None:
+        """Parse a JSON definition file into the unit lookup tables.
+
+        If expand is False, only the un-prefixed definitions are read, and prefixed units
+        are defined on demand by _resolve_unit_name.
+        """
         # Read definitions from file
         log.debug("Reading unit definitions from %s", definition_filename)
         with open(definition_filename) as fin:
@@ -52,9 +279,14 @@ class Registry:
         self.derived_types = {}
 
         # Read prefixes then process them later
-        prefixes = defs[PREFIX_KEY]
+        self._prefixes = defs[PREFIX_KEY]
         del defs[PREFIX_KEY]
 
+        # Un-prefixed definitions, keyed by unit name.  Each entry holds the position of the
+        # definition in the file (later definitions win when names clash), the unit type,
+        # and either a multiplier or a (numerator, denominator) tuple for derived types.
+        self._definitions = {}
+
         for utype, units in defs.items():
 
             # Create a forward index for the unit type
@@ -84,59 +316,258 @@ class Registry:
                         if "denominator" in multiplier
                         else [DIMENSIONLESS_UNIT_NAME]
                     )
+                    multiplier = (numerator_list, denominator_list)
 
-                    for prefix, prefix_multiplier in prefixes.items():
-                        self.derived_types[prefix + unit_name] = (
-                            [prefix + numerator_list[0]] + numerator_list[1:],
-                            denominator_list,
-                        )
-                        if prefix + unit_name in self.units:
-                            log.warning(
-                                "Detected duplicate unit in unit definition: %s",
-                                prefix + unit_name,
-                            )
-                        log.debug(
-                            "Adding derived type for unit: %s", prefix + unit_name
-                        )
-                        self.units.add(prefix + unit_name)
-                    continue
+                self._definitions[unit_name] = (len(self._definitions), utype, multiplier)
 
                 # and all prefix forms
-                for prefix, prefix_multiplier in prefixes.items():
-                    self.units_for_utype[utype][prefix + unit_name] = (
-                        prefix_multiplier * multiplier
-                    )
-                    self.utype_for_unit[prefix + unit_name] = utype
-                    if prefix + unit_name in self.units:
-                        log.warning(
-                            "Detected duplicate unit in unit definition: %s",
-                            prefix + unit_name,
-                        )
-                    log.debug(
-                        "Adding non-derived type for unit: %s of unit type %s",
-                        prefix + unit_name,
-                        utype,
-                    )
-                    self.units.add(prefix + unit_name)
+                if expand:
+                    for prefix in self._prefixes:
+                        self._define_unit(prefix, unit_name)
 
             # Check we have a base unit for the unit type
             if utype not in self.base_type_for_utype:
                 raise ValueError(f"No base unit defined for unit type {utype}")
 
-        if DIMENSIONLESS_UNIT_NAME not in self.units:
-            raise AssertionError(f"A unit with name '{DIMENSIONLESS_UNIT_NAME}' must be defined")
+    def _read_snapshot(self, snapshot_filename: str, source_hash: str) -> bool:
+        """Load unit lookup tables from a snapshot file.
 
-        self.dimensionless_unit = Unit(
-            [],
-            [],
-            self._get_base_unit(DIMENSIONLESS_UNIT_NAME),
-            self if self.link_to_registry else None,
-            None,
-        )
+        Returns False, leaving the registry untouched, if the snapshot does not exist, can't
+        be read (e.g. it is truncated or corrupt), or is stale and should be rebuilt.
+        """
+        try:
+            with open(snapshot_filename, "rb") as fin:
+                snapshot = pickle.load(fin)
+        except FileNotFoundError:
+            return False
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError) as e:
+            log.warning("Unable to read unit snapshot %s, which will be rebuilt: %s", snapshot_filename, e)
+            return False
+
+        if (
+            not isinstance(snapshot, dict)
+            or snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("source_hash") != source_hash
+        ):
+            log.info("Snapshot %s is out of date and will be rebuilt", snapshot_filename)
+            return False
+
+        log.debug("Reading unit tables from snapshot %s", snapshot_filename)
+        for table in SNAPSHOT_TABLES:
+            setattr(self, table, snapshot["tables"][table])
+        return True
+
+    def _write_snapshot(self, snapshot_filename: str, source_hash: str) -> None:
+        """Write the unit lookup tables to a snapshot file.
+
+        The file is written to a temporary name and moved into place, so that processes
+        starting concurrently never read a partially-written snapshot.
+        """
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "source_hash": source_hash,
+            "tables": {table: getattr(self, table) for table in SNAPSHOT_TABLES},
+        }
+
+        temp_filename = f"{snapshot_filename}.{os.getpid()}.tmp"
+        try:
+            with open(temp_filename, "wb") as fout:
+                pickle.dump(snapshot, fout, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, snapshot_filename)
+        except OSError as e:
+            log.warning("Unable to write unit snapshot to %s: %s", snapshot_filename, e)
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    def __getstate__(self) -> dict:
+        # Caches keyed on object identity are meaningless in another process, so are not pickled
+        state = self.__dict__.copy()
+        state["algebra_cache"] = LRUCache(self.algebra_cache.maxsize)
+        state["conversion_cache"] = LRUCache(self.conversion_cache.maxsize)
+        state["_stats"] = None
+
+        if self.name is not None:
+            # Units of named registries pickle by reference to the registry's name (see
+            # Unit.__reduce_ex__), which can't be resolved while the registry itself is being
+            # unpickled.  So leave out every unit, and recreate them on first use after unpickling
+            state = {key: value for key, value in state.items() if not isinstance(value, Unit)}
+            state["parse_cache"] = LRUCache(self.parse_cache.maxsize)
+            state["_named_units"] = {}
+            del state["_interned_units"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if "dimensionless_unit" not in state:
+            self._init_units()
+
+            # Make the name available to units pickled by reference to it, unless this process already
+            # has a registry of that name (e.g. one inherited by a forked worker)
+            _named_registries.setdefault(self.name, self)
+
+    def __getattr__(self, name: str) -> Unit:
+        """Resolve units that have not yet been defined on a lazy registry.
+
+        This is only called when normal attribute lookup fails, so units that
+        have already been used are returned without any overhead.
+        """
+        # Private names are never units, and may be requested before __init__ has run (e.g. by pickle)
+        if name.startswith("_") or "_definitions" not in self.__dict__:
+            raise AttributeError(name)
+
+        if not self._resolve_unit_name(name):
+            raise AttributeError(f"Unit '{name}' not found in registry")
+
+        unit = self.get_unit(name, support_expressions=False)
+        setattr(self, name, unit)
+        return unit
+
+    def _define_unit(self, prefix: str, unit_name: str) -> None:
+        """Add the prefixed form of a unit from the definition file to the lookup tables."""
+        _, utype, multiplier = self._definitions[unit_name]
+        prefixed_name = prefix + unit_name
+
+        if prefixed_name in self.units:
+            log.warning(
+                "Detected duplicate unit in unit definition: %s",
+                prefixed_name,
+            )
+
+        if isinstance(multiplier, tuple):
+            numerator_list, denominator_list = multiplier
+            self.derived_types[prefixed_name] = (
+                [prefix + numerator_list[0]] + numerator_list[1:],
+                denominator_list,
+            )
+            log.debug("Adding derived type for unit: %s", prefixed_name)
+        else:
+            self.units_for_utype[utype][prefixed_name] = (
+                self._prefixes[prefix] * multiplier
+            )
+            self.utype_for_unit[prefixed_name] = utype
+            log.debug(
+                "Adding non-derived type for unit: %s of unit type %s",
+                prefixed_name,
+                utype,
+            )
+        self.units.add(prefixed_name)
+
+    def _resolve_unit_name(self, unit_name: str) -> bool:
+        """Return True if the unit name is defined in this registry.
+
+        For lazy registries this splits off any prefix and defines the unit on first use.
+        Where more than one prefix/unit split is possible, the one defined last in the
+        definition file wins, as it would when expanding every prefix up-front.
+        """
+        if unit_name in self.units:
+            return True
+        if not self.lazy:
+            return False
+
+        split = self._split_prefix(unit_name)
+        if split is None:
+            return False
+
+        self._define_unit(*split)
+        return True
+
+    def _split_prefix(self, unit_name: str) -> Optional[Tuple[str, str]]:
+        """Return the (prefix, definition name) that a unit name is defined by, or None if there is none.
+
+        Where more than one split is possible, the one defined last in the definition file wins.
+        Definitions are never added or removed, so splits are remembered (but not failures, which
+        may be any string).
+        """
+        split = self._prefix_splits.get(unit_name)
+        if split is not None:
+            return split
+
+        best = None
+        for prefix_index, prefix in enumerate(self._prefixes):
+            if unit_name.startswith(prefix):
+                base_name = unit_name[len(prefix):]
+                if base_name in self._definitions:
+                    candidate = (self._definitions[base_name][0], prefix_index, prefix, base_name)
+                    if best is None or candidate > best:
+                        best = candidate
+
+        if best is None:
+            return None
+        split = self._prefix_splits[unit_name] = (best[2], best[3])
+        return split
+
+    def _exact_multiplier(self, base_unit: BaseUnit) -> Fraction:
+        """Return the multiplier of a base unit as a Fraction, from the exact values of its prefix and definition."""
+        split = self._split_prefix(base_unit.name)
+        if split is None or isinstance(self._definitions[split[1]][2], tuple):
+            return plex.exact(base_unit.multiplier)
+
+        prefix, unit_name = split
+        multiplier = self._exact_definitions.get(unit_name)
+        if multiplier is None:
+            multiplier = plex.exact(self._definitions[unit_name][2])
+        return plex.exact(self._prefixes[prefix]) * multiplier
+
+    def update_multipliers(self, unit_type: str, multipliers: Dict[str, Union[int, float, Decimal, Fraction]]) -> int:
+        """Change the multipliers of units in a dimension, e.g. to update exchange rates, in place.
 
-        # Define the "multiply method" on this registry
-        for unit_name in self.units:
-            setattr(self, unit_name, self.get_unit(unit_name))
+        multipliers maps the names of units in the definition file (without prefixes) to their new
+        multiplier into the base unit of the dimension, which may be a Decimal or Fraction to be
+        used exactly in conversions of quantities with such magnitudes (see pintless.exact), e.g.:
+
+            reg.update_multipliers("currency", {"EUR": 1.08, "GBP": 1.27})
+
+        Existing units and quantities of this registry convert at the new rates from then on,
+        as do prefixed forms of the units.  The registry's version is incremented and returned,
+        which invalidates any cached scales, conversion factors and parsed quantities.
+        Converters, compiled formulae and CSV readers keep the factors they were created with.
+
+        Updates can be made while other threads are converting quantities: conversions running
+        at the same time may use the old rates, but none are cached.
+        """
+        utype = unit_type if unit_type.startswith("[") else f"[{unit_type}]"
+        if utype not in self.units_for_utype:
+            raise ValueError(f"No unit type '{unit_type}' is defined in this registry")
+        for unit_name, multiplier in multipliers.items():
+            definition = self._definitions.get(unit_name)
+            if definition is None or definition[1] != utype or isinstance(definition[2], tuple):
+                raise ValueError(f"'{unit_name}' is not a (non-derived) unit defined in {utype}")
+            if not _valid_multiplier(multiplier):
+                raise ValueError(f"Multipliers must be positive, finite numbers, not {multiplier!r} (for '{unit_name}')")
+
+        # Update the definitions used for units that are defined later (by lazy registries)...
+        exact_multipliers = {unit_name: plex.exact(multiplier) for unit_name, multiplier in multipliers.items()}
+        multipliers = {
+            unit_name: multiplier if isinstance(multiplier, (int, float)) else float(multiplier)
+            for unit_name, multiplier in multipliers.items()
+        }
+        for unit_name, multiplier in multipliers.items():
+            position, _, _ = self._definitions[unit_name]
+            self._definitions[unit_name] = (position, utype, multiplier)
+        self._exact_definitions.update(exact_multipliers)
+
+        # ...and units that have already been defined, including the base units shared by all Unit objects
+        units = self.units_for_utype[utype]
+        suffixes = tuple(multipliers)
+        for prefixed_name in list(units):
+            if not prefixed_name.endswith(suffixes):
+                continue
+            split = self._split_prefix(prefixed_name)
+            if split is None or split[1] not in multipliers or self.utype_for_unit.get(prefixed_name) != utype:
+                continue
+            prefix, unit_name = split
+            units[prefixed_name] = self._prefixes[prefix] * multipliers[unit_name]
+            base_unit = self._base_units.get(prefixed_name)
+            if base_unit is not None:
+                base_unit.multiplier = units[prefixed_name]
+
+        # Bump the version once every multiplier has changed, so that nothing computed part-way
+        # through the update remains valid.  Clearing the caches then just frees the space
+        self.version += 1
+        self.algebra_cache.clear()
+        self.conversion_cache.clear()
+        self.parse_cache.clear()
+        return self.version
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         if len(args) != 1:
@@ -146,7 +577,255 @@ class Registry:
 
         return self.get_unit(args[0])
 
-    @lru_cache
+    def parse_many(
+        self,
+        strings: Iterable[str],
+        on_error: Optional[Callable[[int, str, Exception], None]] = None,
+    ) -> Iterator[pintless.quantity.Quantity]:
+        """Parse many quantity strings such as "4.2 kWh", yielding a Quantity for each.
+
+        Strings of the form "<number> <unit expression>" are split on the first space, and each
+        distinct unit expression is resolved only once.  Anything else is parsed in full, as reg(...)
+        would.  Strings that are just a unit (e.g. "kWh") are treated as one of that unit.
+
+        By default, the first bad string raises an error.  If on_error is given, bad strings are
+        instead passed to it along with their index and the error, and skipped.
+        """
+        for _, magnitude, unit in self._parse_rows(strings, None, on_error):
+            if unit is not None:
+                yield pintless.quantity.Quantity(magnitude, unit)
+
+    def parse_many_into(
+        self,
+        strings: Iterable[str],
+        target_unit: Union[str, Unit],
+        out: Optional[Any] = None,
+        on_error: Optional[Callable[[int, str, Exception], None]] = None,
+    ) -> Any:
+        """Parse many quantity strings, appending their magnitudes in target_unit to out.
+
+        out may be anything with an append() method, and defaults to a new array.array of doubles.
+        It is returned.  This avoids creating a Quantity per string: each distinct unit expression
+        is resolved, and its conversion factor computed, once.
+
+        As with parse_many, bad strings (including those in units that can't be converted to the
+        target unit) raise an error unless on_error is given.  If it is, they are reported to it
+        and a NaN is appended in their place, so that out stays aligned with the input.
+        """
+        target_unit = self._unit_for(target_unit)
+        if out is None:
+            out = array("d")
+
+        append = out.append
+        for _, magnitude, unit in self._parse_rows(strings, target_unit, on_error):
+            append(magnitude if unit is not None else float("nan"))
+        return out
+
+    def _parse_rows(
+        self,
+        strings: Iterable[str],
+        target_unit: Optional[Unit],
+        on_error: Optional[Callable[[int, str, Exception], None]],
+    ) -> Iterator[Tuple[int, Any, Optional[Unit]]]:
+        """Yield (index, magnitude, unit) for each quantity string.
+
+        If target_unit is given, magnitudes are converted into it.  Bad rows are yielded with a unit
+        of None after being passed to on_error, or raise if on_error is None.
+        """
+        # Unit expression -> (unit, conversion factor to the target), or None if the expression
+        # can't be handled by splitting off the number
+        units = {}
+
+        for i, string in enumerate(strings):
+            try:
+                number, _, unit_expr = string.strip().partition(" ")
+                if unit_expr in units:
+                    parsed_unit = units[unit_expr]
+                else:
+                    parsed_unit = self._parse_row_unit(unit_expr, target_unit)
+                    if len(units) < MAX_PARSED_UNIT_STRINGS:
+                        units[unit_expr] = parsed_unit
+
+                magnitude = None
+                if parsed_unit is not None:
+                    try:
+                        magnitude = _parse_number(number)
+                    except ValueError:
+                        pass
+
+                if magnitude is not None:
+                    unit, conversion_factor = parsed_unit
+                    if conversion_factor != 1:
+                        magnitude *= conversion_factor
+                else:
+                    # Fall back to the full parser, e.g. for "(4) * (7 kWh)"
+                    quantity = self.get_unit(string)
+                    if isinstance(quantity, Unit):
+                        quantity = pintless.quantity.Quantity(1, quantity)
+                    if target_unit is not None:
+                        quantity = quantity.to(target_unit)
+                    magnitude, unit = quantity.magnitude, quantity.unit
+
+            except (errors.UndefinedUnitError, ValueError, TypeError) as e:
+                if on_error is None:
+                    raise
+                on_error(i, string, e)
+                magnitude, unit = None, None
+
+            yield i, magnitude, unit
+
+    def _parse_row_unit(
+        self, unit_expr: str, target_unit: Optional[Unit]
+    ) -> Optional[Tuple[Unit, float]]:
+        """Resolve the unit part of a quantity string, and its conversion factor to target_unit.
+
+        Returns None if the expression isn't a plain unit, so the whole string must be parsed instead.
+        """
+        try:
+            unit = self.get_unit(unit_expr)
+        except (errors.UndefinedUnitError, ValueError):
+            return None
+        if not isinstance(unit, Unit):
+            return None
+
+        if target_unit is None:
+            return unit, 1
+        return target_unit, unit.conversion_factor(target_unit)
+
+    def process_pool(self, max_workers: Optional[int] = None, mp_context: Optional[Any] = None) -> Any:
+        """Return a concurrent.futures.ProcessPoolExecutor whose workers each hold a copy of this registry.
+
+        Pass this as executor to parallel_to() and parallel_parse() to reuse one pool across many
+        calls, rather than starting a new one each time.  Close it with shutdown(), or use it as a
+        context manager.  mp_context is a multiprocessing context used to start the workers (e.g.
+        multiprocessing.get_context("spawn")), by default that of the current start method.
+        """
+        import pintless.parallel as plp
+        return plp.process_pool(self, max_workers, mp_context)
+
+    def parallel_to(
+        self,
+        quantity: pintless.quantity.Quantity,
+        target_unit: Union[str, Unit],
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Any] = None,
+    ) -> pintless.quantity.Quantity:
+        """Convert a Quantity with list magnitudes, or a QuantityArray, to target_unit using many processes.
+
+        The result is as from quantity.to(target_unit).  The magnitudes are split into chunks of
+        chunk_size, which are converted by a pool of max_workers processes (by default, one per CPU),
+        or by executor if given (see process_pool()).
+        """
+        import pintless.parallel as plp
+        return plp.parallel_to(self, quantity, target_unit, chunk_size, max_workers, executor)
+
+    def parallel_parse(
+        self,
+        strings: Iterable[str],
+        target_unit: Optional[Union[str, Unit]] = None,
+        on_error: Optional[Callable[[int, str, Exception], None]] = None,
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        executor: Optional[Any] = None,
+    ) -> Union[List[pintless.quantity.Quantity], array]:
+        """Parse many quantity strings using many processes.
+
+        With no target_unit, this returns a list of Quantities as list(parse_many(strings, on_error))
+        would.  With a target_unit, this returns an array of magnitudes in that unit, as
+        parse_many_into(strings, target_unit, on_error=on_error) would.  on_error is called in this
+        process, in order, once all strings are parsed.  chunk_size, max_workers and executor are as
+        for parallel_to().
+        """
+        import pintless.parallel as plp
+        return plp.parallel_parse(self, strings, target_unit, on_error, chunk_size, max_workers, executor)
+
+    def enable_stats(self, callback: Optional[Callable[[str, float], None]] = None) -> None:
+        """Start counting unit allocations, simplifications, parses and conversions for this registry.
+
+        If callback is given, it is called with the name of the counter and the duration in seconds
+        of each counted call.  This has no cost until enabled: see pintless.instrumentation.
+        """
+        import pintless.instrumentation as plin
+        plin.enable(self, callback)
+
+    def disable_stats(self) -> None:
+        """Stop counting calls for this registry."""
+        import pintless.instrumentation as plin
+        plin.disable(self)
+
+    def stats(self) -> dict:
+        """Return counts of calls (if enabled with enable_stats()), and hit rates for each cache."""
+        import pintless.instrumentation as plin
+        return plin.stats(self)
+
+    def converter(self, source_unit: Union[str, Unit], target_unit: Union[str, Unit]) -> Converter:
+        """Return a callable that converts raw magnitudes from source_unit to target_unit.
+
+        Both units are resolved, and the conversion factor computed, once:
+
+            to_metres_per_second = reg.converter("mile/hour", "m/s")
+            to_metres_per_second(60)                    # 26.8...
+            to_metres_per_second.convert_many(speeds)   # list of floats
+            to_metres_per_second.convert_into(buffer)   # in place, e.g. an array.array("d")
+        """
+        return Converter(self._unit_for(source_unit), self._unit_for(target_unit))
+
+    def compile(
+        self, expression: str, /, to: Optional[Union[str, Unit]] = None, **variable_units: Union[str, Unit]
+    ) -> Callable[..., Any]:
+        """Return a function evaluating a formula over raw magnitudes, with the unit algebra done once.
+
+        The formula is a unit expression (see get_unit) in which each keyword argument names a
+        variable, and gives the unit of its magnitudes.  The returned function takes the variables'
+        magnitudes as arguments, in the order given here, and returns the result in the unit `to`
+        (or, by default, the unit that the formula produces).  Dimensions are checked, and all
+        conversion factors are folded into one constant, when the formula is compiled:
+
+            energy_density = reg.compile("a * b / c", to="joule / m**3", a="kW", b="hour", c="m**3")
+            energy_density(2, 3, 4)                      # 5400000.0
+            energy_density.many(powers, hours, volumes)  # array('d', ...), from equal-length iterables
+            energy_density.unit                          # the output unit
+
+        The function also works on numpy arrays.  Its folded constant is available as .factor.
+        Variables take precedence over units with the same name, and cannot be called "to".
+        """
+        import pintless.formula as plf
+        return plf.compile_formula(self, expression, to, variable_units)
+
+    def wraps(
+        self,
+        ret: Optional[Union[str, Unit, Iterable[Optional[Union[str, Unit]]]]],
+        args: Optional[Union[str, Unit, Iterable[Optional[Union[str, Unit]]]]],
+        strict: bool = True,
+    ) -> Callable[[Callable], Callable]:
+        """Return a decorator that lets a function over raw magnitudes take and return Quantities.
+
+        args gives the unit of each of the function's leading positional arguments (whether they
+        are passed by position or keyword), or None for arguments to pass through unchanged.
+        Quantities are converted to these units, and their magnitudes passed to the function.
+        If strict is False, plain numbers are passed through as if already in the right unit;
+        otherwise they raise TypeError.  The result is returned as a Quantity in the unit ret, or
+        as a tuple if ret is a sequence of units, or unchanged if ret is None:
+
+            @reg.wraps(ret="watt", args=("joule", "second"))
+            def power(energy, duration):
+                return energy / duration
+
+        Units are resolved when the function is decorated, so each call costs an identity check
+        per argument, plus a multiply for arguments in other units.
+        """
+        import pintless.wrapping as plw
+        return plw.wraps(self, ret, args, strict)
+
+    def _unit_for(self, unit: Union[str, Unit]) -> Unit:
+        """Return a Unit from either a unit or a unit expression without any numbers in it."""
+        if isinstance(unit, str):
+            unit = self.get_unit(unit)
+        if not isinstance(unit, Unit):
+            raise ValueError(f"Expected a unit, but got {unit!r} (this may happen if a string expression has numbers in it)")
+        return unit
+
     def get_unit(
         self, unit_name: str, support_expressions: bool = True
     ) -> Union[Unit, pintless.quantity.Quantity]:
@@ -161,15 +840,39 @@ class Registry:
             second * second
             hour * watt * Hz
 
+        Units for defined names are kept for the life of the registry, and the results of
+        parsing expressions are kept in reg.parse_cache.
         """
-        if unit_name not in self.units:
+        unit = self._named_units.get(unit_name)
+        if unit is not None:
+            return unit
+
+        if not self._resolve_unit_name(unit_name):
             # We may have a unit that is an expression.
 
             if support_expressions:
-                return self._parse_unit_expression(unit_name)
+                # Cached as (registry version, result), as quantities depend on the multipliers of units
+                version = self.version
+                cached = self.parse_cache.get(unit_name)
+                if cached is not None and cached[0] == version:
+                    result = cached[1]
+                else:
+                    result = self._parse_unit_expression(unit_name)
+                    self.parse_cache.put(unit_name, (version, result))
+
+                # Quantities are mutable (e.g. with ito()), so never hand out the cached one
+                if isinstance(result, pintless.quantity.Quantity):
+                    return pintless.quantity.Quantity(result.magnitude, result.unit)
+                return result
 
             raise errors.UndefinedUnitError(f"Unit '{unit_name}' not round in registry")
 
+        unit = self._build_named_unit(unit_name)
+        self._named_units[unit_name] = unit
+        return unit
+
+    def _build_named_unit(self, unit_name: str) -> Unit:
+        """Create the Unit for a name defined in this registry."""
         # Load either a derived type or a basic type
         if unit_name in self.derived_types:
             numerator_unit_list, denominator_unit_list = self.derived_types[unit_name]
@@ -186,9 +889,48 @@ class Registry:
             unit_name,
         )
 
-    @lru_cache
+    def unit_from_descriptor(self, descriptor: Union[str, Tuple[Iterable[str], Iterable[str]]]) -> Unit:
+        """Return the unit described by the output of Unit.descriptor(), which may be from another registry.
+
+        Descriptors that have been through JSON (with lists in place of tuples) are accepted.
+        """
+        if isinstance(descriptor, str):
+            return self.get_unit(descriptor, support_expressions=False)
+
+        numerator_names, denominator_names = descriptor
+        for name in (*numerator_names, *denominator_names):
+            if not self._resolve_unit_name(name):
+                raise errors.UndefinedUnitError(f"Unit '{name}' not found in registry")
+        return self._intern_unit(
+            [self._get_base_unit(name) for name in numerator_names],
+            [self._get_base_unit(name) for name in denominator_names],
+        )
+
+    def _intern_unit(
+        self, numerator_units: List[BaseUnit], denominator_units: List[BaseUnit]
+    ) -> Unit:
+        """Return the shared Unit made of the (simplified) numerator and denominator base units given,
+        creating it on first use."""
+        key = (tuple(numerator_units), tuple(denominator_units))
+        unit = self._interned_units.get(key)
+        if unit is None:
+            unit = Unit(
+                numerator_units,
+                denominator_units,
+                self.dimensionless_unit.dimensionless_base_unit,
+                self if self.link_to_registry else None,
+                self.dimensionless_unit,
+            )
+            self._interned_units[key] = unit
+        return unit
+
     def _get_base_unit(self, base_unit_name: str) -> BaseUnit:
         """Return a simple base unit type.  Used to construct units."""
+        base_unit = self._base_units.get(base_unit_name)
+        if base_unit is not None:
+            return base_unit
+
+        self._resolve_unit_name(base_unit_name)
         if base_unit_name in self.derived_types:
             raise ValueError(
                 f"Cannot instantiate base unit '{base_unit_name}', as it is a derived type"
@@ -199,7 +941,15 @@ class Registry:
         base_type = self.base_type_for_utype[unit_type]
         multiplier = self.units_for_utype[unit_type][base_unit_name]
 
-        return BaseUnit(base_unit_name, unit_type, base_type, multiplier)
+        base_unit = BaseUnit(
+            base_unit_name,
+            unit_type,
+            base_type,
+            multiplier,
+            self._dimension_vectors[unit_type],
+        )
+        self._base_units[base_unit_name] = base_unit
+        return base_unit
 
     def _parse_unit_expression(
         self, unit_expr: str
@@ -207,56 +957,45 @@ class Registry:
         """Parse an expression containing the following tokens:
 
          - unit name (any string without spaces)
+         - number, which makes the result a Quantity
          - *, to multiply units
          - /, to divide units
+         - ** or ^, to raise units to integer powers
          - ' ' (a space), to multiply units
          - '(' and ')', to define order of operation
-
-        Because we are dealing with multiply and divide operations only,
-        the need to resolve a full parse tree isn't there: we can simply
-        walk through the operations left-to-right.
         """
-        def type_for_token(token: str) -> Union[Unit, pintless.quantity.Quantity, str]:
-            """Tokenise the string, returning a token."""
-            if token in ("*", ""):
-                return MULTIPLY_TOKEN
-            if token == "/":
-                return DIVIDE_TOKEN
-            if token == "(":
-                return OPEN_EXPR_TOKEN
-            if token == ")":
-                return CLOSE_EXPR_TOKEN
-            if token in self.units:
+        def type_for_token(token: str) -> Union[Unit, pintless.quantity.Quantity]:
+            if self._resolve_unit_name(token):
                 return self.get_unit(token, support_expressions=False)
 
             # Else
             try:
-                if token.isdigit() or (
-                    len(token) > 1 and token[0] == "-" and token[1:].isdigit()
-                ):
-                    magnitude = int(token)
-                else:
-                    magnitude = float(token)
-                return pintless.quantity.Quantity(magnitude, self.dimensionless_unit)
+                return pintless.quantity.Quantity(_parse_number(token), self.dimensionless_unit)
             except ValueError:
                 raise errors.UndefinedUnitError(f"Unit '{token}' not found in registry")
 
-        # Replace * and / with whitespace separated versions, then split on whitespace.
-        # Saves use of regex libs
-        unit_expr = (
-            unit_expr.replace("*", " * ")
-            .replace("/", " / ")
-            .replace("(", " ( ")
-            .replace(")", " ) ")
-        )
-        parts = unit_expr.split()
-        parts = [type_for_token(s.strip()) for s in parts]
-        log.debug("Parsed expression into component parts: %s", parts)
-
         # Empty expressions are dimensionless
-        if len(parts) == 0:
+        if not unit_expr.split():
             return self.get_unit(DIMENSIONLESS_UNIT_NAME)
 
+        return self._parse_expression(unit_expr, type_for_token)
+
+    def _parse_expression(self, expression: str, type_for_token: Callable[[str], Any]) -> Any:
+        """Parse and evaluate an expression using *, /, **, spaces (for multiplication) and brackets.
+
+        Every other token is passed to type_for_token, and the values it returns are combined using
+        Python's *, / and ** operators.  Exponents must evaluate to dimensionless Quantities.  This
+        is shared by unit expressions and compiled formulae (see pintless.formula).
+        """
+        # Operators are returned as strings, and operands never are
+        parts = [
+            OPERATOR_TOKENS[token] if token in OPERATOR_TOKENS else type_for_token(token)
+            for token in _tokenize_expression(expression)
+        ]
+        log.debug("Parsed expression into component parts: %s", parts)
+        if len(parts) == 0:
+            raise ValueError("Cannot parse an empty expression")
+
         # Implicit multiplication --- insert multiplication tokens between any tokens that don't
         # currently have them
         new_parts = []
@@ -264,12 +1003,7 @@ class Registry:
             new_parts.append(a)
 
             # already there, get skipped
-            if (
-                a in (MULTIPLY_TOKEN, DIVIDE_TOKEN, OPEN_EXPR_TOKEN)
-                or b in (MULTIPLY_TOKEN, DIVIDE_TOKEN, CLOSE_EXPR_TOKEN)
-                or (a == OPEN_EXPR_TOKEN and b == OPEN_EXPR_TOKEN)
-                or (a == CLOSE_EXPR_TOKEN and b == CLOSE_EXPR_TOKEN)
-            ):
+            if (isinstance(a, str) and a != CLOSE_EXPR_TOKEN) or (isinstance(b, str) and b != OPEN_EXPR_TOKEN):
                 continue
             # Else
             new_parts.append(MULTIPLY_TOKEN)
@@ -277,29 +1011,30 @@ class Registry:
 
         parts = new_parts
 
-        # Shunting yard implementation to order the operations
+        # Shunting yard implementation to order the operations.  Powers bind more tightly than
+        # multiplication and division, and are right-associative
         ops = []  # stack
         output_queue = []
         parts.reverse()  # It's more efficient to do this than to take from the front
         while len(parts) > 0:
             token = parts.pop()
 
-            if token in (DIVIDE_TOKEN, MULTIPLY_TOKEN):
+            if not isinstance(token, str):  # either a Quantity or a Unit
+                output_queue.append(token)
+            elif token in (DIVIDE_TOKEN, MULTIPLY_TOKEN):
                 while len(ops) > 0 and ops[-1] != OPEN_EXPR_TOKEN:
                     output_queue.append(ops.pop())
                 ops.append(token)
-            elif token == OPEN_EXPR_TOKEN:
+            elif token in (POWER_TOKEN, OPEN_EXPR_TOKEN):
                 ops.append(token)
-            elif token == CLOSE_EXPR_TOKEN:
+            else:  # CLOSE_EXPR_TOKEN
                 if len(ops) == 0:
                     raise ValueError("Parenthesis mismatch: closed but never opened")
-                while ops[-1] != OPEN_EXPR_TOKEN:
+                while len(ops) > 0 and ops[-1] != OPEN_EXPR_TOKEN:
                     output_queue.append(ops.pop())
-                if ops[-1] != OPEN_EXPR_TOKEN:
-                    raise ValueError("Parenthesis mismatch")
+                if len(ops) == 0:
+                    raise ValueError("Parenthesis mismatch: closed but never opened")
                 ops.pop()  # Discard open paren
-            else:  # either a Quantity or a Unit
-                output_queue.append(token)
 
         # Clean up by moving remaining ops onto the output queue
         while len(ops) > 0:
@@ -309,22 +1044,34 @@ class Registry:
 
         operands = []
         for op in output_queue:
+            if not isinstance(op, str):
+                operands.append(op)
+                continue
+
+            if len(operands) < 2:
+                raise ValueError(f"Expected two operands for {op.strip('_')} operation but got {len(operands)}")
+            b = operands.pop()
+            a = operands.pop()
             if op == DIVIDE_TOKEN:
-                if len(operands) < 2:
-                    raise ValueError(f"Expected two operands for divide operation but got {len(operands)}")
-                b = operands.pop()
-                a = operands.pop()
                 operands.append(a / b)
             elif op == MULTIPLY_TOKEN:
-                if len(operands) < 2:
-                    raise ValueError(f"Expected two operands for divide operation but got {len(operands)}")
-                b = operands.pop()
-                a = operands.pop()
                 operands.append(a * b)
             else:
-                operands.append(op)
+                operands.append(a ** self._exponent(b))
 
         if len(operands) != 1:
-            raise ValueError(f"Incomplete expression: {unit_expr} --- some tokens remained after evaluation: {operands[1:]}")
+            raise ValueError(f"Incomplete expression: {expression} --- some tokens remained after evaluation: {operands[1:]}")
 
         return operands[0]
+
+    def _exponent(self, operand: Any) -> Union[int, float]:
+        """Return the number that a parsed operand represents, for use as an exponent."""
+        if (
+            not isinstance(operand, pintless.quantity.Quantity)
+            or not isinstance(operand.magnitude, (int, float))
+            or any(operand.unit.dimensions)
+        ):
+            raise ValueError(f"Exponents must be numbers, not {operand}")
+
+        conversion_factor = operand.unit.conversion_factor(self.dimensionless_unit)
+        return operand.magnitude if conversion_factor == 1 else operand.magnitude * conversion_factor
@@ -0,0 +1,152 @@
+"""
+Quantity arrays whose magnitudes live in shared memory, so that many processes can read them
+without each holding a copy.
+
+The shared memory block holds a small header describing the unit, type and number of the
+magnitudes, followed by the magnitudes themselves.  Any process with a registry using the same
+definitions can attach to it by name:
+
+    # In the parent process
+    shared = SharedQuantityArray.create(magnitudes, reg.kWh)
+    ... pass shared.name (or shared itself, which pickles by name) to workers ...
+    shared.close()
+    shared.unlink()
+
+    # In a worker
+    shared = SharedQuantityArray.attach(name)
+    total = sum(shared.m_as("joule"))
+    shared.close()
+
+As with multiprocessing.shared_memory, every process should close() the array once it has finished
+with it, and exactly one process should unlink() it to free the memory.
+"""
+from __future__ import annotations
+import json
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional, Union
+
+import pintless.registry as plr
+import pintless.unit as plu
+from .quantity_array import QuantityArray, _as_values
+
+# The header is its length (as an unsigned 64-bit int), then JSON.  Magnitudes start at the next
+# multiple of DATA_ALIGNMENT bytes
+_HEADER_LENGTH = struct.Struct("<Q")
+DATA_ALIGNMENT = 64
+
+
+class SharedQuantityArray(QuantityArray):
+    """
+    A QuantityArray whose magnitudes are a view of a multiprocessing.shared_memory block.
+
+    Create these with create() or attach() rather than directly.  Reading and converting the
+    magnitudes works as for any QuantityArray: conversions produce new (unshared) arrays.
+    Magnitudes can be written in place, and the change is seen by all processes, but ito() is
+    not supported as the other processes would not see the change of unit.
+
+    Pickling a SharedQuantityArray sends only the name of its shared memory block, so it is
+    attached to (not copied) when unpickled in another process.
+    """
+
+    __slots__ = ("shared_memory",)
+
+    def __init__(
+        self,
+        shared_memory: SharedMemory,
+        unit: Optional[plu.Unit] = None,
+        registry: Optional[plr.Registry] = None,
+    ) -> None:
+        header_length = _HEADER_LENGTH.unpack_from(shared_memory.buf)[0]
+        header_end = _HEADER_LENGTH.size + header_length
+        header = json.loads(bytes(shared_memory.buf[_HEADER_LENGTH.size:header_end]))
+
+        if unit is None:
+            if registry is None:
+                registry = plr.get_registry()
+            unit = registry.unit_from_descriptor(header["unit"])
+
+        offset = _data_offset(header_length)
+        magnitudes = shared_memory.buf[offset:offset + header["nbytes"]].cast(header["format"])
+
+        self.shared_memory = shared_memory
+        super().__init__(magnitudes, unit)
+
+    @classmethod
+    def create(cls, magnitudes: Any, unit: plu.Unit, name: Optional[str] = None) -> SharedQuantityArray:
+        """Copy magnitudes into a new shared memory block (named name, if given) and return it as an array.
+
+        magnitudes may be anything accepted by QuantityArray, e.g. an array.array or a list of floats.
+        """
+        if not isinstance(unit, plu.Unit):
+            raise TypeError(f"Expected a Unit, got {unit!r}")
+
+        source = memoryview(_as_values(magnitudes))
+        header = json.dumps(
+            {"unit": unit.descriptor(), "format": source.format, "nbytes": source.nbytes}
+        ).encode()
+        offset = _data_offset(len(header))
+
+        # Shared memory blocks can't be empty
+        shared_memory = SharedMemory(name=name, create=True, size=max(1, offset + source.nbytes))
+        try:
+            _HEADER_LENGTH.pack_into(shared_memory.buf, 0, len(header))
+            shared_memory.buf[_HEADER_LENGTH.size:_HEADER_LENGTH.size + len(header)] = header
+            shared_memory.buf[offset:offset + source.nbytes] = source.cast("B")
+            return cls(shared_memory, unit)
+        except BaseException:
+            shared_memory.close()
+            shared_memory.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, name: str, registry: Optional[plr.Registry] = None) -> SharedQuantityArray:
+        """Attach to an array created (possibly in another process) by create().
+
+        The unit is found in the registry given, or the default registry (see get_registry()).
+        """
+        return cls(SharedMemory(name=name), registry=registry)
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block, used to attach() to it"""
+        return self.shared_memory.name
+
+    def close(self) -> None:
+        """Detach from the shared memory.  The magnitudes can't be used after this.
+
+        This fails with BufferError if other views of the magnitudes (e.g. from slicing) still exist.
+        """
+        if isinstance(self.magnitude, memoryview):
+            self.magnitude.release()
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it.  Call this in one process only."""
+        self.shared_memory.unlink()
+
+    def __enter__(self) -> SharedQuantityArray:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def ito(self, target_unit: Union[str, plu.Unit]) -> None:
+        raise TypeError("Shared arrays can't be converted in place, as other processes share the unit: use to()")
+
+    def __reduce_ex__(self, protocol: int) -> Any:
+        registry = self.unit.registry
+        return _attach, (self.name, registry.name if registry is not None else None)
+
+    def __repr__(self) -> str:
+        return f"<SharedQuantityArray('{self.name}', {len(self)} values, '{self.unit.name}')>"
+
+
+def _data_offset(header_length: int) -> int:
+    end = _HEADER_LENGTH.size + header_length
+    return -(-end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+
+
+def _attach(name: str, registry_name: Optional[str]) -> SharedQuantityArray:
+    """Unpickle a SharedQuantityArray by attaching to it, using the registry with the name given (or the default)."""
+    return SharedQuantityArray.attach(name, plr.get_registry(registry_name or plr.DEFAULT_REGISTRY_NAME))
@@ -1,8 +1,14 @@
 from __future__ import annotations
-from typing import Union, List, Tuple, Optional
-from functools import lru_cache
+from array import array
+from fractions import Fraction
+from itertools import chain
+from typing import Any, Dict, Iterable, Union, List, Tuple, Optional
+import operator
+
+import pintless.exact as plex
 
 from .quantity import Quantity
+from .quantity_array import QuantityArray
 import pintless.registry
 
 ValidMagnitude = Union[int, float, complex]
@@ -15,20 +21,33 @@ class BaseUnit:
 
     - A unit (e.g. millimeter), and a dimension (e.g. length).
     - A base unit (e.g. meter) and a multiplier to convert from this unit into that base unit.
-    - A reference to the dimensionless unit
+    - A vector of exponents over the dimensions of the registry, with a 1 for this unit's dimension.
+      Dimensionless units are all zeros.
 
     This represents _part of_ a unit in the system: a full unit expression could be something that
     combines these building blocks using multiplication and division, e.g. ms/hour
     (i.e. meters * seconds / hours).
     """
 
+    __slots__ = ("name", "unit_type", "base_unit", "multiplier", "dimensions", "_hash")
+
     def __init__(
-        self, name: str, unit_type: str, base_unit: str, multiplier: Numeric
+        self,
+        name: str,
+        unit_type: str,
+        base_unit: str,
+        multiplier: Numeric,
+        dimensions: Tuple[int, ...],
     ) -> None:
         self.name = name
         self.unit_type = unit_type
         self.base_unit = base_unit
         self.multiplier = multiplier
+        self.dimensions = dimensions
+
+        # Base units are used as keys when interning units, so precompute the hash.  This leaves out
+        # the multiplier, which may be updated in place (see Registry.update_multipliers)
+        self._hash = hash((self.name, self.unit_type, self.base_unit))
 
     def conversion_factor(self, target_unit: BaseUnit) -> float:
         """Return k such that a value in this unit * k = a value in target_unit."""
@@ -42,6 +61,13 @@ class BaseUnit:
         conversion_factor = self.multiplier * 1 / target_unit.multiplier
         return conversion_factor
 
+    def __reduce__(self):
+        # Rebuild rather than copy state, as the cached hash differs between processes
+        return (
+            BaseUnit,
+            (self.name, self.unit_type, self.base_unit, self.multiplier, self.dimensions),
+        )
+
     def __repr__(self) -> str:
         return self.__str__()
 
@@ -49,7 +75,7 @@ class BaseUnit:
         return f"<BaseUnit('{self.name} = {self.multiplier} * {self.base_unit}')>"
 
     def __hash__(self) -> int:
-        return hash((self.name, self.unit_type, self.base_unit, self.multiplier))
+        return self._hash
 
     def __eq__(self, __o: object) -> bool:
         """Units are the same if their multiplier, base unit, and dimension are the same."""
@@ -73,6 +99,21 @@ class Unit:
     that would result with value calculations, e.g. m/s divided by s == m.
     """
 
+    __slots__ = (
+        "registry",
+        "dimensionless_base_unit",
+        "dimensionless_unit",
+        "numerator_units",
+        "denominator_units",
+        "_numerator_unit_types",
+        "_denominator_unit_types",
+        "_unit_type",
+        "_dimensions",
+        "_scale",
+        "_name",
+        "_hash",
+    )
+
     def __init__(
         self,
         numerator_units: List[BaseUnit],
@@ -109,9 +150,50 @@ class Unit:
         self._numerator_unit_types = None
         self._denominator_unit_types = None
         self._unit_type = None
+        self._dimensions = None
+        self._scale = None
 
         # If this is None, it will be generated on first access
         self._name = alias
+        self._hash = None
+
+    def descriptor(self) -> Union[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """
+        Return a description of this unit that can be used to find it in another registry with
+        the same definitions (e.g. in another process), using Registry.unit_from_descriptor().
+
+        Units with a name in the registry (e.g. kWh) are described by that name, keeping the
+        alias.  Others are described by the names of their numerator and denominator base units.
+        Parsing self.name instead would lose any scaled dimensionless units, e.g. in
+        1/kilodimensionless.
+        """
+        registry = self.registry
+        if self._name is not None and registry is not None and registry._named_units.get(self._name) is self:
+            return self._name
+
+        dimensionless_base_unit = self.dimensionless_base_unit
+        return (
+            tuple(u.name for u in self.numerator_units if u is not dimensionless_base_unit),
+            tuple(u.name for u in self.denominator_units if u is not dimensionless_base_unit),
+        )
+
+    def __reduce_ex__(self, protocol: int) -> Any:
+        # Units of named registries are pickled by reference, so that the registry isn't copied
+        registry = self.registry
+        if registry is not None and registry.name is not None:
+            return _unit_from_registry, (registry.name, self.descriptor())
+        return super().__reduce_ex__(protocol)
+
+    def __getstate__(self) -> dict:
+        # The hash depends on per-process string hashing, so is recomputed after unpickling
+        return {
+            slot: getattr(self, slot) for slot in Unit.__slots__ if slot != "_hash"
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._hash = None
 
     @property
     def numerator_unit_types(self) -> Tuple[str]:
@@ -139,6 +221,68 @@ class Unit:
         self._unit_type = f"{'*'.join(self.numerator_unit_types)}/{'*'.join(self.denominator_unit_types)}"
         return self._unit_type
 
+    @property
+    def dimensions(self) -> Tuple[int, ...]:
+        """
+        The exponent of each of the registry's dimensions in this unit, e.g. 1 for length and -1
+        for time in m/s.  Units can be converted between one another if their dimensions are equal.
+        """
+        if self._dimensions is not None:
+            return self._dimensions
+
+        dimensions = self.dimensionless_base_unit.dimensions
+        for u in self.numerator_units:
+            dimensions = tuple(map(operator.add, dimensions, u.dimensions))
+        for u in self.denominator_units:
+            dimensions = tuple(map(operator.sub, dimensions, u.dimensions))
+
+        self._dimensions = dimensions
+        return self._dimensions
+
+    @property
+    def scale(self) -> float:
+        """The size of this unit in the base units of its dimensions, e.g. 1000 for km, or 1/3.6 for km/hour"""
+        # Cached as (registry version, scale), as multipliers change when the registry is updated
+        version = 0 if self.registry is None else self.registry.version
+        cached = self._scale
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        numerator_scale = 1
+        for u in self.numerator_units:
+            numerator_scale *= u.multiplier
+        denominator_scale = 1
+        for u in self.denominator_units:
+            denominator_scale *= u.multiplier
+
+        scale = numerator_scale / denominator_scale
+        self._scale = (version, scale)
+        return scale
+
+    @property
+    def exact_scale(self) -> Fraction:
+        """The scale of this unit as a Fraction, exactly as defined in the registry (see pintless.exact)"""
+        registry = self.registry
+        if registry is None:
+            exact_multiplier = plex.exact_multiplier
+        else:
+            version = registry.version
+            key = (id(self), "exact_scale")
+            cached = registry.conversion_cache.get(key)
+            if cached is not None and cached[3] == version:
+                return cached[2]
+            exact_multiplier = registry._exact_multiplier
+
+        scale = Fraction(1)
+        for u in self.numerator_units:
+            scale *= exact_multiplier(u)
+        for u in self.denominator_units:
+            scale /= exact_multiplier(u)
+
+        if registry is not None:
+            registry.conversion_cache.put(key, (self, None, scale, version))
+        return scale
+
     @property
     def name(self) -> str:
         """
@@ -169,7 +313,7 @@ class Unit:
         return self._name
 
     def simplify(
-        self, numerator_units: List[BaseUnit], denominator_units: List[BaseUnit]
+        self, numerator_units: Iterable[BaseUnit], denominator_units: Iterable[BaseUnit]
     ) -> Tuple[List[BaseUnit], List[BaseUnit], float]:
         """
         Cancel denominator and numerator units, resulting in the simplest
@@ -180,60 +324,147 @@ class Unit:
         the method returns two items: a conversion factor that operates in the same way
         as .conversion_factor(), and the resulting Unit instance itself.
         """
-        def first_index(lst: List[BaseUnit], unit_type: str) -> Optional[int]:
-            """Return the index of the first item out of lst that is of the unit type unit_type"""
-            for i, u in enumerate(lst):
-                if u.unit_type == unit_type:
-                    return i
-            return None
-
-        # Remove dimensionless units.
-        numerator_units = [
-            u
-            for u in numerator_units
-            if not (
-                u.unit_type == self.dimensionless_base_unit.unit_type
-                and u.multiplier == 1
+        dimensionless_type = self.dimensionless_base_unit.unit_type
+
+        # Bucket units by unit type, i.e. by dimension, keeping their order within each bucket.
+        # Dimensionless units are removed from the numerator, and unscaled ones from the denominator
+        numerator_buckets: Dict[str, List[BaseUnit]] = {}
+        for u in numerator_units:
+            if u.unit_type != dimensionless_type:
+                bucket = numerator_buckets.get(u.unit_type)
+                if bucket is None:
+                    numerator_buckets[u.unit_type] = [u]
+                else:
+                    bucket.append(u)
+
+        denominator_buckets: Dict[str, List[BaseUnit]] = {}
+        for u in denominator_units:
+            if not (u.unit_type == dimensionless_type and u.multiplier == 1):
+                bucket = denominator_buckets.get(u.unit_type)
+                if bucket is None:
+                    denominator_buckets[u.unit_type] = [u]
+                else:
+                    bucket.append(u)
+
+        # Cancel units of the same type pairwise, in order, and list the rest ordered by unit type
+        new_numerator: List[BaseUnit] = []
+        new_denominator: List[BaseUnit] = []
+        conversion_factor = 1
+        for unit_type in sorted(numerator_buckets.keys() | denominator_buckets.keys()):
+            numerators = numerator_buckets.get(unit_type, ())
+            denominators = denominator_buckets.get(unit_type, ())
+            for numerator_unit, denominator_unit in zip(numerators, denominators):
+                conversion_factor *= numerator_unit.conversion_factor(denominator_unit)
+            cancelled = min(len(numerators), len(denominators))
+            new_numerator.extend(numerators[cancelled:])
+            new_denominator.extend(denominators[cancelled:])
+
+        return new_numerator, new_denominator, conversion_factor
+
+    def _combine(self, other: Unit, divide: bool = False) -> Tuple[Unit, float]:
+        """
+        Return the unit resulting from multiplying (or dividing) this unit by other, along with
+        the conversion factor to apply to the product (or quotient) of the magnitudes.
+
+        Results are memoised in the registry's algebra cache, keyed on the identity of the
+        operands.  Cache entries hold a reference to both operands, so their ids cannot be
+        reused by other objects while the entry exists, and the registry version they were
+        computed at, as conversion factors change when the registry is updated.
+        """
+        registry = self.registry
+        if registry is not None:
+            version = registry.version
+            key = (id(self), id(other), divide)
+            cached = registry.algebra_cache.get(key)
+            if cached is not None and cached[4] == version:
+                return cached[2], cached[3]
+
+        if divide:
+            # If this has a denominator, flip it and then multiply it using the other mult rules.
+            # (a / b) / (c / d) == ad / bc
+            new_numerators, new_denominators, conversion_factor = self.simplify(
+                chain(self.numerator_units, other.denominator_units),
+                chain(self.denominator_units, other.numerator_units),
             )
-        ]
-        denominator_units = [
-            u
-            for u in denominator_units
-            if not (
-                u.unit_type == self.dimensionless_base_unit.unit_type
-                and u.multiplier == 1
+        else:
+            # Multiply a/b by b/c to get ab * bc.
+            new_numerators, new_denominators, conversion_factor = self.simplify(
+                chain(self.numerator_units, other.numerator_units),
+                chain(self.denominator_units, other.denominator_units),
             )
-        ]
+        new_unit = self._derived_unit(new_numerators, new_denominators)
 
-        numerator_units = sorted(numerator_units, key=lambda u: u.unit_type)
-        denominator_units = sorted(denominator_units, key=lambda u: u.unit_type)
+        # Dimensions combine by adding/subtracting exponents, so there's no need to walk the base units
+        if new_unit._dimensions is None:
+            new_unit._dimensions = tuple(
+                map(operator.sub if divide else operator.add, self.dimensions, other.dimensions)
+            )
 
-        # Find list of unit types in numerator, and list in denominator, then cancel them.
-        # Sort by unit type so we know we can match up
-        new_numerator: List[BaseUnit] = [
-            u
-            for u in numerator_units
-            if u.unit_type != self.dimensionless_base_unit.unit_type
-        ]
-        new_denominator = []
+        if registry is not None:
+            registry.algebra_cache.put(key, (self, other, new_unit, conversion_factor, version))
 
-        conversion_factor = 1
-        for denom_unit in denominator_units:
-            # Find a unit with the correct type in the numerator and cancel it.
-            index_to_cancel = first_index(new_numerator, denom_unit.unit_type)
-            if index_to_cancel is not None:
-                conversion_factor *= new_numerator[index_to_cancel].conversion_factor(denom_unit)
-                del new_numerator[index_to_cancel]
-            else:
-                new_denominator.append(denom_unit)
-
-        # Special case where we have x/x remaining
-        if len(new_numerator) == len(new_denominator) and all(
-            a.unit_type == b.unit_type for a, b in zip(new_numerator, new_denominator)
-        ):
-            return [], [], conversion_factor
+        return new_unit, conversion_factor
 
-        return new_numerator, new_denominator, conversion_factor
+    def _power(self, exponent: int) -> Tuple[Unit, float]:
+        """
+        Return this unit raised to an integer power, along with the conversion factor to apply
+        to the magnitude raised to the same power.
+
+        The result is built in one step by repeating the base units, and is memoised in the
+        registry's algebra cache alongside the results of multiplication and division.
+        """
+        if not isinstance(exponent, int):
+            raise TypeError(f"Units can only be raised to integer powers, not {exponent!r}")
+        if exponent == 1:
+            return self, 1
+        if exponent == 0:
+            return self.dimensionless_unit, 1
+
+        registry = self.registry
+        if registry is not None:
+            version = registry.version
+            key = (id(self), exponent, "pow")
+            cached = registry.algebra_cache.get(key)
+            if cached is not None and cached[4] == version:
+                return cached[2], cached[3]
+
+        # x**-n == 1 / x**n, so swap numerator and denominator for negative powers
+        if exponent > 0:
+            numerator_units, denominator_units = self.numerator_units, self.denominator_units
+        else:
+            numerator_units, denominator_units = self.denominator_units, self.numerator_units
+
+        new_numerators, new_denominators, conversion_factor = self.simplify(
+            numerator_units * abs(exponent), denominator_units * abs(exponent)
+        )
+        new_unit = self._derived_unit(new_numerators, new_denominators)
+        if new_unit._dimensions is None:
+            new_unit._dimensions = tuple(x * exponent for x in self.dimensions)
+
+        if registry is not None:
+            registry.algebra_cache.put(key, (self, None, new_unit, conversion_factor, version))
+
+        return new_unit, conversion_factor
+
+    def _derived_unit(
+        self, numerator_units: List[BaseUnit], denominator_units: List[BaseUnit]
+    ) -> Unit:
+        """
+        Return a unit made of the simplified base unit lists given, as output by simplify().
+
+        Where this unit is linked to a registry, the result is interned so that arithmetic
+        producing equal units returns the same object.
+        """
+        if self.registry is not None:
+            return self.registry._intern_unit(numerator_units, denominator_units)
+
+        return Unit(
+            numerator_units,
+            denominator_units,
+            self.dimensionless_base_unit,
+            None,
+            self.dimensionless_unit,
+        )
 
     def __repr__(self) -> str:
         return f"<Unit ({self.name})>"
@@ -249,37 +480,101 @@ class Unit:
         If you have a value in the current unit and wish to know how much larger it should
         be in the target unit, call this method and multiply the value by the result.
 
-        This method is used by Quantity() to update values.
+        This method is used by Quantity() to update values.  Results are cached in the
+        registry, so repeated conversions between the same pair of units are a lookup.
         """
+        registry = self.registry
+        if registry is not None:
+            version = registry.version
+            key = (id(self), id(target_unit))
+            cached = registry.conversion_cache.get(key)
+            if cached is not None and cached[3] == version:
+                return cached[2]
+
         if not isinstance(target_unit, Unit):
             raise TypeError(
                 "Cannot compute conversion factor between unit and non-unit values"
             )
-        if self.unit_type != target_unit.unit_type:
+        if self.dimensions != target_unit.dimensions:
             raise TypeError(
                 f"Unable to convert from {self} to {target_unit} as they are defined in different dimensions"
             )
 
-        # Conversion factor for the numerator
-        numerator_conversion_factor = 1
-        for base_unit_from, base_unit_to in zip(
-            self.numerator_units, target_unit.numerator_units
-        ):
-            numerator_conversion_factor *= base_unit_from.conversion_factor(base_unit_to)
+        conversion_factor = self.scale / target_unit.scale
 
-        # Conversion factor for all the multiplied denominator items
-        denominator_conversion_factor = 1
-        for base_unit_from, base_unit_to in zip(
-            self.denominator_units, target_unit.denominator_units
-        ):
-            denominator_conversion_factor *= base_unit_from.conversion_factor(base_unit_to)
+        # Hold references to both units so that their ids remain valid for the life of the entry
+        if registry is not None:
+            registry.conversion_cache.put(key, (self, target_unit, conversion_factor, version))
+
+        return conversion_factor
+
+    def exact_conversion_factor(self, target_unit: Unit, magnitude_type: type = Fraction) -> Any:
+        """
+        Return the conversion factor to target_unit, exactly, in the form used to scale magnitudes
+        of magnitude_type: a Fraction for Fraction magnitudes, or for Decimal magnitudes a Decimal
+        (or a ratio of Decimals, if the factor has no finite decimal expansion).  See pintless.exact.
 
-        conversion_factor = numerator_conversion_factor / denominator_conversion_factor
+        Results are cached in the registry for each pair of units and magnitude type.
+        """
+        registry = self.registry
+        if registry is not None:
+            version = registry.version
+            key = (id(self), id(target_unit), magnitude_type)
+            cached = registry.conversion_cache.get(key)
+            if cached is not None and cached[3] == version:
+                return cached[2]
+
+        if not isinstance(target_unit, Unit):
+            raise TypeError(
+                "Cannot compute conversion factor between unit and non-unit values"
+            )
+        if self.dimensions != target_unit.dimensions:
+            raise TypeError(
+                f"Unable to convert from {self} to {target_unit} as they are defined in different dimensions"
+            )
+
+        conversion_factor = plex.factor_for(self.exact_scale / target_unit.exact_scale, magnitude_type)
+
+        if registry is not None:
+            registry.conversion_cache.put(key, (self, target_unit, conversion_factor, version))
+
+        return conversion_factor
+
+    def _exact_algebra_factor(
+        self, other: Optional[Unit], operation: Union[bool, int], new_unit: Unit, magnitude_type: type
+    ) -> Any:
+        """
+        Return the conversion factor given by _combine(other, divide=operation), or by
+        _power(operation) if other is None, exactly, in the form used to scale magnitudes of
+        magnitude_type.  Results are cached alongside those of _combine and _power.
+        """
+        registry = self.registry
+        if registry is not None:
+            version = registry.version
+            key = (id(self), id(other), operation, magnitude_type) if other is not None else (id(self), operation, "pow", magnitude_type)
+            cached = registry.algebra_cache.get(key)
+            if cached is not None and cached[4] == version:
+                return cached[3]
+
+        if other is None:
+            scale = self.exact_scale**operation
+        elif operation:
+            scale = self.exact_scale / other.exact_scale
+        else:
+            scale = self.exact_scale * other.exact_scale
+        conversion_factor = plex.factor_for(scale / new_unit.exact_scale, magnitude_type)
+
+        if registry is not None:
+            registry.algebra_cache.put(key, (self, other, new_unit, conversion_factor, version))
 
         return conversion_factor
 
     def __eq__(self, __o: object) -> bool:
 
+        # Units from arithmetic are interned, so this is the common case
+        if self is __o:
+            return True
+
         if (
             not isinstance(__o, Unit)
             or len(self.numerator_units) != len(__o.numerator_units)
@@ -301,12 +596,15 @@ class Unit:
         Returns true if both units have the same dimensionality, e.g. if it is
         possible to convert a quantity from this unit into the unit in 'other' or not.
         """
-        return self.unit_type == other.unit_type
+        return self.dimensions == other.dimensions
 
     # Set operations make this expensive, so cache the response
-    @lru_cache
     def __hash__(self) -> int:
-        return hash((set(self.numerator_units), set(self.denominator_units)))
+        if self._hash is None:
+            self._hash = hash(
+                (frozenset(self.numerator_units), frozenset(self.denominator_units))
+            )
+        return self._hash
 
     def __mul__(
         self, __o: Union[Unit, ValidMagnitude, Quantity]
@@ -317,50 +615,36 @@ class Unit:
         # unit types in it
         if isinstance(__o, Unit):
             # Multiply a/b by b/c to get ab * bc.
-            # This means concatenating the lists, but ensuring there's only ever one 'dimensionless'
-
-            new_numerators, new_denominators, _ = self.simplify(
-                self.numerator_units + __o.numerator_units,
-                self.denominator_units + __o.denominator_units,
-            )
-
-            return Unit(
-                new_numerators,
-                new_denominators,
-                self.dimensionless_base_unit,
-                self.registry,
-            )
+            return self._combine(__o)[0]
 
         if isinstance(__o, Quantity):
             return __o * self
 
+        if isinstance(__o, array):
+            return QuantityArray(__o, self)
+
         # Must be some other (presumably numeric) quantity
         return Quantity(__o, self)
 
     __rmul__ = __mul__
 
-    def __pow__(self, __o: int) -> Union[Unit, Quantity]:
-        val = self
-        for _ in range(__o - 1):
-            val = val * self
-        return val
+    def __pow__(self, __o: int) -> Unit:
+        """Raise this unit to an integer power, e.g. m**3 or s**-2"""
+        return self._power(__o)[0]
 
     def __truediv__(self, __o: Unit) -> Unit:
         """Divide these units by other units"""
         if not isinstance(__o, Unit):
             raise ValueError("Cannot divide unit by non-unit")
 
-        # If this has a denominator, flip it and then multiply it using the other mult rules.
         # (a / b) / (c / d) == ad / bc
+        return self._combine(__o, divide=True)[0]
 
-        new_numerators, new_denominators, _ = self.simplify(
-            self.numerator_units + __o.denominator_units,
-            self.denominator_units + __o.numerator_units,
-        )
+    def __rtruediv__(self, __o: ValidMagnitude) -> Quantity:
+        """Return a quantity in the reciprocal of this unit, e.g. 5 / second"""
+        return (self.dimensionless_unit / self) * __o
 
-        return Unit(
-            new_numerators,
-            new_denominators,
-            self.dimensionless_base_unit,
-            self.registry,
-        )
+
+def _unit_from_registry(registry_name: str, descriptor: Union[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]) -> Unit:
+    """Rebuild a unit pickled by reference to a named registry, see Unit.__reduce_ex__."""
+    return pintless.registry.get_registry(registry_name).unit_from_descriptor(descriptor)
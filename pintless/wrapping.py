@@ -0,0 +1,149 @@
+"""
+Decorators that let functions over raw magnitudes accept and return Quantity objects.
+
+    @reg.wraps(ret="watt", args=("joule", "second"))
+    def power(energy, duration):
+        return energy / duration
+
+    power(3 * reg.kWh, 2 * reg.hour)    # Quantity(1500.0, 'watt')
+
+All units are resolved when the function is decorated.  On each call, a Quantity argument
+already in the expected unit costs an identity check.  Any other unit costs a multiply by a
+conversion factor, which is computed the first time that unit is seen for the argument and
+remembered by the wrapper (until the registry's multipliers are updated).  Only the first
+MAX_REMEMBERED_UNITS units seen for each argument are remembered, so that wrappers don't keep
+every unit ever passed to them alive.  Factors for others come from the registry's conversion cache.
+
+Fraction and Decimal magnitudes are converted exactly, using the factors that the registry
+caches for them (see pintless.exact).
+"""
+from __future__ import annotations
+import functools
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pintless.quantity as plq
+import pintless.quantity_array as plqa
+import pintless.registry as plr
+import pintless.unit as plu
+
+UnitSpec = Optional[Union[str, plu.Unit]]
+
+# Each argument of a wrapped function remembers conversion factors for this many distinct units
+MAX_REMEMBERED_UNITS = 64
+
+
+class _Argument:
+    """The expected unit of one argument of a wrapped function, and factors to convert other units to it."""
+
+    __slots__ = ("index", "name", "unit", "strict", "factors", "registry")
+
+    def __init__(self, index: int, name: str, unit: plu.Unit, strict: bool) -> None:
+        self.index = index
+        self.name = name
+        self.unit = unit
+        self.strict = strict
+        # id(unit) -> (unit, conversion factor, registry version).  Holding the unit keeps its id valid
+        self.factors: Dict[int, Tuple[plu.Unit, float, int]] = {}
+        self.registry = unit.registry
+
+    def magnitude(self, value: Any) -> Any:
+        """Return the magnitude of value in the expected unit."""
+        if not isinstance(value, plq.Quantity):
+            if self.strict:
+                raise TypeError(f"Expected a Quantity in {self.unit} for argument '{self.name}', but got {value!r}")
+            return value
+
+        if value.unit is self.unit:
+            return value.magnitude
+
+        if isinstance(value, plqa.QuantityArray) or isinstance(value.magnitude, list):
+            return value.m_as(self.unit)
+
+        # Exact magnitudes use exact factors, which the registry caches by magnitude type
+        if value.magnitude.__class__ in plq.EXACT_TYPES:
+            return value.magnitude * value.unit.exact_conversion_factor(self.unit, value.magnitude.__class__)
+
+        version = 0 if self.registry is None else self.registry.version
+        cached = self.factors.get(id(value.unit))
+        if cached is None or cached[2] != version:
+            cached = (value.unit, value.unit.conversion_factor(self.unit), version)
+            if len(self.factors) < MAX_REMEMBERED_UNITS or id(value.unit) in self.factors:
+                self.factors[id(value.unit)] = cached
+        return value.magnitude * cached[1]
+
+
+def _arguments(function: Callable, units: Sequence[plu.Unit], strict: bool) -> List[_Argument]:
+    """Return an _Argument for each of the leading positional parameters of function that has a unit."""
+    parameters = [
+        parameter
+        for parameter in inspect.signature(function).parameters.values()
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    if len(units) > len(parameters):
+        raise TypeError(f"Got units for {len(units)} arguments, but {function.__name__} takes {len(parameters)}")
+
+    return [
+        _Argument(index, parameter.name, unit, strict)
+        for index, (parameter, unit) in enumerate(zip(parameters, units))
+        if unit is not None
+    ]
+
+
+def _result(value: Any, units: Tuple[Optional[plu.Unit], ...]) -> Tuple[Any, ...]:
+    """Attach units to the values returned by a wrapped function."""
+    if len(value) != len(units):
+        raise ValueError(f"Expected {len(units)} return values, but got {len(value)}")
+    return tuple(x if unit is None else plq.Quantity(x, unit) for x, unit in zip(value, units))
+
+
+def wraps(
+    registry: plr.Registry,
+    ret: Union[UnitSpec, Sequence[UnitSpec]],
+    args: Union[UnitSpec, Sequence[UnitSpec]],
+    strict: bool = True,
+) -> Callable[[Callable], Callable]:
+    """Return a decorator converting arguments and results of a function.  See Registry.wraps."""
+    if args is None or isinstance(args, (str, plu.Unit)):
+        args = (args,)
+    arg_units = [None if unit is None else registry._unit_for(unit) for unit in args]
+
+    if ret is None:
+        ret_units = None
+    elif isinstance(ret, (str, plu.Unit)):
+        ret_units = registry._unit_for(ret)
+    else:
+        ret_units = tuple(None if unit is None else registry._unit_for(unit) for unit in ret)
+
+    def decorator(function: Callable) -> Callable:
+        arguments = _arguments(function, arg_units, strict)
+        by_name = {argument.name: argument for argument in arguments}
+        Quantity = plq.Quantity
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            magnitudes = list(args)
+            for argument in arguments:
+                if argument.index < len(magnitudes):
+                    value = magnitudes[argument.index]
+                    # Fast path for the expected unit.  Anything else (including subclasses) is checked in full
+                    if value.__class__ is Quantity and value.unit is argument.unit:
+                        magnitudes[argument.index] = value.magnitude
+                    else:
+                        magnitudes[argument.index] = argument.magnitude(value)
+            if kwargs:
+                for name, value in kwargs.items():
+                    argument = by_name.get(name)
+                    if argument is not None:
+                        kwargs[name] = argument.magnitude(value)
+
+            value = function(*magnitudes, **kwargs)
+            if ret_units is None:
+                return value
+            if ret_units.__class__ is plu.Unit:
+                return Quantity(value, ret_units)
+            return _result(value, ret_units)
+
+        return wrapper
+
+    return decorator
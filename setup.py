@@ -12,5 +12,5 @@ setup(
     packages=["pintless"],
     package_data={"pintless": ["pintless/default_units.json"]},
     include_package_data=True,
-    extras_require={"dev": ["flake8"], "test": ["pytest", "pytest-cov"]},
+    extras_require={"dev": ["flake8"], "test": ["pytest", "pytest-cov"], "numpy": ["numpy"]},
 )
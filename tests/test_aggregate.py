@@ -0,0 +1,69 @@
+import math
+import unittest
+
+import pintless
+from pintless import Registry
+
+
+class AggregateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_sum(self):
+        quantities = [1 * self.r.km, 500 * self.r.m, 2 * self.r.km, 250 * self.r.m]
+        total = pintless.sum(quantities)
+        self.assertEqual(total.unit, self.r.km)
+        self.assertEqual(total.magnitude, 3.75)
+        self.assertEqual(total, sum(quantities))
+
+        self.assertEqual(pintless.sum(quantities, unit="m").magnitude, 3750)
+        self.assertEqual(pintless.sum(iter(quantities), unit=self.r.m).unit, self.r.m)
+
+        # Integers stay integers when no conversion is needed
+        total = pintless.sum([1 * self.r.m, 2 * self.r.m])
+        assert isinstance(total.magnitude, int)
+
+    def test_sum_empty(self):
+        self.assertEqual(pintless.sum([]), 0)
+        self.assertEqual(pintless.sum([], unit=self.r.m), 0 * self.r.m)
+        with self.assertRaises(ValueError):
+            pintless.sum([], unit="m")
+
+    def test_sum_compensated(self):
+        quantities = [0.1 * self.r.m] * 10
+        self.assertNotEqual(pintless.sum(quantities).magnitude, 1.0)
+        self.assertEqual(pintless.sum(quantities, compensated=True).magnitude, 1.0)
+
+        quantities += [0.1 * self.r.mm] * 10
+        self.assertEqual(pintless.sum(quantities, compensated=True).magnitude, math.fsum([1.0, 1e-3]))
+
+    def test_sum_errors(self):
+        with self.assertRaises(TypeError):
+            pintless.sum([1 * self.r.m, 1 * self.r.s])
+        with self.assertRaises(TypeError):
+            pintless.sum([1 * self.r.m, 1])
+
+    def test_mean(self):
+        self.assertEqual(pintless.mean([1 * self.r.km, 500 * self.r.m]), 0.75 * self.r.km)
+        self.assertEqual(pintless.mean([1 * self.r.km, 500 * self.r.m], unit="m").magnitude, 750)
+        with self.assertRaises(ValueError):
+            pintless.mean([])
+
+    def test_min_max(self):
+        quantities = [2 * self.r.km, 500 * self.r.m, 1 * self.r.km, 2500 * self.r.m]
+        self.assertEqual(pintless.min(quantities), 0.5 * self.r.km)
+        self.assertEqual(pintless.max(quantities), 2.5 * self.r.km)
+        self.assertEqual(pintless.max(quantities, unit="m").magnitude, 2500)
+        self.assertEqual(pintless.max(quantities).unit, self.r.km)
+
+        with self.assertRaises(ValueError):
+            pintless.min([])
+        with self.assertRaises(TypeError):
+            pintless.max([1 * self.r.m, 1 * self.r.s])
+
+    def test_star_import_keeps_builtins(self):
+        namespace = {}
+        exec("from pintless import *", namespace)
+        assert "Registry" in namespace
+        for name in ("sum", "mean", "min", "max"):
+            assert name not in namespace
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from pintless import bench
+
+
+class BenchTest(unittest.TestCase):
+    def run_quickly(self, names):
+        return bench.run(names, repeat=2, warmup=1, min_time=0.001, pint=False, memory=False)
+
+    def test_benchmarks_run(self):
+        """Every benchmark can be set up and run against pintless"""
+        results = self.run_quickly(None)
+        self.assertEqual(list(results["timings"]["pintless"]), list(bench.BENCHMARKS))
+        for timing in results["timings"]["pintless"].values():
+            assert 0 < timing["min"] <= timing["median"]
+            self.assertEqual(timing["repeat"], 2)
+
+        with self.assertRaises(ValueError):
+            self.run_quickly(["noexisty"])
+
+    def test_memory(self):
+        results = bench.run(["quantity.create"], repeat=1, warmup=1, min_time=0.001, pint=False)
+        assert results["memory"]["pintless"]["quantity"] > 0
+
+    def test_compare(self):
+        results = self.run_quickly(["quantity.to", "quantity.add"])
+        baseline = json.loads(json.dumps(results))
+        baseline["timings"]["pintless"]["quantity.to"]["min"] /= 2
+        del baseline["timings"]["pintless"]["quantity.add"]
+
+        comparisons = bench.compare(results, baseline, tolerance=0.5)
+        self.assertEqual(comparisons, [("quantity.to", 2, True)])
+
+        baseline["version"] = 0
+        with self.assertRaises(ValueError):
+            bench.compare(results, baseline)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_filename = os.path.join(tmpdir, "results.json")
+            args = ["--filter", "m_as", "--repeat", "1", "--min-time", "0.001", "--no-pint", "--no-memory"]
+
+            with redirect_stdout(StringIO()) as stdout:
+                self.assertEqual(bench.main(args + ["--output", output_filename]), 0)
+            assert "quantity.m_as" in stdout.getvalue()
+
+            with open(output_filename) as fin:
+                self.assertEqual(list(json.load(fin)["timings"]["pintless"]), ["quantity.m_as"])
+
+            with redirect_stdout(StringIO()) as stdout:
+                bench.main(args + ["--baseline", output_filename, "--tolerance", "100"])
+            assert "x" in stdout.getvalue().splitlines()[1]
@@ -0,0 +1,113 @@
+import sys
+import threading
+import unittest
+from collections import OrderedDict
+
+from pintless import Registry
+from pintless.cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        """The least recently used entry is dropped once the cache is full"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_hit_miss_counts(self):
+        cache = LRUCache(None)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("a")
+        assert cache.get("b", "default") == "default"
+
+        assert cache.info() == {"hits": 2, "misses": 1, "size": 1, "maxsize": None}
+
+        # Clearing keeps the counters
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 2
+
+    def test_evicted_during_get(self):
+        """An entry removed between looking it up and marking it as used is a miss"""
+
+        class EvictingDict(OrderedDict):
+            def __getitem__(self, key):
+                value = super().__getitem__(key)
+                self.clear()  # as if another thread had cleared the cache
+                return value
+
+        cache = LRUCache(1)
+        cache._data = EvictingDict(a=1)
+        assert cache.get("a", "default") == "default"
+        assert cache.misses == 1
+
+        # Eviction copes with the cache having been emptied by another thread
+        class ClearingDict(OrderedDict):
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                self.clear()
+
+        cache._data = ClearingDict()
+        cache.maxsize = -1  # so that even an empty cache is over-full
+        cache.put("a", 1)
+        assert len(cache) == 0
+
+    def test_concurrent_use(self):
+        """Entries evicted or cleared by other threads are misses, not errors"""
+        cache = LRUCache(8)
+        errors = []
+
+        def use(offset):
+            try:
+                for i in range(20000):
+                    key = (offset + i) % 16
+                    if cache.get(key) is None:
+                        cache.put(key, i)
+                    if i % 500 == 0:
+                        cache.clear()
+            except Exception as e:
+                errors.append(e)
+
+        self._run_threads(use, 8)
+        assert errors == []
+        assert len(cache) <= 8
+
+    def test_concurrent_registry_use(self):
+        """Registry caches can be used while another thread updates multipliers"""
+        r = Registry(algebra_cache_size=4, conversion_cache_size=4, parse_cache_size=4)
+        expressions = ["kWh", "km / hour", "mile", "kEUR", "watt * s", "m / s**2"]
+        targets = ["joule", "m / s", "m", "USD", "joule", "km / hour**2"]
+        errors = []
+
+        def use(thread):
+            try:
+                for i in range(2000):
+                    if thread == 0 and i % 50 == 0:
+                        r.update_multipliers("currency", {"EUR": 1 + i / 10000})
+                    n = (thread + i) % len(expressions)
+                    (1 * r(expressions[n])).to(targets[n])
+            except Exception as e:
+                errors.append(e)
+
+        self._run_threads(use, 6)
+        assert errors == []
+
+    def _run_threads(self, target, count):
+        # Switch threads often, so that operations on the cache interleave
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
@@ -0,0 +1,41 @@
+import unittest
+from array import array
+
+from pintless import Registry, Converter
+
+
+class ConverterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_convert(self):
+        convert = self.r.converter("mile/hour", "m/s")
+        assert isinstance(convert, Converter)
+        assert convert.source_unit == self.r("mile/hour")
+        assert convert.target_unit == self.r("m/s")
+
+        self.assertAlmostEqual(convert(60), (60 * self.r("mile/hour")).m_as("m/s"))
+        self.assertAlmostEqual(convert.factor, 0.44703888888888886)
+
+        # Units may be given as Unit objects too
+        convert = self.r.converter(self.r.km, self.r.m)
+        self.assertEqual(convert.convert_many([1, 2, 3]), [1000, 2000, 3000])
+        self.assertEqual(convert.convert_many(x for x in range(3)), [0, 1000, 2000])
+
+    def test_convert_into(self):
+        values = array("d", [1, 2, 3])
+        convert = self.r.converter("km", "m")
+
+        assert convert.convert_into(values) is values
+        self.assertEqual(list(values), [1000, 2000, 3000])
+
+        # Converted values may not fit in integer buffers
+        for typecode in "ilq":
+            with self.assertRaises(TypeError):
+                convert.convert_into(array(typecode, [1, 2, 3]))
+
+    def test_invalid_units(self):
+        with self.assertRaises(TypeError):
+            self.r.converter("km", "hour")
+        with self.assertRaises(ValueError):
+            self.r.converter("4 km", "m")
@@ -0,0 +1,80 @@
+import io
+import unittest
+
+from pintless import Registry, UndefinedUnitError
+from pintless.csv_io import QuantityReader, QuantityWriter, parse_header, format_header
+
+
+class CSVIOTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_headers(self):
+        self.assertEqual(parse_header("power [kW]"), ("power", "kW"))
+        self.assertEqual(parse_header("distance (mile)"), ("distance", "mile"))
+        self.assertEqual(parse_header(" speed [ km / hour ] "), ("speed", "km / hour"))
+        self.assertEqual(parse_header("name"), ("name", None))
+        self.assertEqual(parse_header("[kW]"), ("", "kW"))
+
+        self.assertEqual(format_header("power", self.r.kW), "power [kW]")
+        self.assertEqual(format_header("name", None), "name")
+
+    def test_read(self):
+        source = io.StringIO("site,power [kW],distance (mile)\na,1.5,2\nb,,0\n")
+        reader = QuantityReader(self.r, source)
+
+        self.assertEqual(reader.fieldnames, ["site", "power", "distance"])
+        self.assertEqual(reader.units, [None, self.r.kW, self.r.mile])
+        self.assertEqual(list(reader), [["a", 1.5, 2.0], ["b", None, 0.0]])
+
+    def test_read_parenthesised_names(self):
+        """Text in parentheses that isn't a unit is part of the column name"""
+        source = io.StringIO("temperature (avg),year (2023),distance (mile)\nhot,x,2\n")
+        reader = QuantityReader(self.r, source)
+
+        self.assertEqual(reader.fieldnames, ["temperature (avg)", "year (2023)", "distance"])
+        self.assertEqual(reader.units, [None, None, self.r.mile])
+        self.assertEqual(list(reader), [["hot", "x", 2.0]])
+
+        # Units in square brackets must resolve
+        with self.assertRaises(UndefinedUnitError):
+            QuantityReader(self.r, io.StringIO("temperature [avg]\n"))
+        with self.assertRaises(ValueError):
+            QuantityReader(self.r, io.StringIO("year [2023]\n"))
+
+    def test_read_converted(self):
+        source = io.StringIO("power [kW],distance (mile)\n1.5,2\n")
+        reader = QuantityReader(self.r, source, target_units={"power": "W", "distance": self.r.km})
+
+        self.assertEqual(reader.units, [self.r.W, self.r.km])
+        self.assertEqual(reader.factors, [1000, self.r.mile.conversion_factor(self.r.km)])
+        self.assertEqual(next(reader), [1500, 2 * self.r.mile.conversion_factor(self.r.km)])
+
+        with self.assertRaises(TypeError):
+            QuantityReader(self.r, io.StringIO("power [kW]\n"), target_units={"power": "m"})
+        with self.assertRaises(ValueError):
+            QuantityReader(self.r, io.StringIO("power [kW]\n"), target_units={"energy": "J"})
+
+    def test_round_trip(self):
+        source = io.StringIO("site,speed [km / hour]\na,3\nb,4.5\n")
+        reader = QuantityReader(self.r, source, target_units={"speed": "m / s"})
+
+        out = io.StringIO()
+        writer = QuantityWriter(out, reader.fieldnames, reader.units, lineterminator="\n")
+        writer.writerows(reader)
+
+        reader = QuantityReader(self.r, io.StringIO(out.getvalue()), target_units={"speed": "km / hour"})
+        self.assertEqual(out.getvalue().splitlines()[0], "site,speed [m/s]")
+        self.assertEqual([[site, round(speed, 9)] for site, speed in reader], [["a", 3], ["b", 4.5]])
+
+    def test_write_quantities(self):
+        out = io.StringIO()
+        writer = QuantityWriter(out, ["site", "power"], [None, self.r.kW], lineterminator="\n")
+        writer.writerow(["a", 500 * self.r.W])
+        writer.writerow(["b", 2])
+        self.assertEqual(out.getvalue(), "site,power [kW]\na,0.5\nb,2\n")
+
+        with self.assertRaises(TypeError):
+            writer.writerow([1 * self.r.W, 2])
+        with self.assertRaises(ValueError):
+            QuantityWriter(out, ["site", "power"], [None])
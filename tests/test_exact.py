@@ -0,0 +1,122 @@
+import unittest
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+import pintless
+from pintless import Registry
+from pintless.exact import DecimalRatio, factor_for
+
+
+class ExactTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_fraction_conversion(self):
+        converted = (Fraction(1, 3) * self.r.km).to("m")
+        self.assertIsInstance(converted.magnitude, Fraction)
+        self.assertEqual(converted.magnitude, Fraction(1000, 3))
+
+        self.assertEqual((Fraction(1) * self.r.inch).m_as("cm"), Fraction(127, 50))
+        self.assertEqual((Fraction(1) * self.r.km).m_as("mile"), Fraction(1000) / Fraction("1609.34"))
+
+        speed = (Fraction(1) * self.r.get_unit("mile / hour")).m_as("m / s")
+        self.assertEqual(speed, Fraction("1609.34") / 3600)
+
+    def test_decimal_conversion(self):
+        self.assertEqual(repr((Decimal("1.5") * self.r.km).m_as("m")), "Decimal('1500.0')")
+        self.assertEqual((Decimal("10") * self.r.inch).m_as("m"), Decimal("0.254"))
+
+        # Factors without a finite decimal expansion are rounded in the current context
+        with localcontext() as context:
+            context.prec = 10
+            self.assertEqual((Decimal("1") * self.r.get_unit("km / hour")).m_as("m / s"), Decimal("0.2777777778"))
+
+        converted = [Decimal("1.5"), Decimal("2")] * self.r.km
+        self.assertEqual(converted.to("m").magnitude, [Decimal("1500"), Decimal("2000")])
+
+        quantity = Decimal("2") * self.r.km
+        quantity.ito("m")
+        self.assertEqual(repr(quantity.magnitude), "Decimal('2000')")
+
+    def test_decimal_arithmetic(self):
+        self.assertEqual((Decimal("2") * self.r.km + Decimal("5") * self.r.m).magnitude, Decimal("2.005"))
+        self.assertEqual((Decimal("2") * self.r.km - Decimal("5") * self.r.m).magnitude, Decimal("1.995"))
+        self.assertLess(Decimal("1") * self.r.km, Decimal("1001") * self.r.m)
+        self.assertFalse(Decimal("1") * self.r.km < Decimal("999") * self.r.m)
+        self.assertFalse(Decimal("1") * self.r.km < Decimal("500") * self.r.m)
+        self.assertLess(Decimal("999") * self.r.m, Decimal("1") * self.r.km)
+
+        power = (Decimal("3") * self.r.kWh / (Decimal("2") * self.r.hour)).to("watt")
+        self.assertEqual(power.magnitude, Decimal("1500"))
+        self.assertEqual((Fraction(2) * self.r.km * (Fraction(3) * self.r.km)).m_as("m**2"), 6000000)
+        self.assertEqual((Fraction(2) * self.r.km) ** 2, Fraction(4) * self.r.km**2)
+
+    def test_aggregates(self):
+        quantities = [Decimal("1.5") * self.r.km, Decimal("250") * self.r.m]
+        self.assertEqual(repr(pintless.sum(quantities).magnitude), "Decimal('1.750')")
+        self.assertEqual(pintless.mean(quantities, unit="m").magnitude, Decimal("875"))
+        self.assertEqual(pintless.max(quantities, unit="m").magnitude, Decimal("1500"))
+        self.assertEqual(pintless.min([Fraction(1) * self.r.km, Fraction(1) * self.r.m]).magnitude, Fraction(1, 1000))
+
+    def test_wraps(self):
+        @self.r.wraps(ret="watt", args=("joule", "second"))
+        def power(energy, duration):
+            return energy / duration
+
+        result = power(Decimal("3") * self.r.kWh, Decimal("2") * self.r.hour)
+        self.assertEqual(repr(result.magnitude), "Decimal('1500')")
+        self.assertEqual(power(Fraction(1) * self.r.kWh, Fraction(7) * self.r.s).magnitude, Fraction(3600000, 7))
+
+    def test_converter(self):
+        convert = self.r.converter("km", "mile")
+        self.assertEqual(convert(Fraction(1)), Fraction(1000) / Fraction("1609.34"))
+        self.assertEqual(convert.convert_many([Fraction(1), Fraction(2)]), [convert(Fraction(1)), convert(Fraction(2))])
+        self.assertIs(convert.exact_factor(Fraction), self.r.km.exact_conversion_factor(self.r.mile))
+
+        convert = self.r.converter("km", "m")
+        self.assertEqual(repr(convert(Decimal("2.5"))), "Decimal('2500.0')")
+        self.assertEqual(convert.convert_many(iter([Decimal("1"), Decimal("2")])), [Decimal("1000"), Decimal("2000")])
+        self.assertEqual(convert.convert_many([]), [])
+
+    def test_factors_cached_per_type(self):
+        km, m = self.r.km, self.r.m
+        self.assertEqual(km.conversion_factor(m), 1000)
+        self.assertIsInstance(km.conversion_factor(m), float)
+        self.assertIsInstance(km.exact_conversion_factor(m), Fraction)
+        self.assertIsInstance(km.exact_conversion_factor(m, Decimal), Decimal)
+        self.assertIs(km.exact_conversion_factor(m, Decimal), km.exact_conversion_factor(m, Decimal))
+
+        with self.assertRaises(TypeError):
+            km.exact_conversion_factor(m, float)
+        with self.assertRaises(TypeError):
+            km.exact_conversion_factor(self.r.second)
+
+        self.assertIsInstance(factor_for(Fraction(1, 3), Decimal), DecimalRatio)
+        self.assertEqual(factor_for(Fraction(1, 8), Decimal), Decimal("0.125"))
+
+    def test_update_multipliers(self):
+        self.r.update_multipliers("currency", {"EUR": Decimal("1.0832")})
+        self.assertEqual((Decimal("10.00") * self.r.EUR).m_as("USD"), Decimal("10.832"))
+        self.assertEqual((Fraction(1) * self.r.kEUR).m_as("USD"), Fraction(10832, 10))
+
+        # Float magnitudes still use float factors
+        self.assertAlmostEqual((10 * self.r.EUR).m_as("USD"), 10.832)
+
+    def test_converter_update_multipliers(self):
+        """Converters keep the factors they were created with, for every magnitude type"""
+        convert = self.r.converter("EUR", "USD")
+        factor, exact_factor = convert.factor, convert.exact_factor(Decimal)
+
+        self.r.update_multipliers("currency", {"EUR": Decimal("1.0832")})
+        self.assertEqual(convert.factor, factor)
+        self.assertEqual(convert(10.0), 10 * factor)
+        self.assertEqual(convert(Decimal("10")), Decimal("10") * exact_factor)
+        self.assertEqual(convert.convert_many([Fraction(10)]), [10 * convert.exact_factor(Fraction)])
+        self.assertNotEqual(convert(Decimal("10")), Decimal("10.832"))
+
+        # New converters use the new rates
+        self.assertEqual(self.r.converter("EUR", "USD")(Decimal("10")), Decimal("10.832"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import math
+import unittest
+from array import array
+
+from pintless import Registry, UndefinedUnitError
+
+
+class FormulaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_compile(self):
+        formula = self.r.compile("a * b / c", to="joule / m**3", a="kW", b="hour", c="m**3")
+        self.assertEqual(formula(2, 3, 4), 5400000)
+        self.assertEqual(formula.factor, 3600000)
+        self.assertEqual(formula.unit, self.r.get_unit("joule / m**3"))
+        self.assertEqual(formula.variables, {"a": self.r.kW, "b": self.r.hour, "c": self.r.get_unit("m**3")})
+
+        expected = (2 * self.r.kW) * (3 * self.r.hour) / (4 * self.r.get_unit("m**3"))
+        self.assertEqual(formula(2, 3, 4), expected.m_as(formula.unit))
+
+        # Without a target unit, the result is in the unit that the formula produces
+        formula = self.r.compile("a * b / c", a="kW", b="hour", c="m**3")
+        self.assertEqual(formula(2, 3, 4), 1.5)
+        self.assertEqual(formula.unit, expected.unit)
+
+    def test_compile_many(self):
+        formula = self.r.compile("a * b / c", to="joule / m**3", a="kW", b="hour", c="m**3")
+        values = formula.many([2, 1], array("d", [3, 1]), iter([4, 1]))
+        self.assertEqual(values, array("d", [5400000, 3600000]))
+
+        formula = self.r.compile("v ** 2", to="m**2 / s**2", v="km / hour")
+        self.assertEqual(formula(36), 100)
+        self.assertEqual(formula.many(range(2)), array("d", [0, 1 / 3.6**2]))
+
+    def test_compile_constants_and_units(self):
+        formula = self.r.compile("3 / (x * y)**2 * km", to="m**-1", x="m", y="s / s")
+        self.assertEqual(formula(2, 1), 750)
+
+        # Variables take precedence over units, and names are not confused with those generated
+        formula = self.r.compile("m * zip / factor", m="s", zip="km", factor="hour")
+        expected = (2 * self.r.s) * (3 * self.r.km) / (4 * self.r.hour)
+        self.assertEqual(formula(2, 3, 4), expected.magnitude)
+        self.assertEqual(formula.unit, expected.unit)
+        self.assertEqual(formula.many([2], [3], [4]), array("d", [expected.magnitude]))
+
+    def test_compile_non_finite_powers(self):
+        """Exponents are passed to the generated code as values, so needn't have a repr that evaluates"""
+        for exponent, expected in (("inf", 0.5**math.inf), ("-inf", 0.5**-math.inf), ("nan", math.nan)):
+            formula = self.r.compile(f"c ** {exponent}", c="dimensionless")
+            self.assertEqual(repr(formula(0.5)), repr(expected))
+            self.assertEqual(repr(formula.many([0.5])[0]), repr(expected))
+
+        # Generated names don't clash with variables
+        formula = self.r.compile("c ** 2 / c_exponent ** 3", c="m", c_exponent="s")
+        self.assertEqual(formula(3, 2), 9 / 8)
+
+    def test_compile_errors(self):
+        with self.assertRaises(TypeError):
+            self.r.compile("a * b", to="s", a="m", b="m")
+        with self.assertRaises(UndefinedUnitError):
+            self.r.compile("a * b", a="m", b="noexisty")
+        with self.assertRaises(UndefinedUnitError):
+            self.r.compile("a * c", a="m")
+        with self.assertRaises(ValueError):
+            self.r.compile("a * a", a="m", b="s")
+
+        # Sums and differences aren't products of powers, so can't be compiled
+        for expression in ("a + b", "a - b", "a+b", "(a - b) * a"):
+            with self.assertRaisesRegex(ValueError, r"\*, /, \*\* and parentheses"):
+                self.r.compile(expression, a="m", b="m")
+        self.assertEqual(self.r.compile("a * -2", a="m")(3), -6)
+        with self.assertRaises(ValueError):
+            self.r.compile("a * b", **{"a": "m", "b": "m", "if": "s"})
+        with self.assertRaises(ValueError):
+            self.r.compile("3 * km")
@@ -0,0 +1,103 @@
+import gc
+import pickle
+import unittest
+
+from pintless import Registry
+import pintless.instrumentation as plin
+import pintless.registry as plr
+import pintless.unit as plu
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+        self.original_methods = (
+            plu.Unit.__init__, plu.Unit.simplify, plu.Unit.conversion_factor, plr.Registry._parse_unit_expression
+        )
+
+    def tearDown(self) -> None:
+        self.r.disable_stats()
+
+    def assert_uninstrumented(self):
+        assert not plin.is_installed()
+        self.assertEqual(
+            (plu.Unit.__init__, plu.Unit.simplify, plu.Unit.conversion_factor, plr.Registry._parse_unit_expression),
+            self.original_methods,
+        )
+
+    def test_disabled_by_default(self):
+        """No methods are wrapped unless instrumentation is enabled"""
+        self.assert_uninstrumented()
+        stats = self.r.stats()
+        assert not stats["enabled"]
+        assert stats["counts"] is None
+        self.assertEqual(set(stats["caches"]), {"algebra", "conversion", "parse"})
+
+    def test_counts(self):
+        self.r.enable_stats()
+        assert plin.is_installed()
+
+        self.r.kWh / self.r.mile
+        self.r.kWh / self.r.mile
+        self.r("m / s")
+        self.r("m / s")
+        (1 * self.r.kWh).to(self.r.joule)
+        (2 * self.r.kWh).to(self.r.joule)
+
+        stats = self.r.stats()
+        assert stats["enabled"]
+        self.assertEqual(stats["counts"]["simplify"], 2)
+        self.assertEqual(stats["counts"]["parse_unit_expression"], 1)
+        self.assertEqual(stats["counts"]["conversion_factor"], 2)
+        self.assertEqual(stats["counts"]["unit_allocations"], 2)
+        self.assertEqual(stats["caches"]["parse"]["hit_rate"], 0.5)
+        self.assertEqual(stats["caches"]["conversion"]["hits"], 1)
+
+        # Other registries aren't counted
+        other = Registry()
+        other.kWh / other.mile
+        self.assertEqual(self.r.stats()["counts"]["simplify"], 2)
+        assert not other.stats()["enabled"]
+
+        # Enabling again resets the counts
+        self.r.enable_stats()
+        self.assertEqual(set(self.r.stats()["counts"].values()), {0})
+
+    def test_callback(self):
+        timings = []
+        self.r.enable_stats(lambda name, seconds: timings.append((name, seconds)))
+        self.r("kelvin / watt")
+
+        self.assertEqual([name for name, _ in timings], ["simplify", "parse_unit_expression"])
+        assert all(seconds >= 0 for _, seconds in timings)
+
+    def test_disable(self):
+        """Methods are restored once the last instrumented registry disables stats"""
+        other = Registry()
+        self.r.enable_stats()
+        other.enable_stats()
+
+        self.r.disable_stats()
+        assert plin.is_installed()
+        other.disable_stats()
+        self.assert_uninstrumented()
+
+        # Counting has stopped
+        self.r("kelvin / watt")
+        assert self.r.stats()["counts"] is None
+
+    def test_garbage_collected(self):
+        """Methods are restored once the last instrumented registry is garbage collected"""
+        other = Registry()
+        other.enable_stats()
+        assert plin.is_installed()
+
+        del other
+        gc.collect()
+        self.assert_uninstrumented()
+
+    def test_pickle(self):
+        """Instrumentation is not pickled with the registry"""
+        self.r.enable_stats(lambda name, seconds: None)
+        copy = pickle.loads(pickle.dumps(self.r))
+        assert not copy.stats()["enabled"]
@@ -0,0 +1,137 @@
+import unittest
+from array import array
+
+from pintless import Registry, Quantity, QuantityArray, Unit
+import pintless.numpy_support
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy is not None, "numpy is not installed")
+class NumpySupportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        pintless.numpy_support.enable()
+        self.r = Registry()
+
+    def tearDown(self) -> None:
+        pintless.numpy_support.disable()
+
+    def test_enable_disable(self):
+        assert pintless.numpy_support.is_enabled()
+        assert hasattr(Quantity, "__array_ufunc__")
+
+        pintless.numpy_support.disable()
+        assert not pintless.numpy_support.is_enabled()
+        assert not hasattr(Quantity, "__array_ufunc__")
+        assert not hasattr(Unit, "__array_ufunc__")
+
+    def test_unit_arithmetic(self):
+        """Multiplying or dividing an array by a unit gives one quantity, not an array of them"""
+        values = numpy.array([1.0, 2.0, 3.0])
+
+        q = values * self.r.km
+        assert type(q) is Quantity
+        assert q.magnitude is values
+        self.assertEqual(q.unit, self.r.km)
+        assert (self.r.km * values).magnitude is values
+
+        q = values / self.r.second
+        assert type(q) is Quantity
+        self.assertEqual(q.unit, self.r.dimensionless / self.r.second)
+        numpy.testing.assert_allclose(q.m_as(self.r.minute**-1), [60, 120, 180])
+
+    def test_conversion(self):
+        q = Quantity(numpy.array([1.0, 2.0, 3.0]), self.r.km)
+
+        numpy.testing.assert_allclose(q.m_as("m"), [1000, 2000, 3000])
+        numpy.testing.assert_allclose(q.to(self.r.m).magnitude, [1000, 2000, 3000])
+
+        # Write into a preallocated array
+        out = numpy.empty(3)
+        assert q.m_as("m", out=out) is out
+        numpy.testing.assert_allclose(out, [1000, 2000, 3000])
+
+        # In-place conversion reuses float arrays, and replaces integer ones
+        values = q.magnitude
+        q.ito("m")
+        assert q.magnitude is values
+        numpy.testing.assert_allclose(values, [1000, 2000, 3000])
+
+        q = Quantity(numpy.array([1, 2, 3]), self.r.km)
+        q.ito("mile")
+        numpy.testing.assert_allclose(q.m_as("km"), [1, 2, 3])
+
+        with self.assertRaises(TypeError):
+            (10 * self.r.km).m_as("m", out=out)
+
+    def test_quantity_array_conversion(self):
+        """QuantityArray conversions use numpy, with the same results"""
+        q = QuantityArray(array("i", [1, 2, 3]), self.r.km)
+        converted = q.to(self.r.mile)
+        assert isinstance(converted.magnitude, array)
+        self.assertEqual(list(converted.magnitude), [x * self.r.km.conversion_factor(self.r.mile) for x in (1, 2, 3)])
+        self.assertEqual(-q, QuantityArray([-1, -2, -3], self.r.km))
+
+        q.ito("m")
+        self.assertEqual(q.magnitude, array("d", [1000, 2000, 3000]))
+        values = q.magnitude
+        q.ito("km")
+        assert q.magnitude is values
+        self.assertEqual(values, array("d", [1, 2, 3]))
+
+    def test_broadcasting_arithmetic(self):
+        r = self.r
+        distance = Quantity(numpy.array([[1.0], [2.0]]), r.km)
+        time = Quantity(numpy.array([1.0, 2.0, 4.0]), r.hour)
+
+        speed = distance / time
+        assert speed.unit == r("km/hour")
+        assert speed.magnitude.shape == (2, 3)
+        numpy.testing.assert_allclose(speed.magnitude[1], [2, 1, 0.5])
+
+        # Conversion factors from cancelling units are applied
+        ratio = distance / Quantity(numpy.array([500.0]), r.m)
+        numpy.testing.assert_allclose(ratio.magnitude, [[2], [4]])
+
+    def test_ufuncs(self):
+        r = self.r
+        values = numpy.array([1.0, -2.0, 3.0])
+        q = Quantity(values, r.km)
+
+        # Arrays on the left hand side defer to Quantity
+        product = values * q
+        assert isinstance(product, Quantity)
+        numpy.testing.assert_allclose(product.magnitude, [1, 4, 9])
+        numpy.testing.assert_allclose((values / (2 * r.hour)).magnitude, [0.5, -1, 1.5])
+
+        total = numpy.add(q, Quantity(numpy.array([1000.0, 0, 0]), r.m))
+        assert total.unit == r.km
+        numpy.testing.assert_allclose(total.magnitude, [2, -2, 3])
+        numpy.testing.assert_allclose(numpy.subtract(q, 1 * r.km).magnitude, [0, -3, 2])
+        numpy.testing.assert_allclose(numpy.abs(q).magnitude, [1, 2, 3])
+        numpy.testing.assert_allclose(numpy.negative(q).magnitude, [-1, 2, -3])
+
+        with self.assertRaises(TypeError):
+            values + q
+        with self.assertRaises(TypeError):
+            numpy.sqrt(q)
+
+    def test_comparisons(self):
+        r = self.r
+        q = Quantity(numpy.array([1.0, 2.0, 3.0]), r.km)
+
+        numpy.testing.assert_array_equal(q == 2000 * r.m, [False, True, False])
+        numpy.testing.assert_array_equal(numpy.less(q, 2000 * r.m), [True, False, False])
+        numpy.testing.assert_array_equal(numpy.greater_equal(q, 2 * r.km), [False, True, True])
+        numpy.testing.assert_array_equal(q == 2 * r.hour, [False, False, False])
+
+        with self.assertRaises(TypeError):
+            numpy.less(q, 2 * r.hour)
+
+        # Truth values follow numpy
+        assert Quantity(numpy.array([1.0]), r.km)
+        with self.assertRaises(ValueError):
+            bool(q)
@@ -0,0 +1,96 @@
+import multiprocessing
+import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pintless
+from pintless import Quantity, QuantityArray, Registry, UndefinedUnitError
+
+
+class ParallelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.r = Registry()
+        cls.pool = cls.r.process_pool(2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.shutdown()
+
+    def test_parallel_to(self):
+        q = QuantityArray(array("d", range(100)), self.r.km)
+        converted = self.r.parallel_to(q, "m", chunk_size=7, executor=self.pool)
+        assert isinstance(converted, QuantityArray)
+        self.assertEqual(converted, q.to(self.r.m))
+        self.assertEqual(list(converted.magnitude), list(q.to(self.r.m).magnitude))
+
+        q = list(range(100)) * self.r.km
+        converted = self.r.parallel_to(q, self.r.m, chunk_size=7, executor=self.pool)
+        self.assertIs(type(converted), Quantity)
+        self.assertEqual(converted.magnitude, q.m_as(self.r.m))
+
+        # Lists of exact magnitudes are converted exactly
+        q = [Decimal(x) / 3 for x in range(10)] * self.r.hour
+        self.assertEqual(self.r.parallel_to(q, "s", chunk_size=3, executor=self.pool).magnitude, q.m_as("s"))
+
+        # Other buffers are converted as doubles
+        q = QuantityArray(array("i", range(10)), self.r.km)
+        self.assertEqual(list(self.r.parallel_to(q, "m", chunk_size=3, executor=self.pool).magnitude), [x * 1000 for x in range(10)])
+
+        with self.assertRaises(TypeError):
+            self.r.parallel_to(1 * self.r.km, "m", executor=self.pool)
+        with self.assertRaises(TypeError):
+            self.r.parallel_to(q, "s", executor=self.pool)
+        with self.assertRaises(ValueError):
+            self.r.parallel_to(q, "m", chunk_size=0, executor=self.pool)
+
+    def test_parallel_parse(self):
+        strings = ["1 km", "2 m", "3.5 mile", "(4) * (7 kWh)", "5 km"] * 10
+        self.assertEqual(
+            self.r.parallel_parse(strings, chunk_size=3, executor=self.pool), list(self.r.parse_many(strings))
+        )
+
+        values = self.r.parallel_parse((s for s in strings if "kWh" not in s), "m", chunk_size=3, executor=self.pool)
+        assert isinstance(values, array)
+        self.assertEqual(values, self.r.parse_many_into([s for s in strings if "kWh" not in s], "m"))
+
+    def test_parallel_parse_errors(self):
+        strings = ["1 km", "2 noexisty", "3 m", "4 s"]
+        with self.assertRaises(UndefinedUnitError):
+            self.r.parallel_parse(strings, chunk_size=2, executor=self.pool)
+
+        # Errors are reported in order, with their index in the input
+        errors = []
+        quantities = self.r.parallel_parse(
+            strings, chunk_size=2, executor=self.pool, on_error=lambda i, s, e: errors.append((i, s, type(e)))
+        )
+        self.assertEqual(quantities, [1 * self.r.km, 3 * self.r.m, 4 * self.r.s])
+        self.assertEqual(errors, [(1, "2 noexisty", UndefinedUnitError)])
+
+        errors = []
+        values = self.r.parallel_parse(
+            strings, "m", chunk_size=2, executor=self.pool, on_error=lambda i, s, e: errors.append(i)
+        )
+        self.assertEqual(values[0], 1000)
+        self.assertEqual(values[2], 3)
+        self.assertEqual(errors, [1, 3])
+
+    def test_new_pool(self):
+        """A pool is started for the call if no executor is given"""
+        self.assertEqual(self.r.parallel_parse(["1 km", "2 m"], "m", chunk_size=1, max_workers=2), array("d", [1000, 2]))
+
+    def test_spawned_named_registry(self):
+        """Named registries can be sent to workers that don't inherit this process's registries"""
+        r = Registry(name="test_spawn")
+        self.addCleanup(pintless.registry._named_registries.pop, "test_spawn", None)
+
+        with r.process_pool(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+            q = list(range(10)) * r.km
+            self.assertEqual(r.parallel_to(q, "m", chunk_size=3, executor=pool).magnitude, q.m_as(r.m))
+            self.assertEqual(r.parallel_parse(["1 km", "2 kWh / mile"], chunk_size=1, executor=pool), [1 * r.km, 2 * r("kWh / mile")])
+
+    def test_other_executor(self):
+        with ThreadPoolExecutor(1) as executor:
+            with self.assertRaises(RuntimeError):
+                self.r.parallel_parse(["1 km"], executor=executor)
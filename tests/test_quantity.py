@@ -1,6 +1,10 @@
+import pickle
+import subprocess
+import sys
 import unittest
 
-from pintless import Registry, Quantity
+import pintless.registry
+from pintless import Registry, Quantity, QuantityArray, get_registry
 
 
 class QuantityTest(unittest.TestCase):
@@ -101,6 +105,15 @@ class QuantityTest(unittest.TestCase):
         # Sum with items that have no unit
         assert 5 + (10 * r.dimensionless) == Quantity(15, r.get_unit("dimensionless"))
 
+    def test_less_than(self):
+        r = self.r
+
+        assert 1 * r.km < 1001 * r.m
+        assert not 1 * r.km < 999 * r.m
+        assert not 1 * r.km < 500 * r.m
+        assert 999 * r.m < 1 * r.km
+        assert not 1 * r.m < 1 * r.m
+
     def test_compare_against_non_quantity(self):
 
         r = self.r
@@ -143,3 +156,98 @@ class QuantityTest(unittest.TestCase):
 
         # Get items
         self.assertEqual(list_quantity_cm[1], Quantity(2, self.r.cm))
+
+    def test_pickle(self):
+        """Quantities and units serialise, including with the old pickle protocols"""
+        unlinked = Registry(link_to_registry=False)
+
+        for r in (self.r, unlinked):
+            quantity = 10 * r.kWh / r.mile
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                restored = pickle.loads(pickle.dumps(quantity, protocol=protocol))
+                self.assertEqual(restored, quantity)
+                self.assertEqual(hash(restored.unit), hash(quantity.unit))
+                self.assertEqual(str(restored), str(quantity))
+
+    def test_pickle_by_reference(self):
+        """Units of named registries pickle as a reference to the registry, not a copy of it"""
+        r = Registry(name="test_pickle")
+        self.addCleanup(pintless.registry._named_registries.pop, "test_pickle", None)
+
+        self.assertIs(get_registry("test_pickle"), r)
+        for quantity in (4.2 * r.kWh, 4.2 * r.kWh / r.mile, 3 * (r.s / r.kdimensionless), QuantityArray([1, 2], r.km)):
+            payload = pickle.dumps(quantity)
+            assert len(payload) < 250
+            restored = pickle.loads(payload)
+            self.assertEqual(restored, quantity)
+            self.assertEqual(str(restored), str(quantity))
+            self.assertIs(type(restored), type(quantity))
+            self.assertIs(restored.unit.registry, r)
+
+        # Units are rehydrated against whichever registry has the name when unpickling
+        payload = pickle.dumps(4.2 * r.kWh / r.mile)
+        other = Registry(name="test_pickle", lazy=True)
+        restored = pickle.loads(payload)
+        self.assertIs(restored.unit.registry, other)
+        self.assertEqual(restored, 4.2 * other.kWh / other.mile)
+
+        pintless.registry._named_registries.pop("test_pickle")
+        with self.assertRaises(ValueError):
+            pickle.loads(payload)
+
+    def test_pickle_default_registry(self):
+        """The default registry is created on demand in the receiving process"""
+        payload = pickle.dumps(4.2 * get_registry().kWh / get_registry().mile)
+        output = subprocess.run(
+            [sys.executable, "-c", "import pickle, sys; print(pickle.loads(sys.stdin.buffer.read()))"],
+            input=payload,
+            capture_output=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.decode().strip(), "4.2 (kwatt*hour)/mile")
+
+    def test_pickle_named_registry(self):
+        """Named registries can be unpickled in a process where that name is unknown, which they then take"""
+        r = Registry(name="test_pickle_registry")
+        self.addCleanup(pintless.registry._named_registries.pop, "test_pickle_registry", None)
+
+        payload = pickle.dumps((r, 4.2 * r.kWh / r.mile))
+        script = (
+            "import pickle, sys\n"
+            "from pintless import get_registry\n"
+            "r, quantity = pickle.loads(sys.stdin.buffer.read())\n"
+            "assert get_registry('test_pickle_registry') is r\n"
+            "assert quantity.unit.registry is r\n"
+            "print(quantity.to(r('kjoule / km')), r.kWh is r.get_unit('kWh'))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], input=payload, capture_output=True, check=True
+        ).stdout
+        expected = (4.2 * r.kWh / r.mile).to(r("kjoule / km"))
+        self.assertEqual(output.decode().strip(), f"{expected} True")
+
+        # A registry already holding the name keeps it
+        restored = pickle.loads(pickle.dumps(r))
+        self.assertIs(get_registry("test_pickle_registry"), r)
+        self.assertEqual(1 * restored.km, 1000 * restored.m)
+
+    def test_no_instance_dict(self):
+        """Quantities use __slots__ to keep them small"""
+        quantity = 10 * self.r.m
+        assert not hasattr(quantity, "__dict__")
+        assert not hasattr(quantity.unit, "__dict__")
+        assert not hasattr(quantity.unit.numerator_units[0], "__dict__")
+
+    def test_power(self):
+        r = self.r
+
+        self.assertEqual((2 * r.m) ** 3, 8 * r.m * r.m * r.m)
+        self.assertAlmostEqual(((2 * r.m) ** 3).m_as("litre"), 8000)
+        self.assertEqual((4 * r.s) ** -2, 0.0625 * r.s**-2)
+        self.assertEqual((4 * r.s) ** 0, 1 * r.dimensionless)
+        self.assertEqual(([1, 2, 3] * r.m) ** 2, [1, 4, 9] * r.m**2)
+
+        # Dimensionless quantities can take any power
+        self.assertEqual((4 * r.dimensionless) ** 0.5, 2 * r.dimensionless)
+        with self.assertRaises(TypeError):
+            (4 * r.m) ** 0.5
@@ -0,0 +1,136 @@
+import pickle
+import unittest
+from array import array
+
+from pintless import Registry, Quantity, QuantityArray, get_registry
+
+
+class QuantityArrayTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+    def test_create(self):
+        """Arrays can be built directly, from any iterable, or by multiplying an array by a unit"""
+        values = array("d", [1, 2, 3])
+        q = values * self.r.km
+        assert isinstance(q, QuantityArray)
+        assert q.magnitude is values
+        assert self.r.km * values == q
+
+        # Buffers are stored without copying
+        buffer = bytearray(array("d", [1, 2, 3]).tobytes())
+        q = QuantityArray(memoryview(buffer).cast("d"), self.r.km)
+        buffer[0:8] = array("d", [5]).tobytes()
+        assert q[0] == 5 * self.r.km
+
+        # Other iterables are copied into arrays of doubles
+        q = QuantityArray([1, 2, 3], self.r.km)
+        assert isinstance(q.magnitude, array)
+        assert q.magnitude.typecode == "d"
+
+    def test_conversion(self):
+        q = QuantityArray([1, 2, 3], self.r.km)
+
+        self.assertEqual(list(q.m_as("m")), [1000, 2000, 3000])
+        converted = q.to(self.r.m)
+        assert isinstance(converted, QuantityArray)
+        assert converted.unit == self.r.m
+        assert converted == q
+
+        # In-place conversion overwrites the existing buffer
+        values = q.magnitude
+        q.ito("m")
+        assert q.magnitude is values
+        self.assertEqual(list(values), [1000, 2000, 3000])
+
+        # Buffers that can't hold doubles are replaced
+        for values in (array("i", [1, 2, 3]), memoryview(array("h", [1, 2, 3]))):
+            q = QuantityArray(values, self.r.km)
+            q.ito("m")
+            assert q.magnitude is not values
+            self.assertEqual(q.magnitude, array("d", [1000, 2000, 3000]))
+
+        with self.assertRaises(TypeError):
+            q.to("hour")
+
+    def test_arithmetic(self):
+        r = self.r
+        distance = QuantityArray([1, 2, 3], r.km)
+        time = QuantityArray([1, 2, 4], r.hour)
+
+        # Scalars, units and quantities
+        self.assertEqual(list((distance * 2).magnitude), [2, 4, 6])
+        self.assertEqual(list((2 * distance).magnitude), [2, 4, 6])
+        self.assertEqual(distance / (2 * r.hour), QuantityArray([0.5, 1, 1.5], r("km/hour")))
+        self.assertEqual((distance * r.m).unit, r.km * r.m)
+
+        # Elementwise with arrays of the same length
+        speed = distance / time
+        self.assertEqual(speed, QuantityArray([1, 1, 0.75], r("km/hour")))
+        self.assertEqual(distance + QuantityArray([1000, 0, 0], r.m), QuantityArray([2, 2, 3], r.km))
+        self.assertEqual(distance - 500 * r.m, QuantityArray([0.5, 1.5, 2.5], r.km))
+        self.assertEqual(list((-distance).magnitude), [-1, -2, -3])
+        self.assertEqual(abs(-distance), distance)
+
+        self.assertEqual(distance**2, QuantityArray([1, 4, 9], r.km**2))
+
+        # Cancelling units applies the conversion factor
+        self.assertEqual(list((distance / QuantityArray([500, 500, 500], r.m)).magnitude), [2, 4, 6])
+
+        with self.assertRaises(TypeError):
+            distance + time
+        with self.assertRaises(ValueError):
+            distance * QuantityArray([1, 2], r.km)
+
+    def test_comparison(self):
+        q = QuantityArray([1, 2, 3], self.r.km)
+
+        self.assertEqual(q < 2000 * self.r.m, [True, False, False])
+        self.assertEqual(q >= QuantityArray([3, 2, 1], self.r.km), [False, True, True])
+        assert q == QuantityArray([1000, 2000, 3000], self.r.m)
+        assert q != QuantityArray([1000, 2000, 3001], self.r.m)
+        assert q != QuantityArray([1, 2, 3], self.r.hour)
+
+        with self.assertRaises(ValueError):
+            bool(q)
+
+    def test_items(self):
+        q = QuantityArray([1, 2, 3], self.r.km)
+
+        assert len(q) == 3
+        assert q[1] == Quantity(2, self.r.km)
+        assert q[1:] == QuantityArray([2, 3], self.r.km)
+        self.assertEqual(list(q), [1 * self.r.km, 2 * self.r.km, 3 * self.r.km])
+
+    def test_pickle(self):
+        q = QuantityArray([1, 2, 3], self.r.km)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(q, protocol=protocol))
+            assert isinstance(restored, QuantityArray)
+            assert restored == q
+
+        # Buffers that aren't arrays are copied when pickling
+        view = QuantityArray(memoryview(array("d", range(6)))[::2], self.r.km)
+        for protocol in (2, 5):
+            self.assertEqual(list(pickle.loads(pickle.dumps(view, protocol=protocol)).magnitude), [0, 2, 4])
+
+    def test_pickle_out_of_band(self):
+        """With protocol 5, magnitudes can be passed out-of-band without copying"""
+        # Units of a named registry are pickled by reference, so only they are in-band
+        q = QuantityArray(array("d", range(1000)), get_registry().km)
+        buffers = []
+        payload = pickle.dumps(q, protocol=5, buffer_callback=buffers.append)
+        assert len(payload) < 1000
+        self.assertEqual(len(buffers), 1)
+
+        restored = pickle.loads(payload, buffers=buffers)
+        assert restored == q
+
+        # The restored magnitudes share memory with the original
+        restored.magnitude[0] = 42
+        self.assertEqual(q.magnitude[0], 42)
+
+        # Read-only buffers are used as-is
+        restored = pickle.loads(payload, buffers=[bytes(buffers[0].raw())])
+        assert restored.magnitude.readonly
+        self.assertEqual(restored.m_as("m")[1], 1000)
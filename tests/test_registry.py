@@ -1,6 +1,20 @@
+import gc
+import math
+import os
+import json
+import weakref
+import shutil
+import tempfile
 import unittest
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+from unittest import mock
 
-from pintless import Registry, UndefinedUnitError
+import pintless
+from pintless import Registry, UndefinedUnitError, compile_snapshot
+
+DEFAULT_DEFINITIONS = os.path.join(os.path.dirname(pintless.__file__), "default_units.json")
 
 
 class RegistryTest(unittest.TestCase):
@@ -103,6 +117,22 @@ class RegistryTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.r("(4 kWh")  # mismatched brackets
 
+    def test_powers_in_expressions(self):
+        m = self.r.m
+        assert self.r("m**3") is m * m * m
+        assert self.r("m^3") is m**3
+        assert self.r("kg / m**3") == self.r.kg / (m * m * m)
+        assert self.r("(m / s)**2") == (m * m) / (self.r.s * self.r.s)
+        assert self.r("s**-2") == self.r.s**-2
+        assert self.r("2 m**2") == 2 * m * m
+        assert self.r("m ** 2 ** 2") == m**4  # right-associative
+        assert self.r("(2 m)**(1 * 2)") == 4 * m * m
+
+        with self.assertRaises(ValueError):
+            self.r("m**s")
+        with self.assertRaises(TypeError):
+            self.r("m**0.5")
+
     def test_serialisation_to_from_string(self):
         """Ensure serialisation/deserialisation is reliable"""
         test_strings = [
@@ -145,3 +175,201 @@ class RegistryTest(unittest.TestCase):
         assert qmetres.magnitude == 10
         cm = qmetres.to(r.cm)
         assert cm.magnitude == 10 * 100
+
+    def test_lazy_registry(self):
+        """Lazy registries only define prefixed units when they are first used"""
+        lazy = Registry(lazy=True)
+
+        # Nothing but the dimensionless unit is expanded on construction
+        assert len(lazy.units) < len(self.r.units)
+        assert "kWh" not in lazy.units
+
+        # Attribute access, calls and expressions all resolve the prefix on first use
+        assert lazy.kWh == self.r.kWh
+        assert lazy.kWh.name == "kWh"
+        assert "kWh" in lazy.units
+        assert lazy("mW") == self.r.mW
+        assert lazy("kWh / mile") == self.r("kWh / mile")
+        assert lazy("4 kWh") == self.r("4 kWh")
+        self.assertAlmostEqual((1 * lazy.km).m_as("inch"), (1 * self.r.km).m_as("inch"))
+
+        # Units that don't exist with any prefix are still errors
+        with self.assertRaises(AttributeError):
+            lazy.noexisty
+        with self.assertRaises(UndefinedUnitError):
+            lazy("noexisty")
+
+    def test_registry_snapshot(self):
+        """Registries can be loaded from a precompiled snapshot, which is rebuilt when stale"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            definition_filename = os.path.join(tmpdir, "units.json")
+            snapshot_filename = os.path.join(tmpdir, "units.snapshot")
+            shutil.copy(DEFAULT_DEFINITIONS, definition_filename)
+
+            # Compiled on first use
+            r = Registry(definition_filename, snapshot_filename=snapshot_filename)
+            assert os.path.exists(snapshot_filename)
+            assert r.kWh == self.r.kWh
+
+            # Loaded thereafter.  Lazy registries read the definitions, which is quicker
+            with mock.patch.object(Registry, "_read_definitions") as read_definitions:
+                r = Registry(definition_filename, snapshot_filename=snapshot_filename)
+                read_definitions.assert_not_called()
+            assert r.units == self.r.units
+            lazy = Registry(definition_filename, lazy=True, snapshot_filename=snapshot_filename)
+            assert lazy("4 kWh / mile") == self.r("4 kWh / mile")
+
+            # Truncated or corrupt snapshots are rebuilt
+            with open(snapshot_filename, "rb") as fin:
+                truncated = fin.read()[:100]
+            for contents in (b"", b"not a pickle", truncated):
+                with open(snapshot_filename, "wb") as fout:
+                    fout.write(contents)
+                r = Registry(definition_filename, snapshot_filename=snapshot_filename)
+                assert r.units == self.r.units
+                with mock.patch.object(Registry, "_read_definitions") as read_definitions:
+                    Registry(definition_filename, snapshot_filename=snapshot_filename)
+                    read_definitions.assert_not_called()
+
+            # Changing the definitions invalidates the snapshot
+            with open(definition_filename) as fin:
+                defs = json.load(fin)
+            defs["length"]["furlong"] = 201.168
+            with open(definition_filename, "w") as fout:
+                json.dump(defs, fout)
+
+            r = Registry(definition_filename, snapshot_filename=snapshot_filename)
+            self.assertAlmostEqual((1 * r.furlong).m_as("m"), 201.168)
+            compile_snapshot(snapshot_filename, definition_filename)
+            with mock.patch.object(Registry, "_read_definitions") as read_definitions:
+                r = Registry(definition_filename, snapshot_filename=snapshot_filename)
+                read_definitions.assert_not_called()
+            assert "kfurlong" in r.units
+
+    def test_parse_cache(self):
+        """Parsed expressions are cached per registry, with a configurable size"""
+        r = Registry(parse_cache_size=2)
+
+        unit = r("kelvin / (watt hour)")
+        assert r("kelvin / (watt hour)") is unit
+        assert r.parse_cache.info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+        # Least recently used expressions are evicted
+        r("km / hour")
+        r("m / s")
+        assert "kelvin / (watt hour)" not in r.parse_cache
+        assert r("kelvin / (watt hour)") == unit
+
+        # Names of defined units don't use the expression cache
+        r("kWh")
+        assert "kWh" not in r.parse_cache
+
+        # Cached quantities are copied, as they are mutable
+        quantity = r("4 km")
+        quantity.ito("m")
+        assert r("4 km") == 4 * r.km
+        assert r("4 km").unit == r.km
+
+    def test_registry_not_kept_alive(self):
+        """Caches are held by each registry, so don't keep registries alive"""
+        r = Registry(lazy=True)
+        r("4 kWh / mile")
+        ref = weakref.ref(r)
+
+        del r
+        gc.collect()
+        assert ref() is None
+
+    def test_update_multipliers(self):
+        for lazy in (False, True):
+            r = Registry(lazy=lazy)
+            price, m = 5 * r.EUR, r.m
+            price_per_metre = r("2 EUR / m")
+            eur_per_usd = r.EUR / r.USD
+            self.assertEqual(price.m_as("USD"), 5)
+            self.assertEqual(r("4 EUR / USD").m_as(r.dimensionless_unit), 4)
+            self.assertEqual((2 * r.MEUR).m_as("kUSD"), 2000)
+
+            self.assertEqual(r.update_multipliers("currency", {"EUR": 1.25, "GBP": 1.5}), r.version)
+            self.assertEqual(r.version, 1)
+
+            # Existing units and quantities convert at the new rates, and units are still shared
+            self.assertEqual(price.m_as("USD"), 6.25)
+            self.assertEqual(price_per_metre.m_as("USD / m"), 2.5)
+            self.assertEqual(r("4 EUR / USD").m_as(r.dimensionless_unit), 5)
+            self.assertEqual((2 * r.MEUR).m_as("kUSD"), 2500)
+            self.assertEqual((1 * r.kGBP).m_as("EUR"), 1200)
+            self.assertIs(r.EUR / r.USD, eur_per_usd)
+            self.assertIs(r.m, m)
+            self.assertEqual((1 * r.m).m_as("km"), 0.001)
+
+        with self.assertRaises(ValueError):
+            r.update_multipliers("money", {"EUR": 1})
+        with self.assertRaises(ValueError):
+            r.update_multipliers("currency", {"m": 1})
+        with self.assertRaises(ValueError):
+            r.update_multipliers("currency", {"kEUR": 1})
+        with self.assertRaises(ValueError):
+            r.update_multipliers("[currency]", {"EUR": 0})
+        invalid = (
+            True, "1.08", -1, math.nan, math.inf, 10**400,
+            Decimal("NaN"), Decimal("sNaN"), Decimal("Infinity"), Decimal("1E+400"), Decimal("1E-400"),
+            Fraction(1, 10**400),
+        )
+        for multiplier in invalid:
+            with self.assertRaises(ValueError):
+                r.update_multipliers("currency", {"EUR": multiplier})
+        self.assertEqual(r.version, 1)
+
+    def test_update_multipliers_wrapped(self):
+        r = Registry()
+        to_usd = r.wraps(ret="USD", args="USD")(lambda x: x)
+        self.assertEqual(to_usd(2 * r.EUR).magnitude, 2)
+        r.update_multipliers("currency", {"EUR": 1.5})
+        self.assertEqual(to_usd(2 * r.EUR).magnitude, 3)
+
+    def test_parse_many(self):
+        """Bulk parsing yields the same quantities as parsing each string"""
+        strings = ["4.2 kWh", "4 kWh", "-1 mile", "3 km / hour", "(4) * (7 kWh)", "kWh", "4.2"]
+        self.assertEqual(list(self.r.parse_many(strings)), [self.r(s) * 1 for s in strings])
+        assert isinstance(next(self.r.parse_many(["4 kWh"])).magnitude, int)
+
+        # Each distinct unit is only parsed once
+        r = Registry(parse_cache_size=None)
+        quantities = list(r.parse_many(f"{i} kelvin / watt" for i in range(100)))
+        assert len(quantities) == 100
+        assert r.parse_cache.info()["misses"] == 1
+
+        # Errors raise unless they are reported
+        with self.assertRaises(UndefinedUnitError):
+            list(self.r.parse_many(["4 kWh", "4 noexisty"]))
+
+        bad_rows = []
+        quantities = list(
+            self.r.parse_many(["4 kWh", "4 noexisty", "(4 kWh", "5 kWh"], on_error=lambda *row: bad_rows.append(row[:2]))
+        )
+        self.assertEqual(quantities, [4 * self.r.kWh, 5 * self.r.kWh])
+        self.assertEqual(bad_rows, [(1, "4 noexisty"), (2, "(4 kWh")])
+
+    def test_parse_many_into(self):
+        """Bulk parsing can write magnitudes in a given unit straight into a buffer"""
+        values = self.r.parse_many_into(["1 kWh", "500 Wh", "7.2e6 joule"], "kWh")
+        assert isinstance(values, array)
+        self.assertEqual([round(v, 9) for v in values], [1, 0.5, 2])
+
+        out = []
+        assert self.r.parse_many_into(["1 km", "(2) km"], self.r.m, out=out) is out
+        self.assertEqual(out, [1000, 2000])
+
+        # Bad rows, including incompatible units, are NaN when reported
+        bad_rows = []
+        values = self.r.parse_many_into(
+            ["1 km", "1 hour", "1 noexisty", "2 km"], "m", on_error=lambda i, s, e: bad_rows.append(i)
+        )
+        self.assertEqual(values[0], 1000)
+        assert math.isnan(values[1]) and math.isnan(values[2])
+        self.assertEqual(values[3], 2000)
+        self.assertEqual(bad_rows, [1, 2])
+
+        with self.assertRaises(TypeError):
+            self.r.parse_many_into(["1 hour"], "m")
@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+import os
+import pickle
+import tempfile
+import unittest
+from array import array
+
+import pintless
+from pintless import QuantityArray, Registry, UndefinedUnitError, get_registry
+from pintless.shared import SharedQuantityArray
+
+
+def _total_in_joules(shared: SharedQuantityArray) -> float:
+    with shared:
+        return sum(shared.m_as("joule"))
+
+
+class SharedQuantityArrayTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = get_registry()
+        self.shared = SharedQuantityArray.create(array("d", range(100)), self.r.kWh)
+        self.addCleanup(self.shared.unlink)
+        self.addCleanup(self.shared.close)
+
+    def test_create(self):
+        assert isinstance(self.shared, QuantityArray)
+        self.assertEqual(len(self.shared), 100)
+        self.assertEqual(self.shared.unit, self.r.kWh)
+        self.assertEqual(self.shared, QuantityArray(array("d", range(100)), self.r.kWh))
+        self.assertEqual(self.shared.to(self.r.Wh).magnitude[1], 1000)
+
+        # Lists, and other types of magnitude, can be shared too
+        with SharedQuantityArray.create(array("i", [1, 2, 3]), self.r.m / self.r.s) as shared:
+            self.addCleanup(shared.unlink)
+            self.assertEqual(list(shared.magnitude), [1, 2, 3])
+            self.assertEqual(shared.magnitude.format, "i")
+
+        with self.assertRaises(TypeError):
+            SharedQuantityArray.create([1, 2, 3], "kWh")
+
+    def test_attach(self):
+        with SharedQuantityArray.attach(self.shared.name) as attached:
+            self.assertEqual(attached, self.shared)
+            self.assertIs(attached.unit, self.r.kWh)
+
+            # Writes are seen by everything attached
+            self.shared.magnitude[0] = 42
+            self.assertEqual(attached.magnitude[0], 42)
+
+        # Other registries with the same definitions can be used
+        other = Registry(lazy=True)
+        with SharedQuantityArray.attach(self.shared.name, other) as attached:
+            self.assertIs(attached.unit.registry, other)
+            self.assertEqual(attached.m_as("kWh")[1], 1)
+
+    def test_units(self):
+        """Units that aren't defined by name are described by their base units"""
+        unit = self.r.s / self.r.kdimensionless * self.r.mile
+        with SharedQuantityArray.create([1, 2], unit) as shared:
+            self.addCleanup(shared.unlink)
+            with SharedQuantityArray.attach(shared.name, Registry(lazy=True)) as attached:
+                self.assertEqual(attached.unit, unit)
+
+    def test_incompatible_registry(self):
+        """Attaching fails if the registry doesn't define the unit"""
+        with open(os.path.join(os.path.dirname(pintless.__file__), "default_units.json")) as fin:
+            definitions = json.load(fin)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            definition_filename = os.path.join(tmpdir, "units.json")
+            with open(definition_filename, "w") as fout:
+                json.dump({k: v for k, v in definitions.items() if k != "energy"}, fout)
+            registry = Registry(definition_filename)
+
+        with self.assertRaises(UndefinedUnitError):
+            SharedQuantityArray.attach(self.shared.name, registry)
+
+    def test_no_ito(self):
+        with self.assertRaises(TypeError):
+            self.shared.ito("Wh")
+
+    def test_pickle(self):
+        """Pickles refer to the shared memory, rather than copying it"""
+        payload = pickle.dumps(self.shared)
+        assert len(payload) < 200
+        with pickle.loads(payload) as restored:
+            assert isinstance(restored, SharedQuantityArray)
+            self.assertEqual(restored.name, self.shared.name)
+            self.assertEqual(restored, self.shared)
+
+    def test_processes(self):
+        with multiprocessing.Pool(2) as pool:
+            totals = pool.map(_total_in_joules, [self.shared] * 4)
+        self.assertEqual(totals, [sum(range(100)) * 3.6e6] * 4)
+
@@ -50,6 +50,9 @@ class UnitTest(unittest.TestCase):
         )
         self.assertEqual(str(self.r.kWh / self.r.m * self.r.amp), "(amp*kwatt*hour)/m")
 
+        # Dividing a number by a unit gives a quantity in the reciprocal unit
+        self.assertEqual((5 / self.r.second).m_as(self.r.minute**-1), 300)
+
     def test_unit_names(self):
         """Test conversion to a string"""
         # Alias behavour
@@ -87,6 +90,52 @@ class UnitTest(unittest.TestCase):
         assert self.r.m**2 == self.r.m * self.r.m
         assert self.r.m**3 == self.r.m * self.r.m * self.r.m
 
+        # Zero and negative powers
+        assert self.r.m**0 == self.r.dimensionless_unit
+        assert self.r.s**-1 == self.r.dimensionless / self.r.s
+        assert self.r.s**-2 == self.r.dimensionless / (self.r.s * self.r.s)
+        assert (self.r.m / self.r.s) ** -2 == (self.r.s * self.r.s) / (self.r.m * self.r.m)
+        assert (self.r.m**3).compatible_with(self.r.litre)
+        assert (self.r.s**-2).dimensions == tuple(-2 * x for x in self.r.s.dimensions)
+
+        # Results are cached, so are shared
+        assert self.r.m**3 is self.r.m**3
+
+        with self.assertRaises(TypeError):
+            self.r.m**0.5
+
+    def test_interned_units(self):
+        """Arithmetic that produces equal units returns the same, shared, Unit object"""
+        r = self.r
+
+        assert r.kW * r.hour is r.kW * r.hour
+        assert r.m / r.s is (10 * r.m / (2 * r.s)).unit
+        assert r.m / r.m is r.dimensionless_unit
+        assert (r.kW * r.hour).name == "kW*hour"
+
+        # Units not linked to a registry can't be interned, but still compare equal
+        unlinked = Registry(link_to_registry=False)
+        assert unlinked.m * unlinked.s == unlinked.m * unlinked.s
+
+    def test_algebra_cache(self):
+        """Multiplying and dividing the same units repeatedly reuses cached results"""
+        r = Registry(algebra_cache_size=8)
+        q1 = 10 * r.km
+        q2 = 20 * r.meter
+
+        first = q1 / q2
+        misses = r.algebra_cache.misses
+        hits = r.algebra_cache.hits
+        for _ in range(10):
+            assert q1 / q2 == first
+            assert (q1 / q2).unit is first.unit
+        assert r.algebra_cache.misses == misses
+        assert r.algebra_cache.hits >= hits + 10
+
+        # The conversion factor is cached along with the unit
+        self.assertEqual((10 * r.km) / (20 * r.meter), 500)
+        assert len(r.algebra_cache) <= 8
+
     def test_equality(self):
 
         r = self.r
@@ -120,6 +169,28 @@ class UnitTest(unittest.TestCase):
         # length/length should cancel to be dimensionless
         assert (length_a / length_b).unit_type == "[dimensionless]/[dimensionless]"
 
+    def test_dimension_vectors(self):
+        """Units hold a vector of exponents over the registry's dimensions"""
+        r = self.r
+        length = r.dimension_names.index("[length]")
+        time = r.dimension_names.index("[time]")
+
+        speed = r("km/hour").dimensions
+        assert len(speed) == len(r.dimension_names)
+        assert speed[length] == 1
+        assert speed[time] == -1
+        assert sum(abs(x) for x in speed) == 2
+
+        # Repeated units are exponents, and dimensionless units have none
+        assert r.litre.dimensions[length] == 3
+        assert r.litre.dimensions == (r.m * r.m * r.m).dimensions
+        assert not any(r.kilodimensionless.dimensions)
+        assert r.Hz.dimensions == (r.dimensionless / r.second).dimensions
+
+        # Scale relative to the base units of each dimension
+        self.assertAlmostEqual(r("km/hour").scale, 1 / 3.6)
+        assert r.kHz.scale == 1000
+
     def test_conversion_factor(self):
 
         r = self.r
@@ -139,6 +210,27 @@ class UnitTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             r.meter.conversion_factor(r.dimensionless)
 
+    def test_conversion_factor_cache(self):
+        """Conversion factors between the same pair of units are only computed once"""
+        r = Registry(conversion_cache_size=4)
+        km_h = r("km/hour")
+        m_s = r("m/s")
+
+        factor = km_h.conversion_factor(m_s)
+        misses = r.conversion_cache.misses
+        for _ in range(10):
+            assert km_h.conversion_factor(m_s) == factor
+            self.assertAlmostEqual((36 * km_h).m_as(m_s), 10)
+        assert r.conversion_cache.misses == misses
+        assert r.conversion_cache.hits >= 20
+
+        # Failed conversions are not cached
+        with self.assertRaises(TypeError):
+            r.meter.conversion_factor(r.hour)
+        with self.assertRaises(TypeError):
+            r.meter.conversion_factor(r.hour)
+        assert len(r.conversion_cache) <= 4
+
     def test_simplify(self):
 
         r = self.r
@@ -154,3 +246,10 @@ class UnitTest(unittest.TestCase):
         self.assertEqual((10 * r.km) / (20 * r.km), 0.5 * r.dimensionless)
         self.assertEqual((10 * r.km) / (20 * r.meter), 500)
         self.assertEqual((10 * r.km) * (5 * r.meter), 50 * r.km * r.meter)
+
+        # Repeated units cancel pairwise, in order, and the rest are ordered by unit type
+        m, km, s_ = (r._get_base_unit(name) for name in ("m", "km", "s"))
+        numerator, denominator, factor = r.m.simplify([km, s_, m, km], [m, m, s_, s_])
+        assert numerator == [km]
+        assert denominator == [s_]
+        self.assertAlmostEqual(factor, 1000)
@@ -0,0 +1,73 @@
+import unittest
+from array import array
+from unittest import mock
+
+import pintless.wrapping as plw
+from pintless import Quantity, QuantityArray, Registry
+
+
+class WrapsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r = Registry()
+
+        @self.r.wraps(ret="watt", args=("joule", "second"))
+        def power(energy, duration):
+            return energy / duration
+
+        self.power = power
+
+    def test_wraps(self):
+        result = self.power(3 * self.r.kWh, 2 * self.r.hour)
+        assert isinstance(result, Quantity)
+        self.assertIs(result.unit, self.r.watt)
+        self.assertEqual(result.magnitude, 1500)
+
+        # Arguments already in the expected units are passed straight through
+        self.assertEqual(self.power(4 * self.r.joule, 2 * self.r.second).magnitude, 2)
+        self.assertEqual(self.power(duration=2 * self.r.hour, energy=3 * self.r.kWh).magnitude, 1500)
+        self.assertEqual(self.power.__name__, "power")
+
+    def test_wraps_magnitude_types(self):
+        @self.r.wraps(ret="joule", args="joule")
+        def total(energies):
+            return sum(energies)
+
+        energies = QuantityArray(array("d", [1, 2]), self.r.kWh)
+        self.assertEqual(total(energies).magnitude, 3 * 3600000)
+        self.assertEqual(total([1, 2] * self.r.kWh).magnitude, 3 * 3600000)
+        self.assertEqual(total(QuantityArray(array("d", [1, 2]), self.r.joule)).magnitude, 3)
+
+    def test_wraps_remembered_units(self):
+        """Each argument remembers factors for a bounded number of units"""
+        argument = plw._Argument(0, "length", self.r.m, strict=True)
+        units = [self.r(unit) for unit in ("km", "cm", "mile", "inch")]
+
+        with mock.patch.object(plw, "MAX_REMEMBERED_UNITS", 2):
+            for _ in range(2):
+                for unit in units:
+                    self.assertAlmostEqual(argument.magnitude(2 * unit), (2 * unit).m_as("m"))
+        self.assertEqual(len(argument.factors), 2)
+
+    def test_wraps_strict(self):
+        with self.assertRaises(TypeError):
+            self.power(3, 2 * self.r.hour)
+        with self.assertRaises(TypeError):
+            self.power(3 * self.r.m, 2 * self.r.hour)
+
+        @self.r.wraps(ret=None, args=("m", None), strict=False)
+        def scale(length, factor):
+            return length * factor
+
+        self.assertEqual(scale(2 * self.r.km, 3), 6000)
+        self.assertEqual(scale(2, 3), 6)
+        self.assertEqual(scale(length=2, factor=3 * self.r.s), 6 * self.r.s)
+
+    def test_wraps_return_values(self):
+        @self.r.wraps(ret=("m", None), args="km")
+        def split(length):
+            return length * 1000, length
+
+        self.assertEqual(split(2500 * self.r.m), (2500 * self.r.m, 2.5))
+
+        with self.assertRaises(TypeError):
+            self.r.wraps(ret=None, args=("m", "s"))(lambda length: length)